@@ -0,0 +1,5 @@
+#!/usr/bin/python3
+
+"""
+Benchmarks for the storage engine and the console
+"""
@@ -0,0 +1,189 @@
+#!/usr/bin/python3
+
+"""
+Runs the benchmark suite: model methods, FileStorage save/reload at
+several sizes and console commands
+Prints a table of the results, writes them as JSON with --output, and
+compares them with a stored run with --baseline: the exit status is 1
+if a benchmark got slower than the baseline by more than --tolerance
+usage: python3 -m benchmarks [--sizes 1000,100000,1000000] [--repeat N]
+                             [--output results.json]
+                             [--baseline baseline.json] [--tolerance 0.2]
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import timeit
+from contextlib import redirect_stdout
+from benchmarks.reload import generate
+from console import HBNBCommand
+from models import storage
+from models.base_model import BaseModel
+from models.engine.file_storage import FileStorage
+from models.user import User
+
+
+def best(func, number, repeat, setup='pass'):
+    """Returns the best time of one call of func, in seconds, setup is
+    run (untimed) before each of the repeat runs"""
+    return min(timeit.repeat(func, setup, number=number,
+                             repeat=repeat)) / number
+
+
+def model_cases(repeat):
+    """Times the BaseModel methods"""
+    storage.clean()
+    obj = BaseModel()
+    obj.name = 'My First Model'
+    obj.my_number = 89
+    record = obj.to_dict()
+
+    def to_dict():
+        """Serializes obj without its cached dictionary"""
+        object.__setattr__(obj, '_cache', None)
+        return obj.to_dict()
+    results = {
+        'BaseModel.__init__': best(BaseModel, 10000, repeat),
+        'BaseModel.__init__(**kwargs)': best(lambda: BaseModel(**record),
+                                             10000, repeat),
+        'BaseModel.to_dict': best(to_dict, 10000, repeat),
+        'BaseModel.__str__': best(obj.__str__, 10000, repeat),
+    }
+    storage.clean()
+    return results
+
+
+def storage_cases(sizes, repeat):
+    """
+    Times FileStorage.save and reload with each number of objects
+    save is timed with the cached serialized forms dropped first, so
+    every object is encoded, and save_cached with an unchanged storage,
+    which mostly writes the cached JSON text
+    """
+    results = {}
+    for size in sizes:
+        path = 'storage.json'
+        generate(path, size)
+        files = FileStorage(path)
+        files.clean()
+
+        def reload():
+            """Reloads the file from an empty storage"""
+            files.clean()
+            files.reload()
+        results['FileStorage.reload[{:d}]'.format(size)] = best(reload, 1,
+                                                                repeat)
+
+        def uncache():
+            """Drops the cached serialized forms of every object"""
+            for obj in files.all().values():
+                object.__setattr__(obj, '_cache', None)
+        results['FileStorage.save[{:d}]'.format(size)] = best(
+            files.save, 1, repeat, uncache)
+        results['FileStorage.save_cached[{:d}]'.format(size)] = best(
+            files.save, 1, repeat, files.save)
+        files.clean()
+        os.remove(path)
+    return results
+
+
+def console_cases(repeat, count=100):
+    """Times console commands on a storage of count users, saves are
+    batched so the time is the one of the console
+    """
+    storage.clean()
+    users = [User() for i in range(count)]
+    console = HBNBCommand()
+    lines = {
+        'show': 'show User {}'.format(users[0].id),
+        'update': 'update User {} first_name "Betty"'.format(users[0].id),
+        'all': 'all User',
+        'count': 'count User',
+        'create': 'create User',
+    }
+    results = {}
+    with storage.batch(), redirect_stdout(io.StringIO()) as out:
+        for name, line in lines.items():
+            def run():
+                """Runs the command and drops its output"""
+                console.onecmd(line)
+                out.seek(0)
+                out.truncate()
+            results['console.' + name] = best(run, 200, repeat)
+    storage.clean()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compares results with a baseline
+    Return:
+        (dict): ratio of the time to the baseline time, per benchmark
+        present in both
+        (list): benchmarks slower than the baseline by more than
+        tolerance
+    """
+    ratios = {}
+    for name, seconds in results.items():
+        if baseline.get(name):
+            ratios[name] = seconds / baseline[name]
+    return ratios, [name for name, ratio in ratios.items()
+                    if ratio > 1 + tolerance]
+
+
+def main(argv=None):
+    """Runs the suite, returns the exit status"""
+    parser = argparse.ArgumentParser(prog='python3 -m benchmarks',
+                                     description='HBNB benchmark suite')
+    parser.add_argument('--sizes', default='1000,100000,1000000',
+                        type=lambda arg: [int(n) for n in arg.split(',')],
+                        help='numbers of objects saved and reloaded')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs per benchmark, the best one is kept')
+    parser.add_argument('--output', help='write the results to this file')
+    parser.add_argument('--baseline',
+                        help='compare with the results in this file')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='slowdown allowed by --baseline (default: 0.2)')
+    args = parser.parse_args(argv)
+    baseline = None
+    if args.baseline is not None:
+        with open(args.baseline) as b_file:
+            baseline = json.load(b_file)['results']
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            results = model_cases(args.repeat)
+            results.update(storage_cases(args.sizes, args.repeat))
+            results.update(console_cases(args.repeat))
+        finally:
+            os.chdir(cwd)
+    ratios, regressions = compare(results, baseline or {}, args.tolerance)
+    for name, seconds in results.items():
+        line = '{:<30} {:>16.3f}us'.format(name, seconds * 1e6)
+        if name in ratios:
+            line += ' {:>+7.1%}'.format(ratios[name] - 1)
+            if name in regressions:
+                line += '  REGRESSION'
+        print(line)
+    if args.output is not None:
+        with open(args.output, 'w') as o_file:
+            json.dump({'python': platform.python_version(),
+                       'machine': platform.machine(),
+                       'unit': 's', 'results': results}, o_file, indent=2)
+    if regressions:
+        print('{:d} benchmark(s) slower than the baseline by more than '
+              '{:.0%}'.format(len(regressions), args.tolerance),
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
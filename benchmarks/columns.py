@@ -0,0 +1,52 @@
+#!/usr/bin/python3
+
+"""
+Benchmarks the average price_by_night per city computed from the
+instances of FileStorage and from the columns of ColumnStorage
+usage: python3 -m benchmarks.columns [places]
+"""
+
+import sys
+import time
+import uuid
+from models.engine.column_storage import ColumnStorage
+from models.engine.file_storage import FileStorage
+from models.place import Place
+
+
+def per_object(storage):
+    """Averages price_by_night per city_id through the instances"""
+    sums = {}
+    for place in storage.all(Place).values():
+        total = sums.setdefault(place.city_id, [0, 0])
+        total[0] += place.price_by_night
+        total[1] += 1
+    return {k: v[0] / v[1] for k, v in sums.items()}
+
+
+def main(count=200000):
+    """Prints the time of both ways of computing the averages"""
+    cities = [str(uuid.uuid4()) for i in range(100)]
+    files = FileStorage("unused.json")
+    files.clean()
+    columns = ColumnStorage("unused.json")
+    for i in range(count):
+        place = Place(**Place().to_dict())
+        place.city_id = cities[i % len(cities)]
+        place.price_by_night = i % 500
+        place.latitude = i / count
+        files.new(place)
+        columns.new(place)
+    print('places: {:d}'.format(count))
+    start = time.perf_counter()
+    expected = per_object(files)
+    print('  objects: {:.3f}s'.format(time.perf_counter() - start))
+    start = time.perf_counter()
+    averages = columns.aggregate(Place, 'price_by_night', 'avg',
+                                 by='city_id')
+    print('  columns: {:.3f}s'.format(time.perf_counter() - start))
+    assert averages == expected
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:2]))
@@ -0,0 +1,130 @@
+#!/usr/bin/python3
+
+"""
+Benchmarks the time the console takes per command, parsing included,
+on the command forms of tests/test_console.py
+Saves are held in a batch, so the time is the one of the console and
+of in-memory storage operations
+The parsing alone is also timed against the previous parser: a regex
+search for the dotted syntax, cmd.Cmd.parseline, then shlex.split
+usage: python3 -m benchmarks.console [rounds]
+"""
+
+import cmd
+import io
+import os
+import re
+import shlex
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from console import HBNBCommand, split
+from models import storage
+from models.place import Place
+from models.state import State
+from models.user import User
+
+
+def commands(user, state, place):
+    """Returns the command lines, one per form of the console tests"""
+    return [
+        'show User {}'.format(user.id),
+        'User.show("{}")'.format(user.id),
+        'show BaseModel 88888',
+        'City.destroy("88888")',
+        'count User',
+        'User.count()',
+        'all State',
+        'State.all()',
+        'update User {} name Ludten'.format(user.id),
+        "update User {} 'grade' '1st class' age 27".format(user.id),
+        'User.update("{}", "name", "John Doe")'.format(user.id),
+        'User.update("{}", {})'.format(user.id, {'grade': '1st class',
+                                                 'age': 27}),
+        'update State {} name'.format(state.id),
+        'where Place price_by_night__lt=100 only=id,name',
+        'Place.show("{}")'.format(place.id),
+    ]
+
+
+def legacy_parseline(line):
+    """The previous rewrite of <Model>.<action>(...) lines"""
+    newLine = line.strip()
+    args = re.search(r'\(.*?\)', newLine)
+    if args is not None:
+        params = args.group().strip('()')
+        curls = re.search(r'\{(.*?)\}', params)
+        if curls:
+            items = curls.group()
+            try:
+                uid = shlex.split(params[:curls.span()[0]])[0].strip(",")
+            except IndexError:
+                uid = ""
+            newargs = '{} \'{}\''.format(uid, items.replace("'", '"'))
+        else:
+            newargs = params.split(',')
+            newargs = " ".join(newargs) or ""
+        action = shlex.split(newLine[:args.span()[0]])[0].split(".")
+        if len(action) == 2:
+            line = "{} {} {}".format(action[1], action[0], newargs.strip())
+    return line
+
+
+def legacy_parse(console, line):
+    """Parses line and splits its arguments like the previous parser"""
+    name, arg, line = cmd.Cmd.parseline(console, legacy_parseline(line))
+    return name, shlex.split(arg)
+
+
+def parse(console, line):
+    """Parses line and splits its arguments like the console does"""
+    command = console.parse(line)
+    if command.args is not None:
+        return command.name, command.args
+    return command.name, split(command.arg)
+
+
+def time_parsers(console, lines, rounds):
+    """Returns the time per line of the previous and current parsers"""
+    results = []
+    for func in (legacy_parse, parse):
+        start = time.perf_counter()
+        for i in range(rounds):
+            for line in lines:
+                func(console, line)
+        results.append((time.perf_counter() - start) /
+                       (rounds * len(lines)))
+    return results
+
+
+def main(rounds=2000):
+    """Prints the average time per command"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            storage.clean()
+            lines = commands(User(), State(), Place())
+            console = HBNBCommand()
+            old, new = time_parsers(console, lines, rounds)
+            with storage.batch(), redirect_stdout(io.StringIO()) as out:
+                start = time.perf_counter()
+                for i in range(rounds):
+                    for line in lines:
+                        console.onecmd(line)
+                    out.seek(0)
+                    out.truncate()
+                elapsed = time.perf_counter() - start
+        finally:
+            storage.clean()
+            os.chdir(cwd)
+    count = rounds * len(lines)
+    print('commands: {:d}'.format(count))
+    print('  {:.2f}us per command'.format(elapsed / count * 1e6))
+    print('parsing: {:.2f}us per command (previous parser: {:.2f}us, '
+          '{:.1f}x)'.format(new * 1e6, old * 1e6, old / new))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:2]))
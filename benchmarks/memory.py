@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+
+"""
+Benchmarks the memory used per instance by each model class and by its
+compact (__slots__) variant
+usage: python3 -m benchmarks.memory [instances]
+"""
+
+import sys
+import tracemalloc
+from models.compact_model import compact
+from models.engine.file_storage import classes, load
+
+
+def sample(cls):
+    """
+    Returns the to_dict() of an instance of cls with every class
+    attribute set, the way records look after a few updates
+    """
+    value = cls(id='00000000-0000-0000-0000-000000000000',
+                created_at='2017-09-28T21:03:54.052298',
+                updated_at='2017-09-28T21:03:54.052298').to_dict()
+    for key, default in vars(cls).items():
+        if key.startswith('_') or hasattr(default, '__get__'):
+            continue
+        value[key] = type(default)() if type(default) is list else \
+            type(default)(1)
+    return value
+
+
+def measure(value, count):
+    """
+    Builds count instances from the same record
+    Return:
+        (float): bytes allocated per instance
+    """
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    objects = [load(dict(value)) for i in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del objects
+    return used / count
+
+
+def main(count=100000):
+    """Prints the bytes per instance of both representations"""
+    models = dict(classes)
+    print('instances: {:d}'.format(count))
+    print('{:>10s} {:>8s} {:>8s}'.format('class', 'dict', 'slots'))
+    for name, cls in models.items():
+        value = sample(cls)
+        regular = measure(value, count)
+        classes[name] = compact(cls)
+        slotted = measure(value, count)
+        classes[name] = cls
+        print('{:>10s} {:>8.0f} {:>8.0f}'.format(name, regular, slotted))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:2]))
@@ -0,0 +1,122 @@
+#!/usr/bin/python3
+
+"""
+Benchmarks a parallel reload of file.json against FileStorage.reload()
+The file (one record per line, as saved by FileStorage) is cut at the
+lines starting a record, 1, 2, 4 and 8 forked processes parse and
+validate the ranges and the main process builds and stores the objects
+The records sent back by the workers cost about as much to unpickle as
+to parse, and the objects can only be built in the main process, so
+this doesn't beat a single process and FileStorage doesn't do it: run
+this on the target machine before reconsidering
+usage: python3 -m benchmarks.parallel [records]
+"""
+
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from benchmarks.reload import generate
+from models.engine.file_storage import FileStorage, build, classes
+
+
+def boundaries(path, parts):
+    """
+    Cuts a JSON file in parts ranges of about the same length, at lines
+    starting with a key
+    Return:
+        (list): (start, end) offsets of each range
+    """
+    length = os.path.getsize(path)
+    cuts = [0]
+    with open(path, mode='rb') as j_file:
+        for i in range(1, parts):
+            j_file.seek(max(length * i // parts, cuts[-1]))
+            j_file.readline()
+            while True:
+                pos = j_file.tell()
+                line = j_file.readline()
+                if not line or line.startswith(b'"'):
+                    break
+            if not line:
+                break
+            if pos > cuts[-1]:
+                cuts.append(pos)
+    cuts.append(length)
+    return list(zip(cuts, cuts[1:]))
+
+
+def read_range(path, start, end):
+    """
+    Parses and validates the records of a JSON file between the offsets
+    start and end
+    Return:
+        (list): class name and attributes of each record
+    """
+    with open(path, mode='rb') as j_file:
+        j_file.seek(start)
+        text = j_file.read(end - start).decode('utf-8').strip()
+    if start == 0:
+        text = text[1:]
+    if end == os.path.getsize(path):
+        text = text[:-1]
+    text = text.rstrip().rstrip(',')
+    result = []
+    for key, value in json.loads('{' + text + '}').items():
+        if value.get('__class__') not in classes:
+            raise ValueError('invalid record {}'.format(key))
+        for attr in ('created_at', 'updated_at'):
+            value[attr] = datetime.fromisoformat(value[attr])
+        result.append((value.pop('__class__'), value))
+    return result
+
+
+def reload(storage, path, workers):
+    """Reloads path into storage with the ranges parsed by workers
+    processes"""
+    parts = boundaries(path, workers)
+    context = multiprocessing.get_context('fork')
+    with ProcessPoolExecutor(workers, mp_context=context) as pool:
+        for records in pool.map(read_range, *zip(*((path, start, end)
+                                                   for start, end in parts))):
+            for name, attrs in records:
+                storage.new(build(name, attrs))
+
+
+def main(count=1000000, workers=(1, 2, 4, 8)):
+    """Prints the reload time of count records in one process, then with
+    each number of workers and its speedup"""
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, 'file.json')
+        generate(path, count)
+        storage = FileStorage(path)
+        storage.clean()
+        storage.reload()
+        storage.save()
+        storage.clean()
+        print('records: {:d}, file: {:.1f} MB, cpus: {}'.format(
+            count, os.path.getsize(path) / 1e6, os.cpu_count()))
+        start = time.perf_counter()
+        storage.reload()
+        base = time.perf_counter() - start
+        print('reload():    {:.3f}s'.format(base))
+        for n in workers:
+            storage.clean()
+            start = time.perf_counter()
+            reload(storage, path, n)
+            seconds = time.perf_counter() - start
+            print('workers: {:d}  {:.3f}s  speedup: {:.2f}x'.format(
+                n, seconds, base / seconds))
+        storage.clean()
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:2]))
@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+
+"""
+Benchmarks FileStorage.reload() against building objects through __init__
+usage: python3 -m benchmarks.reload [records]
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from models.engine.file_storage import FileStorage, classes
+
+
+def generate(path, count):
+    """
+    Writes count records, spread over every class, in the file.json format
+    Attr:
+        path (str): path of the file to write
+        count (int): number of records
+    """
+    names = list(classes)
+    now = datetime.now().isoformat()
+    with open(path, mode='w', encoding='utf-8') as j_file:
+        j_file.write('{')
+        for i in range(count):
+            name = names[i % len(names)]
+            uid = str(uuid.uuid4())
+            value = {'id': uid, 'created_at': now, 'updated_at': now,
+                     'name': name, 'number': i, '__class__': name}
+            if i:
+                j_file.write(', ')
+            j_file.write('{}: {}'.format(json.dumps(name + '.' + uid),
+                                         json.dumps(value)))
+        j_file.write('}')
+
+
+def legacy(path):
+    """Reloads path through __init__ like reload() used to"""
+    with open(path, mode='r', encoding='utf-8') as j_file:
+        data = json.loads(j_file.read())
+    objects = {}
+    for key, value in data.items():
+        objects[key] = classes[value['__class__']](**value)
+    return objects
+
+
+def main(count=1000000):
+    """Prints the load time of count records with both paths"""
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, 'file.json')
+        generate(path, count)
+        print('records: {:d}, file: {:.1f} MB'.format(
+            count, os.path.getsize(path) / 1e6))
+        start = time.perf_counter()
+        legacy(path)
+        print('__init__: {:.3f}s'.format(time.perf_counter() - start))
+        storage = FileStorage(path)
+        storage.clean()
+        start = time.perf_counter()
+        storage.reload()
+        print('reload(): {:.3f}s'.format(time.perf_counter() - start))
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:2]))
@@ -0,0 +1,57 @@
+#!/usr/bin/python3
+
+"""
+Benchmarks save/reload time and file size of the JSON and binary
+snapshot formats of FileStorage
+usage: python3 -m benchmarks.snapshot [records]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from benchmarks.reload import generate
+from models.engine.file_storage import FileStorage
+
+
+def measure(storage, objects):
+    """
+    Saves objects with storage then reloads them
+    Return:
+        (tuple): save time, reload time
+    """
+    storage.clean()
+    for obj in objects:
+        storage.new(obj)
+    start = time.perf_counter()
+    storage.save()
+    saved = time.perf_counter() - start
+    storage.clean()
+    start = time.perf_counter()
+    storage.reload()
+    return saved, time.perf_counter() - start
+
+
+def main(count=100000):
+    """Prints the save/reload times and file sizes of both formats"""
+    tmp = tempfile.mkdtemp()
+    try:
+        source = os.path.join(tmp, 'source.json')
+        generate(source, count)
+        storage = FileStorage(source)
+        storage.clean()
+        storage.reload()
+        objects = list(storage.all().values())
+        print('records: {:d}'.format(count))
+        for name, binary in (('json', False), ('binary', True)):
+            path = os.path.join(tmp, 'file.' + name)
+            saved, loaded = measure(FileStorage(path, binary=binary), objects)
+            print('{:>6s}: save {:.3f}s, reload {:.3f}s, {:.1f} MB'.format(
+                name, saved, loaded, os.path.getsize(path) / 1e6))
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:2]))
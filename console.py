@@ -4,18 +4,42 @@
 A module that defines the command line interpreter for AirBnB project
 """
 
+import os
 import re
+import sys
 import cmd
+import csv
 import json
+import time
 import shlex
-from models import storage
-from models.user import User
-from models.city import City
-from models.place import Place
-from models.state import State
-from models.review import Review
-from models.amenity import Amenity
-from models.base_model import BaseModel
+import argparse
+from collections import namedtuple
+from datetime import datetime
+from itertools import islice
+from models import stats, storage
+from models.engine.file_storage import classes
+
+Command = namedtuple('Command', ['name', 'arg', 'args', 'line'])
+"""A parsed command line: command name, argument string, arguments as
+split by shlex.split (None if they can't be split), and line as
+recorded by cmd.Cmd"""
+
+DOTTED = re.compile(r'([^(]*)\((.*?)\)')
+CURLY = re.compile(r'\{(.*?)\}')
+SIMPLE = re.compile(r'[ \t\r\n]*(?:(?:"[^"\\]*"|\'[^\'\\]*\'|[^ \t\r\n"\'\\]+)'
+                    r'(?:[ \t\r\n]+|\Z))*')
+TOKEN = re.compile(r'"([^"\\]*)"|\'([^\'\\]*)\'|([^ \t\r\n"\'\\]+)')
+
+
+def split(arg):
+    """Splits arg like shlex.split
+    Arguments that are words or quoted strings, separated by spaces, are
+    split with a precompiled pattern, shlex handles the others (escapes,
+    quotes within a word, unbalanced quotes)
+    """
+    if SIMPLE.fullmatch(arg):
+        return [a or b or c for a, b, c in TOKEN.findall(arg)]
+    return shlex.split(arg)
 
 
 class HBNBCommand(cmd.Cmd):
@@ -23,23 +47,40 @@ class HBNBCommand(cmd.Cmd):
     Entry point of the command line interpreter
     """
     prompt = '(hbnb) '
-    __classes = {
-        'User': User,
-        'City': City,
-        'Place': Place,
-        'State': State,
-        'Review': Review,
-        'Amenity': Amenity,
-        'BaseModel': BaseModel
-    }
+    __classes = classes
+    __command = None
 
     def parseline(self, line):
         """Parse the line into a command name and a string containing
         the arguments.  Returns a tuple containing (command, args, line).
         'command' and 'args' may be None if the line couldn't be parsed.
+        The parsed command is kept, so that its arguments are split once
+        """
+        command = self.__command = self.parse(line)
+        return command.name, command.arg, command.line
+
+    def parse(self, line):
+        """Parses a line of either syntax, <command> [<arg> ...] or
+        <Model>.<command>(<arg>, ...), in a single pass
+        Return:
+            (Command): the parsed command
+        """
+        name, arg, line = super().parseline(self.__parseline(line))
+        try:
+            args = split(arg) if arg else []
+        except ValueError:
+            args = None
+        return Command(name, arg, args, line)
+
+    def __split(self, arg):
+        """Returns the arguments of a command, the ones of the parsed
+        command when arg is its argument string
         """
-        line = self.__parseline(line)
-        return super().parseline(line)
+        command = self.__command
+        if command is not None and command.args is not None and \
+                command.arg == arg:
+            return list(command.args)
+        return split(arg)
 
     def emptyline(self):
         """Overrides parent method
@@ -51,7 +92,7 @@ class HBNBCommand(cmd.Cmd):
         """usage: create <Model>
         Creates an instance of Model
         """
-        args = shlex.split(arg)
+        args = self.__split(arg)
         self.__validateArgs('create', args)
         if len(args) > 0 and args[0] in self.__classes:
             newBaseModel = self.__classes[args[0]]
@@ -63,99 +104,292 @@ class HBNBCommand(cmd.Cmd):
         """usage: show <Model> <id>
         Shows an obj of type Model with id
         """
-        args = shlex.split(arg)
-        result = self.__validateArgs('show', args)
-        if type(result) == list:
-            [objs, key] = result
-            print(objs.get(key, ''))
+        args = self.__split(arg)
+        obj = self.__validateArgs('show', args)
+        if obj is not None:
+            print(obj)
 
     def do_destroy(self, arg):
         """usage: destroy <Model> <id>
         Deletes an obj of type Model with id
         """
-        args = shlex.split(arg)
-        result = self.__validateArgs('destroy', args)
-        if type(result) == list:
-            [objs, key] = result
-            objs.pop(key, None)
+        args = self.__split(arg)
+        obj = self.__validateArgs('destroy', args)
+        if obj is not None:
+            storage.delete(obj)
             storage.save()
 
     def __all(self, arg):
-        """Prints all string representation of
-        all instances based or not on the class name
+        """Validates the optional class name given to all/count
         Attr:
             arg (str): string or arguments
+        Return:
+            (list): [<class name>], or [] if no class name was given
+            None: if the class doesn't exist
         """
-        args = shlex.split(arg)
-        model = None
+        args = self.__split(arg)
         if len(args) > 0:
             if not (self.__classes.get(args[0], None)):
                 return print('** class doesn\'t exist **')
-            model = args[0]
-        obList = [str(v) for v in (storage.all()).values()]
-        if model:
-            match = '[{}]'.format(model)
-            obList = list(filter(lambda s: s.startswith(match), obList))
-        return (obList)
+            return args[:1]
+        return []
 
     def do_all(self, arg):
         """usage: all [Model] | <Model>.all()
         Prints all instances (of Model only if specified)
         """
-        hall = self.__all(arg)
-        if hall is not None:
-            print(hall)
+        model = self.__all(arg)
+        if model is not None:
+            objs = storage.all(*model).values()
+            print('[', end='')
+            for i, obj in enumerate(objs):
+                print(', ' if i else '', repr(str(obj)), sep='', end='')
+            print(']')
 
     def do_count(self, arg):
         """usage: <Model>.count()
         Prints the number of instances of Model
         """
-        count = self.__all(arg)
-        if count is not None:
-            print(len(count))
+        model = self.__all(arg)
+        if model is not None:
+            print(storage.count(*model))
+
+    def do_where(self, arg):
+        """usage: where <Model> [<field>[__<op>]=<value> ...] [only=<fields>]
+        [limit=<n>] [offset=<n>]
+        or <Model>.where(<field>[__<op>]=<value>, ...)
+        Prints the instances of Model matching every filter, op is one of
+        eq, ne, lt, lte, gt, gte, in; only= prints these fields only
+        """
+        args = self.__split(arg)
+        if len(args) < 1:
+            return print('** class name missing **')
+        if not (self.__classes.get(args[0], None)):
+            return print('** class doesn\'t exist **')
+        query = storage.query(args[0])
+        for param in args[1:]:
+            key, sep, value = param.partition('=')
+            if not sep or not key:
+                return print('** invalid filter **')
+            if key == 'only':
+                query = query.only(*re.split(r'[ ,]+', value.strip(' ,')))
+                continue
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+            if key in ('limit', 'offset'):
+                if type(value) is not int or value < 0:
+                    return print('** invalid filter **')
+                query = getattr(query, key)(value)
+            else:
+                query = query.filter(**{key: value})
+        print('[', end='')
+        for i, obj in enumerate(query):
+            text = repr(obj) if type(obj) is dict else repr(str(obj))
+            print(', ' if i else '', text, sep='', end='')
+        print(']')
+
+    def __validateFile(self, model, path):
+        """Validates the arguments of import/export
+        Attr:
+            model (str): class name
+            path (str): path of the file
+        Return:
+            (bool): True if the arguments are valid
+        """
+        if not model:
+            return print('** class name missing **')
+        if not (self.__classes.get(model, None)):
+            return print('** class doesn\'t exist **')
+        if not path:
+            return print('** file name missing **')
+        return True
+
+    def do_import(self, arg):
+        """usage: import <Model> <file>
+        Creates an instance of Model from each record of file, JSON Lines
+        or CSV (.csv) with a header line, saved in a single write
+        """
+        args = self.__split(arg) + ['', '']
+        if not self.__validateFile(*args[:2]):
+            return
+        model, path = args[:2]
+        cls = self.__classes[model]
+        start = time.perf_counter()
+        objs = []
+        try:
+            with open(path, newline='') as file:
+                if path.endswith('.csv'):
+                    records = (self.__decode(record)
+                               for record in csv.DictReader(file))
+                else:
+                    records = (json.loads(line) for line in file
+                               if line.strip())
+                for number, record in enumerate(records, 1):
+                    try:
+                        if record.get('__class__', model) != model:
+                            raise ValueError(record['__class__'])
+                        obj = cls(**record)
+                        if not isinstance(obj.id, str) or not all(
+                                isinstance(getattr(obj, attr), datetime)
+                                for attr in ('created_at', 'updated_at')):
+                            raise ValueError(obj.id)
+                        objs.append(obj)
+                    except (AttributeError, TypeError, ValueError):
+                        return print('** invalid record {} **'.format(number))
+        except OSError:
+            return print('** can\'t read file **')
+        except ValueError:
+            return print('** invalid record {} **'.format(len(objs) + 1))
+        with storage.batch():
+            for obj in objs:
+                storage.new(obj)
+            storage.save()
+        self.__throughput(len(objs), 'imported', start)
+
+    def do_export(self, arg):
+        """usage: export <Model> <file>
+        Writes every instance of Model to file, one JSON object per line,
+        or as CSV with a header line if file ends with .csv
+        """
+        args = self.__split(arg) + ['', '']
+        if not self.__validateFile(*args[:2]):
+            return
+        model, path = args[:2]
+        start = time.perf_counter()
+        count = 0
+        try:
+            with open(path, 'w', newline='') as file:
+                if path.endswith('.csv'):
+                    fields = {}
+                    for obj in storage.query(model):
+                        fields.update(dict.fromkeys(obj.to_dict()))
+                    writer = csv.DictWriter(file, list(fields))
+                    writer.writeheader()
+                for obj in storage.query(model):
+                    record = obj.to_dict()
+                    if path.endswith('.csv'):
+                        writer.writerow(self.__encode(record))
+                    else:
+                        file.write(json.dumps(record) + '\n')
+                    count += 1
+        except OSError:
+            return print('** can\'t write file **')
+        self.__throughput(count, 'exported', start)
+
+    @staticmethod
+    def __encode(record):
+        """Returns a CSV row: values other than strings are JSON encoded,
+        and so are the strings __decode wouldn't read back as they are
+        (empty, or valid JSON such as "12345", "true" or '"Bob"')
+        """
+        row = {}
+        for key, value in record.items():
+            if type(value) is not str:
+                value = json.dumps(value)
+            elif key not in ('id', 'created_at', 'updated_at', '__class__'):
+                try:
+                    json.loads(value)
+                except ValueError:
+                    if value == '':
+                        value = '""'
+                else:
+                    value = json.dumps(value)
+            row[key] = value
+        return row
+
+    @staticmethod
+    def __decode(row):
+        """Returns the record of a CSV row: empty cells are dropped, and
+        values which are valid JSON (numbers, lists...) decoded, apart
+        from id and the dates
+        """
+        record = {}
+        for key, value in row.items():
+            if key is None or value is None or value == '':
+                continue
+            if key not in ('id', 'created_at', 'updated_at', '__class__'):
+                try:
+                    value = json.loads(value)
+                except ValueError:
+                    pass
+            record[key] = value
+        return record
 
-    def __updateMePlease(self, obj, args):
+    @staticmethod
+    def __throughput(count, action, start):
+        """Prints the number of records handled per second since start"""
+        elapsed = time.perf_counter() - start
+        print('{} records {} in {:.3f}s ({:.0f} records/s)'.format(
+            count, action, elapsed, count / elapsed if elapsed else 0))
+
+    def do_stats(self, arg):
+        """usage: stats [reset | dump <file>]
+        Prints the number of calls and the durations of the storage
+        methods, to_dict and the commands, resets them, or writes them
+        to file as JSON. Needs HBNB_STATS=1 or console.py --stats
+        """
+        if not stats.enabled:
+            return print('** stats are disabled **')
+        args = self.__split(arg)
+        if not args:
+            print(stats.report())
+        elif args[0] == 'reset':
+            stats.reset()
+        elif args[0] == 'dump':
+            if len(args) < 2:
+                return print('** file name missing **')
+            try:
+                stats.dump(args[1])
+            except OSError:
+                return print('** can\'t write file **')
+        else:
+            print('** invalid argument **')
+
+    def __updateMePlease(self, obj, params):
         """Checks if update inputs are valid
         Attr:
             obj (BaseModel): instance to be updated
-            args (list): list of passed arguments
+            params (dict): attributes to update
         Return:
             (str): error message
             (None): if no parameters are valid and all set.
         """
-        args = (args).replace("'", '"')
-        try:
-            params = json.loads(args)
-        except Exception:
-            params = {"None": "None"}
-        for key, value in params.items():
-            if key == "None":
-                return print('** attribute name missing **')
-            if value == "None":
-                return print('** value missing **')
-            if len(key) > 0:
-                setattr(obj, key, value)
-                obj.save()
+        with storage.batch():
+            for key, value in params.items():
+                if key == "None":
+                    return print('** attribute name missing **')
+                if value == "None":
+                    return print('** value missing **')
+                attr = getattr(type(obj), key, None)
+                if isinstance(attr, property) and attr.fset is None:
+                    return print('** attribute can\'t be set **')
+                if len(key) > 0:
+                    setattr(obj, key, value)
+                    obj.save()
 
     def do_update(self, arg):
         """usage: update <Model> <id> <field> <value>
         or <Model>.update(<id>, ["<field>", "<value>] | [{<field>: <value>}])
         Updates field to value of an obj of type Model with id
         """
-        args = shlex.split(arg)
-        result = self.__validateArgs('update', args)
-        if type(result) != list:
+        args = self.__split(arg)
+        obj = self.__validateArgs('update', args)
+        if obj is None:
             return
-        [objs, key] = result
         newargs = args + ['None', 'None', 'None']
         [three, four] = newargs[2:4]
         if three.startswith('{') and three.endswith('}'):
-            newargs[2] = three
+            try:
+                params = json.loads(three.replace("'", '"'))
+            except ValueError:
+                params = {"None": "None"}
+        elif four.isascii() and four.isdigit():
+            params = {three: int(four)}
         else:
-            four = four if four.isnumeric() else '"{}"'.format(four)
-            newargs[2] = '{"' + three + '": ' + four + '}'
-        obj = objs.get(key, None)
-        self.__updateMePlease(obj, newargs[2])
+            params = {three: four}
+        self.__updateMePlease(obj, params)
 
     def do_quit(self, arg):
         """Quit command to exit the program"""
@@ -165,14 +399,43 @@ class HBNBCommand(cmd.Cmd):
         """Exits the interpreter"""
         return True
 
+    def run_batch(self, lines, every=1000):
+        """Runs the commands of a script with deferred persistence
+        The saves made by the commands are held in storage.batch() and
+        flushed once every `every` commands and at the end, instead of
+        once per command. quit and EOF stop the script
+        Attr:
+            lines (iterable): command lines
+            every (int): number of commands between two flushes
+        Return:
+            (int): number of commands run
+        """
+        lines = iter(lines)
+        count = 0
+        stop = False
+        self.preloop()
+        while not stop:
+            chunk = list(islice(lines, every))
+            if not chunk:
+                break
+            with storage.batch():
+                for line in chunk:
+                    line = self.precmd(line.rstrip('\r\n'))
+                    count += 1
+                    stop = self.postcmd(self.onecmd(line), line)
+                    if stop:
+                        break
+        self.postloop()
+        return count
+
     def __validateArgs(self, query, args):
         """Validates given parameters
         Attr:
             query (str): action to be performed
             args (list): list of parameters
         Return:
-            None: on valid inputs
-            (str): on invalid inputs
+            (BaseModel): instance with the given id for destroy/show/update
+            None: on invalid inputs, and on valid create inputs
         """
         actions = ['create', 'destroy', 'show', 'update']
         if len(args) < 1:
@@ -182,10 +445,9 @@ class HBNBCommand(cmd.Cmd):
         if query in actions[1:]:
             if len(args) < 2:
                 return print('** instance id missing **')
-            key = '.'.join(args[:2])
-            objs = storage.all()
-            if objs.get(key, None):
-                return [objs, key]
+            obj = storage.get(args[0], args[1])
+            if obj is not None:
+                return obj
             return print('** no instance found **')
         return None
 
@@ -194,25 +456,59 @@ class HBNBCommand(cmd.Cmd):
         <Model>.<action>([[*args], [**kwargs]]) to native formats
         """
         newLine = line.strip()
-        args = re.search(r'\(.*?\)', newLine)
+        args = DOTTED.match(newLine)
         if args is not None:
-            params = args.group().strip('()')
-            curls = re.search(r'\{(.*?)\}', params)
+            params = args.group(2).strip('()')
+            curls = CURLY.search(params)
             if curls:
                 items = curls.group()
                 try:
-                    uid = shlex.split(params[:curls.span()[0]])[0].strip(",")
+                    uid = split(params[:curls.start()])[0].strip(",")
                 except IndexError:
                     uid = ""
                 newargs = '{} \'{}\''.format(uid, items.replace("'", '"'))
             else:
-                newargs = params.split(',')
-                newargs = " ".join(newargs) or ""
-            action = shlex.split(newLine[:args.span()[0]])[0].split(".")
+                newargs = " ".join(params.split(','))
+            action = split(args.group(1))[:1]
+            action = action[0].split(".") if action else action
             if len(action) == 2:
                 line = "{} {} {}".format(action[1], action[0], newargs.strip())
         return line
 
 
+def main(argv=None):
+    """Runs the interpreter: interactive on a terminal, in batch mode
+    on a script given with --batch or piped to stdin
+    The batch throughput is reported on stderr
+    """
+    parser = argparse.ArgumentParser(description='AirBnB console')
+    parser.add_argument('--batch', metavar='SCRIPT',
+                        help='run the commands of SCRIPT and exit')
+    parser.add_argument('--every', metavar='N', type=int, default=1000,
+                        help='flush the storage every N commands in batch '
+                        'mode (default: 1000)')
+    parser.add_argument('--stats', action='store_true',
+                        help='time the storage, models and commands, see '
+                        'the stats command (or set HBNB_STATS=1)')
+    args = parser.parse_args(argv)
+    if args.every < 1:
+        parser.error('--every must be a positive number')
+    if args.stats or os.getenv('HBNB_STATS') == '1':
+        stats.enable(storage)
+        stats.instrument(HBNBCommand, [name for name in dir(HBNBCommand)
+                                       if name.startswith('do_')])
+    if args.batch is None and sys.stdin.isatty():
+        return HBNBCommand().cmdloop()
+    start = time.perf_counter()
+    if args.batch is None:
+        count = HBNBCommand().run_batch(sys.stdin, args.every)
+    else:
+        with open(args.batch) as script:
+            count = HBNBCommand().run_batch(script, args.every)
+    elapsed = time.perf_counter() - start
+    print('{} commands in {:.3f}s ({:.0f} commands/s)'.format(
+        count, elapsed, count / elapsed if elapsed else 0), file=sys.stderr)
+
+
 if __name__ == '__main__':
-    HBNBCommand().cmdloop()
+    main()
@@ -4,6 +4,7 @@
 __init__ for model package
 """
 
+from os import getenv
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
@@ -11,7 +12,26 @@ from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
-from models.engine.file_storage import FileStorage
+from models.engine.file_storage import FileStorage, classes
 
-storage = FileStorage()
+if getenv('HBNB_COMPACT_MODELS') == '1':
+    from models.compact_model import compact
+    classes.update({k: compact(v) for k, v in classes.items()})
+if getenv('HBNB_TYPE_STORAGE') == 'mmap':
+    from models.engine.mmap_storage import MmapStorage
+    storage = MmapStorage()
+elif getenv('HBNB_TYPE_STORAGE') == 'db':
+    from models.engine.db_storage import DBStorage
+    storage = DBStorage()
+elif getenv('HBNB_TYPE_STORAGE') == 'column':
+    from models.engine.column_storage import ColumnStorage
+    storage = ColumnStorage()
+else:
+    storage = FileStorage(journal=getenv('HBNB_FILE_JOURNAL') == '1',
+                          lazy=getenv('HBNB_FILE_LAZY') == '1',
+                          binary=getenv('HBNB_FILE_BINARY') == '1',
+                          shards=int(getenv('HBNB_FILE_SHARDS', 0)))
+if getenv('HBNB_STATS') == '1':
+    from models import stats
+    stats.enable(storage)
 storage.reload()
@@ -1,5 +1,7 @@
 #!/usr/bin/python3
 from datetime import datetime
+from itertools import count
+import json
 import models
 import uuid
 """
@@ -8,12 +10,32 @@ with all common attributes/method for other classes
 """
 
 
+clock = count(1)
+
+
+def mutable(attrs):
+    """Tells if attrs (the __dict__ of an instance) holds a list or a
+    dictionary, which can change in place without stamping the instance,
+    so its serialized forms aren't cached"""
+    return any(isinstance(value, (list, dict)) for value in attrs.values())
+
+
 class BaseModel():
     """
     A base class for other classes
     defines all attributes/method
     all subclasses could inherit from
+    _changed (slot, so it's not part of __dict__) holds the stamp of the
+    last change made to the attributes, 0 for an instance loaded from
+    the storage and left as is; the storage itself is told of the
+    changes by touch()
+    _cache (slot) holds the to_dict() dictionary and JSON text of the
+    instance as (dict, bytes), either one None until it's computed,
+    dropped whenever an attribute changes; nothing is cached for an
+    instance holding a list or a dictionary (see mutable)
     """
+    __slots__ = ('__dict__', '_changed', '_cache')
+
     def __init__(self, *args, **kwargs):
         """
         A class constructor
@@ -24,8 +46,6 @@ class BaseModel():
         using iteration
         self.kwargs[key] = value
         """
-        self.number = 0
-        self.name = type(self).__name__
         self.updated_at = datetime.now()
         self.id = str(uuid.uuid4())
         self.created_at = datetime.now()
@@ -35,17 +55,39 @@ class BaseModel():
                 if key == '__class__':
                     continue
                 if key == 'created_at' or key == 'updated_at':
-                    value = datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%f')
+                    value = datetime.fromisoformat(value)
                 setattr(self, key, value)
 
         else:
             models.storage.new(self)
 
+    def __setattr__(self, name, value):
+        """Sets an attribute, stamps the change and drops the cached
+        serialized forms, the storage is told (touch) so it saves the
+        instance and reindexes its foreign keys"""
+        object.__setattr__(self, name, value)
+        object.__setattr__(self, '_changed', next(clock))
+        object.__setattr__(self, '_cache', None)
+        touch = getattr(getattr(models, 'storage', None), 'touch', None)
+        if touch is not None:
+            touch(self, name)
+
+    def __delattr__(self, name):
+        """Deletes an attribute, stamps the change and drops the cached
+        serialized forms, the storage is told (touch)"""
+        object.__delattr__(self, name)
+        object.__setattr__(self, '_changed', next(clock))
+        object.__setattr__(self, '_cache', None)
+        touch = getattr(getattr(models, 'storage', None), 'touch', None)
+        if touch is not None:
+            touch(self, name)
+
     def save(self):
         """A base class that updates the \"self.updated_at\"
         to the current time when the object was saved
         """
         self.updated_at = datetime.now()
+        models.storage.update(self)
         models.storage.save()
 
     def to_dict(self):
@@ -56,13 +98,34 @@ class BaseModel():
         A key __class__ added
         Created_at and Updated_at:
             converted to string object in ISO format using .isoformat()
+        The dictionary is cached until an attribute changes,
+        a copy of it is returned
+        """
+        cache = getattr(self, '_cache', None)
+        if cache is None or cache[0] is None:
+            new_dict = self.__dict__.copy()
+            new_dict['__class__'] = type(self).__name__
+            new_dict['updated_at'] = self.updated_at.isoformat()
+            new_dict['created_at'] = self.created_at.isoformat()
+            if mutable(new_dict):
+                return new_dict
+            cache = (new_dict, cache[1] if cache else None)
+            object.__setattr__(self, '_cache', cache)
+        return cache[0].copy()
+
+    def to_json(self):
+        """
+        Returns the JSON text (bytes, UTF-8) of to_dict(), as written by
+        the storage, cached until an attribute changes
         """
-        new_dict = self.__dict__.copy()
-        new_dict['name'] = self.name
-        new_dict['__class__'] = self.name
-        new_dict['updated_at'] = self.updated_at.isoformat()
-        new_dict['created_at'] = self.created_at.isoformat()
-        return new_dict
+        cache = getattr(self, '_cache', None)
+        if cache is None or cache[1] is None:
+            new_dict = self.to_dict()
+            if self._cache is None:
+                return json.dumps(new_dict).encode('utf-8')
+            cache = (self._cache[0], json.dumps(new_dict).encode('utf-8'))
+            object.__setattr__(self, '_cache', cache)
+        return cache[1]
 
     def __str__(self):
         """String representation of the BaseModel class"""
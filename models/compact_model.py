@@ -0,0 +1,208 @@
+#!/usr/bin/python3
+"""
+A module that defines compact variants of the model classes,
+storing their attributes in __slots__ instead of a per-instance __dict__
+"""
+import models
+from models.base_model import BaseModel, clock
+
+
+class Attributes:
+    """
+    Dictionary-like view of the attributes of a compact instance,
+    given as its __dict__ so code reading or updating __dict__ works
+    """
+    __slots__ = ('__obj',)
+
+    def __init__(self, obj):
+        """
+        Attr:
+            obj (CompactModel): viewed instance
+        """
+        self.__obj = obj
+
+    def __iter__(self):
+        """Iterates over the names of the set attributes"""
+        return iter(self.copy())
+
+    def __len__(self):
+        """Number of set attributes"""
+        return len(self.copy())
+
+    def __contains__(self, key):
+        """Tells if the attribute key is set on the instance"""
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __getitem__(self, key):
+        """Returns the attribute key set on the instance"""
+        obj = self.__obj
+        if key in type(obj)._schema:
+            try:
+                return object.__getattribute__(obj, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if obj._extra and key in obj._extra:
+            return obj._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        """Sets the attribute key"""
+        setattr(self.__obj, key, value)
+
+    def __delitem__(self, key):
+        """Deletes the attribute key"""
+        delattr(self.__obj, key)
+
+    def __eq__(self, other):
+        """Compares the attributes with a dictionary"""
+        return self.copy() == other
+
+    def __repr__(self):
+        """Same representation as a __dict__"""
+        return repr(self.copy())
+
+    def keys(self):
+        """Names of the set attributes"""
+        return self.copy().keys()
+
+    def values(self):
+        """Values of the set attributes"""
+        return self.copy().values()
+
+    def items(self):
+        """Names and values of the set attributes"""
+        return self.copy().items()
+
+    def get(self, key, default=None):
+        """Returns the attribute key, or default if it's not set"""
+        return self.copy().get(key, default)
+
+    def update(self, attrs=(), **kwargs):
+        """Sets several attributes"""
+        for key, value in dict(attrs, **kwargs).items():
+            setattr(self.__obj, key, value)
+
+    def copy(self):
+        """Returns the set attributes as a dictionary"""
+        obj = self.__obj
+        attrs = {}
+        for key in type(obj)._schema:
+            if CompactModel.is_set(obj, key):
+                attrs[key] = object.__getattribute__(obj, key)
+        if obj._extra:
+            attrs.update(obj._extra)
+        return attrs
+
+
+class CompactModel:
+    """
+    Base class of the compact variants built by compact()
+    id, timestamps and the class attributes of the model are slots,
+    other attributes (set by update) go in an overflow dictionary
+    created on first use, unset slots read as the model's defaults
+    _changed and _cache stamp the changes and cache the serialized
+    forms like on BaseModel
+    """
+    __slots__ = ('id', 'created_at', 'updated_at', '_extra', '_changed',
+                 '_cache')
+    _schema = ('id', 'created_at', 'updated_at')
+    _defaults = {}
+
+    __init__ = BaseModel.__init__
+    save = BaseModel.save
+    to_dict = BaseModel.to_dict
+    to_json = BaseModel.to_json
+    __str__ = BaseModel.__str__
+
+    @staticmethod
+    def is_set(obj, key):
+        """Tells if the slot key of obj holds a value"""
+        try:
+            object.__getattribute__(obj, key)
+        except AttributeError:
+            return False
+        return True
+
+    @property
+    def __dict__(self):
+        """The attributes of the instance, as a dictionary view"""
+        return Attributes(self)
+
+    def __getattr__(self, key):
+        """Looks up attributes that aren't in a set slot"""
+        if key in ('_extra', '_cache'):
+            return None
+        if key == '_changed':
+            return 0
+        extra = self._extra
+        if extra and key in extra:
+            return extra[key]
+        try:
+            return type(self)._defaults[key]
+        except KeyError:
+            raise AttributeError("'{}' object has no attribute '{}'".format(
+                type(self).__name__, key)) from None
+
+    def __setattr__(self, key, value):
+        """Sets a slot, or an entry of the overflow dictionary"""
+        try:
+            object.__setattr__(self, key, value)
+        except AttributeError:
+            if self._extra is None:
+                object.__setattr__(self, '_extra', {})
+            self._extra[key] = value
+        object.__setattr__(self, '_changed', next(clock))
+        object.__setattr__(self, '_cache', None)
+        touch = getattr(getattr(models, 'storage', None), 'touch', None)
+        if touch is not None:
+            touch(self, key)
+
+    def __delattr__(self, key):
+        """Deletes a slot value or an overflow attribute"""
+        try:
+            object.__delattr__(self, key)
+        except AttributeError:
+            if not self._extra or key not in self._extra:
+                raise
+            del self._extra[key]
+        object.__setattr__(self, '_changed', next(clock))
+        object.__setattr__(self, '_cache', None)
+        touch = getattr(getattr(models, 'storage', None), 'touch', None)
+        if touch is not None:
+            touch(self, key)
+
+
+def compact(cls):
+    """
+    Builds the compact variant of a model class
+    Attr:
+        cls (class): subclass of BaseModel
+    Return:
+        (class): subclass of CompactModel with the same name, methods
+        and default attribute values as cls
+    """
+    defaults = {}
+    namespace = {}
+    for klass in reversed(cls.__mro__[:cls.__mro__.index(BaseModel)]):
+        for key, value in vars(klass).items():
+            if key in ('__dict__', '__weakref__', '__module__', '__doc__',
+                       '__qualname__', '__init__'):
+                continue
+            if key.startswith('_') or callable(value) or \
+                    hasattr(value, '__get__'):
+                namespace[key] = value
+            else:
+                defaults[key] = value
+    namespace.update({
+        '__slots__': tuple(defaults),
+        '__module__': cls.__module__,
+        '__qualname__': cls.__qualname__,
+        '__doc__': cls.__doc__,
+        '_schema': CompactModel._schema + tuple(defaults),
+        '_defaults': defaults
+    })
+    return type(cls.__name__, (CompactModel,), namespace)
@@ -0,0 +1,299 @@
+#!/usr/bin/python3
+
+"""
+A module that reads and writes the binary snapshot format of FileStorage
+
+Instances are grouped by class and stored column by column:
+    b"HBNB" <version: 1 byte>
+    <varint: number of names> (<varint: length> <utf-8>)*
+    <varint: number of classes>
+    per class:
+        <varint: class name index> <varint: rows> <varint: columns>
+        per column:
+            <varint: attribute name index> <encoding: 1 byte>
+            <presence: b"\\x00" all rows | b"\\x01" + 1 byte per row>
+            <values of the present rows>
+Attribute and class names are written once in the name table, the
+encodings of the values are:
+    U: uuid strings as 16 bytes
+    T: naive datetimes as int64 microseconds since 1970-01-01
+    X: other datetimes, as a JSON list of ISO strings
+    I: int64, F: float64
+    S: strings, D: strings with repeats, as a table plus int32 codes
+    J: anything else, as a JSON list
+usage: python3 -m models.engine.binary_snapshot <src> <dst>
+converts file.json to the binary format or back (by <src> extension)
+"""
+
+import json
+import re
+import sys
+from array import array
+from datetime import datetime, timedelta
+
+MAGIC = b"HBNB\x01"
+ABSENT = object()
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+UUID = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-"
+                  r"[0-9a-f]{12}")
+
+
+def _write_varint(b_file, value):
+    """Writes an unsigned int on as few bytes as needed"""
+    out = bytearray()
+    while value > 0x7f:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+    b_file.write(out)
+
+
+def _read_varint(b_file):
+    """Reads an unsigned int written by _write_varint"""
+    value = shift = 0
+    while True:
+        byte = b_file.read(1)
+        if not byte:
+            raise ValueError("Truncated binary snapshot")
+        value |= (byte[0] & 0x7f) << shift
+        if byte[0] < 0x80:
+            return value
+        shift += 7
+
+
+def _write_blob(b_file, data):
+    """Writes bytes prefixed by their length"""
+    _write_varint(b_file, len(data))
+    b_file.write(data)
+
+
+def _read_blob(b_file):
+    """Reads bytes written by _write_blob"""
+    size = _read_varint(b_file)
+    data = b_file.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated binary snapshot")
+    return data
+
+
+def _pack(typecode, values):
+    """Returns values as little endian bytes of an array"""
+    data = array(typecode, values)
+    if sys.byteorder == "big":
+        data.byteswap()
+    return data.tobytes()
+
+
+def _unpack(typecode, data):
+    """Returns the array packed by _pack"""
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _encoding(values):
+    """Picks the encoding of a column from the types of its values"""
+    kinds = set(map(type, values))
+    if kinds == {str}:
+        if all(map(UUID.fullmatch, values)):
+            return "U"
+        return "D" if len(set(values)) * 2 <= len(values) else "S"
+    if kinds == {datetime}:
+        return "T" if all(v.tzinfo is None for v in values) else "X"
+    if kinds == {int}:
+        if all(-2 ** 63 <= v < 2 ** 63 for v in values):
+            return "I"
+    if kinds == {float}:
+        return "F"
+    return "J"
+
+
+def _encode(encoding, values):
+    """Returns the bytes of the values of a column"""
+    if encoding == "U":
+        return bytes.fromhex("".join(values).replace("-", ""))
+    if encoding == "T":
+        return _pack("q", [(v - EPOCH) // MICROSECOND for v in values])
+    if encoding == "X":
+        return json.dumps([v.isoformat() for v in values]).encode("utf-8")
+    if encoding == "I":
+        return _pack("q", values)
+    if encoding == "F":
+        return _pack("d", values)
+    if encoding == "D":
+        table = {}
+        codes = [table.setdefault(v, len(table)) for v in values]
+        return json.dumps(list(table)).encode("utf-8") + b"\n" + \
+            _pack("i", codes)
+    if encoding == "S":
+        data = [v.encode("utf-8") for v in values]
+        return _pack("I", map(len, data)) + b"".join(data)
+    return json.dumps(values).encode("utf-8")
+
+
+def _decode(encoding, data, count):
+    """Returns the values of a column from its bytes"""
+    if encoding == "U":
+        text = data.hex()
+        return ["%s-%s-%s-%s-%s" % (text[i:i + 8], text[i + 8:i + 12],
+                                    text[i + 12:i + 16], text[i + 16:i + 20],
+                                    text[i + 20:i + 32])
+                for i in range(0, len(text), 32)]
+    if encoding == "T":
+        return [EPOCH + timedelta(0, 0, v) for v in _unpack("q", data)]
+    if encoding == "X":
+        return [datetime.fromisoformat(v) for v in json.loads(data)]
+    if encoding == "I":
+        return _unpack("q", data).tolist()
+    if encoding == "F":
+        return _unpack("d", data).tolist()
+    if encoding == "D":
+        end = data.index(b"\n")
+        table = json.loads(data[:end])
+        return [table[i] for i in _unpack("i", data[end + 1:])]
+    if encoding == "S":
+        sizes = _unpack("I", data[:4 * count])
+        values = []
+        pos = 4 * count
+        for size in sizes:
+            values.append(data[pos:pos + size].decode("utf-8"))
+            pos += size
+        return values
+    return json.loads(data)
+
+
+def dump(rows, b_file):
+    """
+    Writes instances in the binary format
+    Attr:
+        rows (iterable): (class name, dictionary of attributes) tuples
+        b_file (file): file opened in binary write mode
+    """
+    tables = {}
+    for name, attrs in rows:
+        tables.setdefault(name, []).append(attrs)
+    names = {}
+    for name, table in tables.items():
+        names.setdefault(name, len(names))
+        for attrs in table:
+            for key in attrs:
+                names.setdefault(key, len(names))
+    b_file.write(MAGIC)
+    _write_varint(b_file, len(names))
+    for name in names:
+        _write_blob(b_file, name.encode("utf-8"))
+    _write_varint(b_file, len(tables))
+    for name, table in tables.items():
+        columns = {}
+        for attrs in table:
+            for key in attrs:
+                columns.setdefault(key, None)
+        _write_varint(b_file, names[name])
+        _write_varint(b_file, len(table))
+        _write_varint(b_file, len(columns))
+        for key in columns:
+            present = bytes(key in attrs for attrs in table)
+            values = [attrs[key] for attrs in table if key in attrs]
+            encoding = _encoding(values)
+            _write_varint(b_file, names[key])
+            b_file.write(encoding.encode("ascii"))
+            if len(values) == len(table):
+                b_file.write(b"\x00")
+            else:
+                b_file.write(b"\x01" + present)
+            _write_blob(b_file, _encode(encoding, values))
+
+
+def load(b_file):
+    """
+    Reads instances written in the binary format
+    Attr:
+        b_file (file): file opened in binary read mode
+    Yield:
+        (tuple): class name and dictionary of attributes of each instance
+    """
+    if b_file.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a binary snapshot")
+    names = [_read_blob(b_file).decode("utf-8")
+             for i in range(_read_varint(b_file))]
+    for i in range(_read_varint(b_file)):
+        name = names[_read_varint(b_file)]
+        count = _read_varint(b_file)
+        keys = []
+        columns = []
+        sparse = False
+        for j in range(_read_varint(b_file)):
+            keys.append(names[_read_varint(b_file)])
+            encoding = b_file.read(1).decode("ascii")
+            present = None
+            if b_file.read(1) == b"\x01":
+                present = b_file.read(count)
+            values = _decode(encoding, _read_blob(b_file),
+                             count if present is None else sum(present))
+            if present is not None:
+                sparse = True
+                values = iter(values)
+                values = [next(values) if p else ABSENT for p in present]
+            columns.append(values)
+        for row in zip(*columns):
+            if sparse:
+                yield name, {k: v for k, v in zip(keys, row)
+                             if v is not ABSENT}
+            else:
+                yield name, dict(zip(keys, row))
+
+
+def json_to_binary(src, dst):
+    """
+    Converts a JSON file written by FileStorage to the binary format
+    Attr:
+        src (str): path of the JSON file
+        dst (str): path of the binary snapshot
+    """
+    from models.engine.file_storage import iter_records
+
+    def rows(j_file):
+        """Yields the records of the JSON file as binary rows"""
+        for key, value in iter_records(j_file):
+            name = value.pop("__class__")
+            for attr in ("created_at", "updated_at"):
+                if attr in value:
+                    value[attr] = datetime.fromisoformat(value[attr])
+            yield name, value
+
+    with open(src, mode="r", encoding="utf-8") as j_file:
+        with open(dst, mode="wb") as b_file:
+            dump(rows(j_file), b_file)
+
+
+def binary_to_json(src, dst):
+    """
+    Converts a binary snapshot to the JSON file format of FileStorage
+    Attr:
+        src (str): path of the binary snapshot
+        dst (str): path of the JSON file
+    """
+    with open(src, mode="rb") as b_file:
+        with open(dst, mode="w", encoding="utf-8") as j_file:
+            j_file.write("{")
+            for i, (name, attrs) in enumerate(load(b_file)):
+                value = {k: v.isoformat() if type(v) is datetime else v
+                         for k, v in attrs.items()}
+                value["__class__"] = name
+                j_file.write("{}\n{}: {}".format(
+                    "," if i else "", json.dumps(name + "." + value["id"]),
+                    json.dumps(value)))
+            j_file.write("\n}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python3 -m models.engine.binary_snapshot "
+                 "<src> <dst>")
+    if sys.argv[1].endswith(".json"):
+        json_to_binary(sys.argv[1], sys.argv[2])
+    else:
+        binary_to_json(sys.argv[1], sys.argv[2])
@@ -0,0 +1,482 @@
+#!/usr/bin/python3
+
+"""
+A module that defines a class ColumnStorage, a storage engine keeping
+the instances of each class as columns instead of Python objects
+"""
+
+import json
+import os
+from array import array
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import compress
+from models.engine.file_storage import build, classes, iter_records
+from models.engine.query import Query
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+TYPECODES = {'q': 'q', 'd': 'd', 't': 'q', 's': 'i'}
+AGGREGATES = {
+    'count': len,
+    'sum': sum,
+    'min': min,
+    'max': max,
+    'avg': lambda values: sum(values) / len(values)
+}
+
+
+class Strings:
+    """
+    Interned string table shared by every column of the storage,
+    ids and the foreign keys pointing to them get the same code
+    """
+
+    def __init__(self):
+        """Starts with an empty table"""
+        self.values = []
+        self.codes = {}
+
+    def code(self, value):
+        """Returns the code of a string, adding it to the table"""
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class Column:
+    """
+    Values of one attribute for every row of a table
+    Kinds:
+        q: int64 array, d: float64 array, t: naive datetimes as int64
+        microseconds since 1970-01-01, s: int32 codes of interned strings,
+        o: list of Python objects (any other type, or mixed types)
+    Rows where the attribute isn't set hold the class default (so
+    aggregates see what the instance would return) and are flagged
+    in present
+    """
+
+    def __init__(self, kind, strings, default, rows):
+        """
+        Attr:
+            kind (str): one of the kinds above
+            strings (Strings): interned string table
+            default: class default of the attribute, or None
+            rows (int): number of rows of the table
+        """
+        self.kind = kind
+        self.strings = strings
+        self.default = default
+        if kind == 'o':
+            self.values = [default] * rows
+        else:
+            self.values = array(TYPECODES[kind], [self.filler()]) * rows
+        self.present = bytearray(rows)
+
+    @staticmethod
+    def kind_of(value):
+        """Returns the kind of column able to hold value"""
+        if type(value) is int and -2 ** 63 <= value < 2 ** 63:
+            return 'q'
+        if type(value) is float:
+            return 'd'
+        if type(value) is str:
+            return 's'
+        if type(value) is datetime and value.tzinfo is None:
+            return 't'
+        return 'o'
+
+    def accepts(self, value):
+        """Tells if value can be stored without changing the kind"""
+        return self.kind == 'o' or self.kind_of(value) == self.kind
+
+    def encode(self, value):
+        """Returns the stored form of value"""
+        if self.kind == 's':
+            return self.strings.code(value)
+        if self.kind == 't':
+            return (value - EPOCH) // MICROSECOND
+        return value
+
+    def filler(self):
+        """Returns the stored form of the default for unset rows"""
+        if self.kind == 'o':
+            return self.default
+        return self.encode(self.default) if self.accepts(self.default) \
+            else 0
+
+    def decode(self, row):
+        """Returns the value of a row"""
+        value = self.values[row]
+        if self.kind == 's':
+            return self.strings.values[value]
+        if self.kind == 't':
+            return EPOCH + timedelta(0, 0, value)
+        return value
+
+    def append(self):
+        """Adds a row where the attribute isn't set"""
+        self.values.append(self.filler())
+        self.present.append(0)
+
+    def set(self, row, value):
+        """Sets the value of a row, as objects if the kind doesn't fit"""
+        if not self.accepts(value):
+            self.values = [self.decode(i) if self.present[i]
+                           else self.default
+                           for i in range(len(self.values))]
+            self.kind = 'o'
+        self.values[row] = self.encode(value)
+        self.present[row] = 1
+
+    def unset(self, row):
+        """Marks the attribute as not set on a row"""
+        if self.present[row]:
+            self.present[row] = 0
+            self.values[row] = self.filler()
+
+    def take(self, rows):
+        """Keeps only the given rows, in this order"""
+        values = [self.values[i] for i in rows]
+        if self.kind != 'o':
+            values = array(self.values.typecode, values)
+        self.values = values
+        self.present = bytearray(self.present[i] for i in rows)
+
+
+class Table:
+    """
+    Rows of one class: codes of the ids, liveness of the rows and
+    one Column per attribute
+    """
+
+    def __init__(self, cls, strings):
+        """
+        Attr:
+            cls (class): class of the rows
+            strings (Strings): interned string table
+        """
+        self.cls = cls
+        self.strings = strings
+        self.ids = array('i')
+        self.alive = bytearray()
+        self.rows = {}
+        self.columns = {}
+
+    def put(self, attrs):
+        """
+        Inserts or replaces the row of an instance
+        Attr:
+            attrs (dict): attributes of the instance
+        """
+        code = self.strings.code(attrs['id'])
+        row = self.rows.get(code)
+        if row is None:
+            row = self.rows[code] = len(self.ids)
+            self.ids.append(code)
+            self.alive.append(1)
+            for column in self.columns.values():
+                column.append()
+        for key, column in self.columns.items():
+            if key not in attrs:
+                column.unset(row)
+        for key, value in attrs.items():
+            column = self.columns.get(key)
+            if column is None:
+                column = self.columns[key] = Column(
+                    Column.kind_of(value), self.strings,
+                    getattr(self.cls, key, None), len(self.ids))
+            column.set(row, value)
+
+    def remove(self, id):
+        """Removes the row of an id, returns True if it existed"""
+        row = self.rows.pop(self.strings.codes.get(id), None)
+        if row is None:
+            return False
+        self.alive[row] = 0
+        if len(self.rows) * 2 < len(self.ids):
+            self.vacuum()
+        return True
+
+    def vacuum(self):
+        """Drops the removed rows"""
+        keep = [i for i, alive in enumerate(self.alive) if alive]
+        self.ids = array('i', [self.ids[i] for i in keep])
+        self.alive = bytearray([1]) * len(keep)
+        self.rows = {code: i for i, code in enumerate(self.ids)}
+        for column in self.columns.values():
+            column.take(keep)
+
+    def attrs(self, row):
+        """Returns the attributes set on a row"""
+        return {key: column.decode(row)
+                for key, column in self.columns.items()
+                if column.present[row]}
+
+    def live(self):
+        """Yields the id and row number of the live rows"""
+        for code, row in self.rows.items():
+            yield self.strings.values[code], row
+
+
+class ColumnStorage:
+    """
+    Keeps the instances of each class as a Table of columns, instances
+    are built on demand by all() and get() and written back by new()
+    Uses the JSON file of FileStorage, aggregate() computes statistics
+    on a column without building any instance
+    Attr:
+        __file_path (str): path to the JSON file
+    """
+    __file_path = "file.json"
+
+    def __init__(self, file_path=None):
+        """
+        Initializes the storage engine
+        Attr:
+            file_path (str): path to the JSON file, defaults to file.json
+        """
+        if file_path is not None:
+            self.__file_path = file_path
+        self.__strings = Strings()
+        self.__tables = {}
+        self.__batching = 0
+        self.__deferred = False
+
+    def all(self, cls=None):
+        """
+        Builds every instance, or those of class cls
+        Attr:
+            cls (class or str): only return instances of this class
+        Return:
+            dictionary (dict): '<class name>.id' -> instance
+        """
+        names = list(self.__tables) if cls is None else [self.__name(cls)]
+        objs = {}
+        for name in names:
+            table = self.__tables.get(name)
+            if table is None:
+                continue
+            for id, row in table.live():
+                objs[name + '.' + id] = build(name, table.attrs(row))
+        return objs
+
+    def get(self, cls, id):
+        """
+        Attr:
+            cls (class or str): class of the instance
+            id (str): id of the instance
+        Return:
+            (BaseModel): the instance, None if it's not stored
+        """
+        name = self.__name(cls)
+        table = self.__tables.get(name)
+        if table is None:
+            return None
+        row = table.rows.get(self.__strings.codes.get(id))
+        return None if row is None else build(name, table.attrs(row))
+
+    def count(self, cls=None):
+        """
+        Attr:
+            cls (class or str): only count instances of this class
+        Return:
+            (int): number of stored instances
+        """
+        if cls is None:
+            return sum(len(t.rows) for t in self.__tables.values())
+        table = self.__tables.get(self.__name(cls))
+        return 0 if table is None else len(table.rows)
+
+    def query(self, cls):
+        """
+        Attr:
+            cls (class or str): class of the instances
+        Return:
+            (Query): query on the instances of cls
+        """
+        return Query(lambda name, equal: self.all(name).values(),
+                     self.__name(cls))
+
+    def related(self, obj, cls, attr):
+        """
+        Attr:
+            obj (BaseModel): referenced instance
+            cls (class or str): class of the referencing instances
+            attr (str): foreign key attribute
+        Return:
+            (list): the instances of cls whose attr is obj.id
+        """
+        return self.query(cls).filter(**{attr: obj.id}).all()
+
+    def new(self, obj):
+        """
+        Stores (or stores again) the attributes of obj
+        Attr:
+            obj (BaseModel): instance obj
+        """
+        self.__put(obj.__class__.__name__, obj.__dict__)
+
+    def update(self, obj):
+        """
+        Stores obj again (called by BaseModel.save) if it's stored: the
+        instances handed out are copies, a changed copy replaces the
+        stored row but a deleted one isn't brought back
+        Attr:
+            obj (BaseModel): instance obj
+        """
+        table = self.__tables.get(obj.__class__.__name__)
+        if table is not None and \
+                self.__strings.codes.get(obj.id) in table.rows:
+            self.new(obj)
+
+    def delete(self, obj=None):
+        """
+        Deletes obj from the storage
+        Attr:
+            obj (BaseModel): instance obj
+        """
+        if obj is not None:
+            table = self.__tables.get(obj.__class__.__name__)
+            if table is not None:
+                table.remove(obj.id)
+
+    def aggregate(self, cls, attr, func='avg', by=None):
+        """
+        Computes a statistic of an attribute over the instances of a class
+        Instances where attr isn't set count with the class default,
+        values that aren't numbers are skipped (except for count)
+        Attr:
+            cls (class or str): class of the instances
+            attr (str): attribute to aggregate
+            func (str): count, sum, min, max or avg
+            by (str): attribute to group the instances by
+        Return:
+            the statistic, None if there's no value, or a dictionary
+            value of by -> statistic when by is given
+        """
+        if func not in AGGREGATES:
+            raise ValueError("Unknown aggregate: {}".format(func))
+        table = self.__tables.get(self.__name(cls))
+        if table is None:
+            return {} if by else None
+        column = table.columns.get(attr)
+        if column is None:
+            values = [getattr(table.cls, attr, None)] * len(table.ids)
+        elif column.kind == 't':
+            values = [column.decode(i) for i in range(len(table.ids))]
+        else:
+            values = column.values
+        numeric = column is not None and column.kind in ('q', 'd')
+        if by is None:
+            values = list(compress(values, table.alive))
+            return self.__apply(func, values, numeric)
+        key = table.columns.get(by)
+        if key is None:
+            keys = [getattr(table.cls, by, None)] * len(table.ids)
+        elif key.kind == 't':
+            keys = [key.decode(i) for i in range(len(table.ids))]
+        else:
+            keys = key.values
+        groups = defaultdict(list)
+        for group, value in zip(compress(keys, table.alive),
+                                compress(values, table.alive)):
+            groups[group].append(value)
+        if key is not None and key.kind == 's':
+            groups = {self.__strings.values[code]: values
+                      for code, values in groups.items()}
+        return {group: self.__apply(func, values, numeric)
+                for group, values in groups.items()}
+
+    @staticmethod
+    def __apply(func, values, numeric):
+        """Applies an aggregate to the values of a column"""
+        if func != 'count' and not numeric:
+            values = [v for v in values
+                      if type(v) in (int, float, datetime)]
+        if not values and func != 'count':
+            return None
+        return AGGREGATES[func](values)
+
+    def save(self):
+        """
+        Writes every instance to the JSON file, through a temporary
+        file which then replaces it
+        """
+        if self.__batching:
+            self.__deferred = True
+            return
+        tmp_path = self.__file_path + ".tmp"
+        try:
+            with open(tmp_path, mode='w', encoding='utf-8') as j_file:
+                j_file.write('{')
+                first = True
+                for name, table in self.__tables.items():
+                    for id, row in table.live():
+                        value = table.attrs(row)
+                        for key in ('created_at', 'updated_at'):
+                            if type(value.get(key)) is datetime:
+                                value[key] = value[key].isoformat()
+                        value['__class__'] = name
+                        j_file.write('{}\n{}: {}'.format(
+                            '' if first else ',', json.dumps(name + '.' + id),
+                            json.dumps(value)))
+                        first = False
+                j_file.write('}' if first else '\n}')
+            os.replace(tmp_path, self.__file_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    @contextmanager
+    def batch(self):
+        """
+        Unit of work: every save() made inside the with block is
+        deferred, the file is written once when the outermost batch exits
+        """
+        self.__batching += 1
+        try:
+            yield self
+        finally:
+            self.__batching -= 1
+            if not self.__batching and self.__deferred:
+                self.__deferred = False
+                self.save()
+
+    def reload(self):
+        """
+        Loads the records of the JSON file into columns (only if the
+        JSON file exists)
+        """
+        try:
+            with open(self.__file_path, mode='r', encoding='utf-8') as j_file:
+                for key, value in iter_records(j_file):
+                    for attr in ('created_at', 'updated_at'):
+                        if attr in value:
+                            value[attr] = datetime.fromisoformat(value[attr])
+                    self.__put(value.pop('__class__'), value)
+        except FileNotFoundError:
+            pass
+
+    def clean(self):
+        """Empties the storage (the JSON file is left as it is)"""
+        self.__strings = Strings()
+        self.__tables = {}
+
+    @staticmethod
+    def __name(cls):
+        """Returns the class name of cls which is a class or a name"""
+        return cls if type(cls) is str else cls.__name__
+
+    def __put(self, name, attrs):
+        """Stores the attributes of an instance in the table of its class"""
+        table = self.__tables.get(name)
+        if table is None:
+            table = self.__tables[name] = Table(classes[name], self.__strings)
+        table.put(attrs)
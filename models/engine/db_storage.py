@@ -0,0 +1,396 @@
+#!/usr/bin/python3
+
+"""
+A module that defines a class DBStorage, a storage engine backed by a
+relational database (MySQL, or a SQLite file when MySQL isn't set up)
+"""
+
+import json
+import queue
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from os import getenv
+from models.engine.file_storage import build, classes
+from models.engine.query import Query
+
+tables = {
+    'BaseModel': 'base_models',
+    'User': 'users',
+    'City': 'cities',
+    'State': 'states',
+    'Place': 'places',
+    'Review': 'reviews',
+    'Amenity': 'amenities'
+}
+
+SQL_TYPES = {str: 'VARCHAR(1024)', int: 'INTEGER', float: 'FLOAT',
+             list: 'TEXT'}
+
+
+def columns(cls):
+    """
+    Returns the declared attributes of a class that get a column
+    Attr:
+        cls (class): subclass of BaseModel
+    Return:
+        (dict): attribute name -> type of its default value
+    """
+    if '_defaults' in vars(cls):
+        return {key: type(value) for key, value in cls._defaults.items()
+                if type(value) in SQL_TYPES}
+    declared = {}
+    for klass in reversed(cls.__mro__):
+        for key, value in vars(klass).items():
+            if not key.startswith('_') and type(value) in SQL_TYPES:
+                declared[key] = type(value)
+    return declared
+
+
+class ConnectionPool:
+    """
+    Fixed-size pool of DB-API connections, opened on first use and
+    handed out to one user at a time
+    """
+
+    def __init__(self, connect, size=5):
+        """
+        Attr:
+            connect (callable): opens a new connection
+            size (int): maximum number of open connections
+        """
+        self.__connect = connect
+        self.__size = size
+        self.__opened = 0
+        self.__idle = queue.LifoQueue()
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrows a connection, the transaction is committed when the
+        with block exits and rolled back if it raises
+        """
+        try:
+            conn = self.__idle.get_nowait()
+        except queue.Empty:
+            if self.__opened < self.__size:
+                self.__opened += 1
+                conn = self.__connect()
+            else:
+                conn = self.__idle.get()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self.__idle.put(conn)
+
+    def close(self):
+        """Closes the idle connections"""
+        while True:
+            try:
+                conn = self.__idle.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
+            self.__opened -= 1
+
+
+class DBStorage:
+    """
+    Stores every class in its own table: id, timestamps, one column per
+    declared class attribute and a JSON column (extra) for the others
+    The changes are kept in memory until save(), which writes them in
+    a single transaction
+    Attr:
+        __sqlite_path (str): SQLite file used when MySQL isn't configured
+    """
+    __sqlite_path = "file.sqlite"
+
+    def __init__(self, database=None, pool_size=5):
+        """
+        Initializes the storage engine
+        MySQL is used when HBNB_MYSQL_DB is set (with HBNB_MYSQL_USER,
+        HBNB_MYSQL_PWD and HBNB_MYSQL_HOST), SQLite otherwise
+        Attr:
+            database (str): path of the SQLite file
+            pool_size (int): maximum number of open connections
+        """
+        if database is None and getenv('HBNB_MYSQL_DB'):
+            import MySQLdb
+
+            def connect():
+                """Opens a MySQL connection"""
+                return MySQLdb.connect(host=getenv('HBNB_MYSQL_HOST',
+                                                   'localhost'),
+                                       user=getenv('HBNB_MYSQL_USER'),
+                                       passwd=getenv('HBNB_MYSQL_PWD', ''),
+                                       db=getenv('HBNB_MYSQL_DB'),
+                                       charset='utf8mb4')
+            self.__mark = '%s'
+        else:
+            path = database or getenv('HBNB_SQLITE_DB', self.__sqlite_path)
+
+            def connect():
+                """Opens a SQLite connection"""
+                return sqlite3.connect(path, check_same_thread=False)
+            self.__mark = '?'
+        self.__pool = ConnectionPool(connect, pool_size)
+        self.__columns = {name: columns(cls) for name, cls in classes.items()}
+        self.__objects = {}
+        self.__deleted = set()
+        self.__batching = 0
+        self.__deferred = False
+
+    def reload(self):
+        """
+        Creates the missing tables and drops the unsaved changes
+        With HBNB_ENV=test, the tables are emptied first
+        """
+        with self.__pool.connection() as conn:
+            cursor = conn.cursor()
+            for name, table in tables.items():
+                if getenv('HBNB_ENV') == 'test':
+                    cursor.execute("DROP TABLE IF EXISTS " + table)
+                cols = ''.join(", {} {}".format(key, SQL_TYPES[kind])
+                               for key, kind in self.__columns[name].items())
+                cursor.execute("CREATE TABLE IF NOT EXISTS {} ("
+                               "id VARCHAR(60) NOT NULL PRIMARY KEY, "
+                               "created_at DATETIME, updated_at DATETIME"
+                               "{}, extra TEXT)".format(table, cols))
+        self.__objects = {}
+        self.__deleted = set()
+
+    def close(self):
+        """Closes the connections of the pool"""
+        self.__pool.close()
+
+    def all(self, cls=None):
+        """
+        Reads every stored instance, or those of class cls
+        Attr:
+            cls (class or str): only return instances of this class
+        Return:
+            dictionary (dict): '<class name>.id' -> instance
+        """
+        names = list(tables) if cls is None else [self.__name(cls)]
+        objs = {}
+        with self.__pool.connection() as conn:
+            cursor = conn.cursor()
+            for name in names:
+                for obj in self.__select(cursor, name):
+                    key = "{:s}.{:s}".format(name, obj.id)
+                    if key not in self.__deleted:
+                        objs[key] = obj
+        for key, obj in self.__objects.items():
+            if key.split('.', 1)[0] in names:
+                objs[key] = obj
+        return objs
+
+    def get(self, cls, id):
+        """
+        Attr:
+            cls (class or str): class of the instance
+            id (str): id of the instance
+        Return:
+            (BaseModel): the instance, None if it's not stored
+        """
+        name = self.__name(cls)
+        key = "{:s}.{:s}".format(name, id)
+        if key in self.__objects:
+            return self.__objects[key]
+        if key in self.__deleted or name not in tables:
+            return None
+        with self.__pool.connection() as conn:
+            objs = self.__select(conn.cursor(), name, id)
+        return objs[0] if objs else None
+
+    def count(self, cls=None):
+        """
+        Attr:
+            cls (class or str): only count instances of this class
+        Return:
+            (int): number of stored instances
+        """
+        names = list(tables) if cls is None else [self.__name(cls)]
+        total = 0
+        with self.__pool.connection() as conn:
+            cursor = conn.cursor()
+            for name in names:
+                if name not in tables:
+                    continue
+                cursor.execute("SELECT COUNT(*) FROM " + tables[name])
+                total += cursor.fetchone()[0]
+                ids = [k.split('.', 1)[1] for k in self.__objects
+                       if k.split('.', 1)[0] == name]
+                total += len(ids) - len(self.__stored(cursor, name, ids))
+                ids = [k.split('.', 1)[1] for k in self.__deleted
+                       if k.split('.', 1)[0] == name]
+                total -= len(self.__stored(cursor, name, ids))
+        return total
+
+    def query(self, cls):
+        """
+        Attr:
+            cls (class or str): class of the instances
+        Return:
+            (Query): query on the instances of cls
+        """
+        return Query(lambda name, equal: self.all(name).values(),
+                     self.__name(cls))
+
+    def related(self, obj, cls, attr):
+        """
+        Attr:
+            obj (BaseModel): referenced instance
+            cls (class or str): class of the referencing instances
+            attr (str): foreign key attribute
+        Return:
+            (list): the instances of cls whose attr is obj.id
+        """
+        return self.query(cls).filter(**{attr: obj.id}).all()
+
+    def new(self, obj):
+        """
+        Adds obj to the instances written by the next save
+        Attr:
+            obj (BaseModel): instance obj
+        """
+        key = "{:s}.{:s}".format(obj.__class__.__name__, obj.id)
+        self.__objects[key] = obj
+        self.__deleted.discard(key)
+
+    def update(self, obj):
+        """
+        Writes obj on the next save (called by BaseModel.save) if it's
+        stored: the instances handed out are copies, a changed copy
+        replaces the stored row but a deleted one isn't brought back
+        Attr:
+            obj (BaseModel): instance obj
+        """
+        if self.get(obj.__class__.__name__, obj.id) is not None:
+            self.new(obj)
+
+    def delete(self, obj=None):
+        """
+        Deletes obj from the database on the next save
+        Attr:
+            obj (BaseModel): instance obj
+        """
+        if obj is None:
+            return
+        key = "{:s}.{:s}".format(obj.__class__.__name__, obj.id)
+        self.__objects.pop(key, None)
+        self.__deleted.add(key)
+
+    def save(self):
+        """
+        Writes the instances added, updated or deleted since the last
+        save in one transaction
+        """
+        if self.__batching:
+            self.__deferred = True
+            return
+        rows = {}
+        for key, obj in self.__objects.items():
+            name = key.split('.', 1)[0]
+            rows.setdefault(name, []).append(self.__row(name, obj))
+        gone = {}
+        for key in self.__deleted:
+            name, id = key.split('.', 1)
+            gone.setdefault(name, []).append((id,))
+        with self.__pool.connection() as conn:
+            cursor = conn.cursor()
+            for name, values in rows.items():
+                cols = ['id', 'created_at', 'updated_at']
+                cols += list(self.__columns[name]) + ['extra']
+                cursor.executemany("REPLACE INTO {} ({}) VALUES ({})".format(
+                    tables[name], ', '.join(cols),
+                    ', '.join([self.__mark] * len(cols))), values)
+            for name, ids in gone.items():
+                cursor.executemany("DELETE FROM {} WHERE id = {}".format(
+                    tables[name], self.__mark), ids)
+        self.__objects = {}
+        self.__deleted = set()
+
+    @contextmanager
+    def batch(self):
+        """
+        Unit of work: every save() made inside the with block is
+        deferred, the changed objects are written once when the
+        outermost batch exits
+        """
+        self.__batching += 1
+        try:
+            yield self
+        finally:
+            self.__batching -= 1
+            if not self.__batching and self.__deferred:
+                self.__deferred = False
+                self.save()
+
+    @staticmethod
+    def __name(cls):
+        """Returns the class name of cls which is a class or a name"""
+        return cls if type(cls) is str else cls.__name__
+
+    def __row(self, name, obj):
+        """
+        Returns the column values of obj, attributes that don't match
+        the type of their column are moved to extra
+        """
+        attrs = dict(obj.__dict__)
+        row = [attrs.pop('id'), attrs.pop('created_at').isoformat(),
+               attrs.pop('updated_at').isoformat()]
+        for key, kind in self.__columns[name].items():
+            value = attrs.get(key)
+            if type(value) is not kind:
+                row.append(None)
+                continue
+            del attrs[key]
+            row.append(json.dumps(value) if kind is list else value)
+        row.append(json.dumps(attrs, default=str) if attrs else None)
+        return row
+
+    def __select(self, cursor, name, id=None):
+        """
+        Reads the instances of a class, or the one with this id
+        Return:
+            (list): the instances
+        """
+        if name not in tables:
+            return []
+        declared = list(self.__columns[name].items())
+        query = "SELECT id, created_at, updated_at{}, extra FROM {}".format(
+            ''.join(", " + key for key, kind in declared), tables[name])
+        if id is None:
+            cursor.execute(query)
+        else:
+            cursor.execute(query + " WHERE id = " + self.__mark, (id,))
+        objs = []
+        for row in cursor.fetchall():
+            attrs = {'id': row[0]}
+            for key, value in (('created_at', row[1]),
+                               ('updated_at', row[2])):
+                if type(value) is str:
+                    value = datetime.fromisoformat(value)
+                attrs[key] = value
+            for (key, kind), value in zip(declared, row[3:]):
+                if value is not None:
+                    attrs[key] = json.loads(value) if kind is list else value
+            if row[-1]:
+                attrs.update(json.loads(row[-1]))
+            objs.append(build(name, attrs))
+        return objs
+
+    def __stored(self, cursor, name, ids):
+        """Returns the ids of a class that are in the database"""
+        found = set()
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            cursor.execute("SELECT id FROM {} WHERE id IN ({})".format(
+                tables[name], ', '.join([self.__mark] * len(chunk))), chunk)
+            found.update(row[0] for row in cursor.fetchall())
+        return found
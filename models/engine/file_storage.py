@@ -5,13 +5,160 @@ A module that defines a class FileStorage for database engine
 """
 
 import json
+import os
+import re
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
 from models.user import User
 from models.city import City
 from models.state import State
 from models.place import Place
 from models.review import Review
 from models.amenity import Amenity
-from models.base_model import BaseModel
+from models.base_model import BaseModel, mutable
+from models.engine import binary_snapshot
+from models.engine import shards
+from models.engine.query import Query
+from models.engine.snapshot_index import SnapshotIndex
+
+classes = {
+    'BaseModel': BaseModel,
+    'User': User,
+    'City': City,
+    'State': State,
+    'Place': Place,
+    'Review': Review,
+    'Amenity': Amenity
+}
+
+indexes = {
+    'City': ('state_id',),
+    'Place': ('city_id', 'user_id'),
+    'Review': ('place_id', 'user_id')
+}
+
+
+def load(value):
+    """
+    Builds an instance from its to_dict() dictionary
+    The class is looked up in classes and __init__ is skipped,
+    so no uuid or datetime.now() is generated just to be overwritten
+    Attr:
+        value (dict): dictionary of the instance, it's consumed
+    Return:
+        (BaseModel): the instance
+    """
+    for key in ('created_at', 'updated_at'):
+        if key in value:
+            value[key] = datetime.fromisoformat(value[key])
+    return build(value.pop('__class__'), value)
+
+
+def build(name, attrs):
+    """
+    Builds an instance from its attributes without running __init__
+    A missing id or timestamp gets the value __init__ would give it
+    Attr:
+        name (str): class name, looked up in classes
+        attrs (dict): attributes of the instance, timestamps as datetime
+    Return:
+        (BaseModel): the instance
+    """
+    obj = object.__new__(classes[name])
+    if 'id' not in attrs or 'created_at' not in attrs or \
+            'updated_at' not in attrs:
+        now = datetime.now()
+        attrs = dict({'updated_at': now, 'id': str(uuid.uuid4()),
+                      'created_at': now}, **attrs)
+    obj.__dict__.update(attrs)
+    object.__setattr__(obj, '_changed', 0)
+    object.__setattr__(obj, '_cache', None)
+    return obj
+
+
+DELIMITER = re.compile(r'[ \t\n\r]*([{,}])[ \t\n\r]*')
+KEY = re.compile(r'"([^"\\]*)"[ \t\n\r]*:[ \t\n\r]*')
+COLON = re.compile(r'[ \t\n\r]*:[ \t\n\r]*')
+
+
+def iter_records(j_file, size=65536):
+    """
+    Parses a JSON file one top-level record at a time, only the current
+    record and a chunk of text are held in memory
+    Attr:
+        j_file (file): JSON file opened in text mode
+        size (int): number of characters read at once
+    Yield:
+        (tuple): key and decoded value of each record
+    """
+    decoder = json.JSONDecoder()
+    buf = ''
+    pos = 0
+
+    def more():
+        """Appends the next chunk to buf, False at the end of file"""
+        nonlocal buf, pos
+        data = j_file.read(size)
+        buf = buf[pos:] + data
+        pos = 0
+        return data != ''
+
+    def match(pattern):
+        """Matches pattern at pos, reading on while the match could grow"""
+        while True:
+            found = pattern.match(buf, pos)
+            if found is not None and found.end() < len(buf):
+                return found
+            if not more():
+                return found
+
+    def decode():
+        """Decodes the JSON value at pos, reading on until it's complete"""
+        nonlocal pos
+        while True:
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                if not more():
+                    raise
+                continue
+            if (end == len(buf) or buf[end] not in ' \t\n\r,:}') and more():
+                continue
+            pos = end
+            return obj
+
+    found = match(DELIMITER)
+    if found is None:
+        if buf[pos:].strip():
+            raise ValueError("Expecting '{' at the start of the JSON file")
+        return
+    if found.group(1) != '{':
+        raise ValueError("Expecting '{' at the start of the JSON file")
+    pos = found.end()
+    if buf[pos:pos + 1] == '}':
+        return
+    while True:
+        found = KEY.match(buf, pos)
+        if found is None or found.end() == len(buf):
+            found = match(KEY)
+        if found is not None:
+            key = found.group(1)
+        else:
+            key = decode()
+            found = match(COLON)
+            if found is None:
+                raise ValueError("Expecting ':' delimiter in the JSON file")
+        pos = found.end()
+        yield key, decode()
+        found = DELIMITER.match(buf, pos)
+        if found is None or found.end() == len(buf):
+            found = match(DELIMITER)
+        if found is None or found.group(1) == '{':
+            raise ValueError("Expecting ',' delimiter in the JSON file")
+        pos = found.end()
+        if found.group(1) == '}':
+            return
 
 
 class FileStorage:
@@ -21,16 +168,194 @@ class FileStorage:
         __file_path (str): path to the JSON file
         __objects (dictionary): empty dictionary,
         stores object with key as '<class name>.id
+        __by_class (dictionary): per-class index of __objects,
+        maps '<class name>' to {'<class name>.id': obj}
+        __refs (dictionary): secondary indexes of the foreign keys
+        declared in indexes, maps ('<class name>', attribute) to
+        {value: {'<class name>.id': obj}}
+        __ref_values (dictionary): indexed (attribute, value) pairs of
+        each key, to take it out of __refs
+        __related (dictionary): results of related() per secondary
+        index, maps ('<class name>', attribute) to {id: [obj]}, dropped
+        whenever that index changes
+        __compact_limit (int): number of journal entries after which
+        the journal is folded back into the JSON file
+        __by_shard (dictionary): in the sharded layout, maps the file
+        name of each shard to {'<class name>.id': obj}
+        __pending (set): keys added, deleted or changed (see touch)
+        since the last save
+        __mutable (dictionary): keys of the objects holding a list or a
+        dictionary, which can change in place without a setattr, mapped
+        to their JSON text as last written (None until it's known)
     """
     __file_path = "file.json"
     __objects = {}
+    __by_class = {}
+    __refs = {}
+    __ref_values = {}
+    __related = {}
+    __compact_limit = 1000
+
+    def __init__(self, file_path=None, journal=False, compact_limit=None,
+                 lazy=False, binary=False, shards=None):
+        """
+        Initializes the storage engine
+        Attr:
+            file_path (str): path to the JSON file, defaults to file.json
+            journal (bool): append changed records to a journal on save
+            instead of rewriting the whole JSON file
+            compact_limit (int): journal entries allowed before compaction
+            lazy (bool): reload only opens the index of the JSON file,
+            objects are built the first time they're looked up
+            binary (bool): use the binary snapshot format (file.hbnb by
+            default) instead of JSON, lazy mode isn't available with it
+            shards (int): use the sharded layout, a directory (file.json.d
+            by default) of JSON files per class, each class split over
+            shards files, only the files holding changed objects are
+            rewritten on save; journal, lazy and binary are ignored
+        """
+        if shards:
+            journal = lazy = binary = False
+            if file_path is None:
+                file_path = "file.json.d"
+        if file_path is None and binary:
+            file_path = "file.hbnb"
+        if file_path is not None:
+            self.__file_path = file_path
+        if compact_limit is not None:
+            self.__compact_limit = compact_limit
+        self.__journal = journal
+        self.__journal_path = self.__file_path + ".journal"
+        self.__lazy = lazy and not binary
+        self.__binary = binary
+        self.__index_path = self.__file_path + ".index"
+        self.__index = None
+        self.__shadowed = {}
+        self.__journal_size = 0
+        self.__pending = set()
+        self.__mutable = {}
+        self.__batching = 0
+        self.__deferred = False
+        self.__shards = shards
+        self.__by_shard = {}
+        self.__stale = set()
+
+    def all(self, cls=None):
+        """
+        Attr:
+            cls (class or str): only return instances of this class
+        Return:
+            dictionary (dict): __objects attribute, or a dictionary
+            of the instances of cls when it's given
+        """
+        if cls is None:
+            self.__materialize()
+            return self.__objects
+        name = self.__name(cls)
+        self.__materialize(name)
+        return dict(self.__by_class.get(name, {}))
+
+    def get(self, cls, id):
+        """
+        Attr:
+            cls (class or str): class of the instance
+            id (str): id of the instance
+        Return:
+            (BaseModel): the instance, None if it's not stored
+        """
+        key = "{:s}.{:s}".format(self.__name(cls), id)
+        obj = self.__objects.get(key, None)
+        if obj is None and self.__index is not None:
+            name = key.split('.', 1)[0]
+            if key not in self.__shadowed.get(name, ()):
+                raw = self.__index.record(key)
+                if raw is not None:
+                    obj = self.__load(key, raw)
+        return obj
+
+    def count(self, cls=None):
+        """
+        Attr:
+            cls (class or str): only count instances of this class
+        Return:
+            (int): number of objects in storage
+        """
+        if cls is None:
+            count = len(self.__objects)
+            if self.__index is not None:
+                count += self.__index.count() - sum(
+                    map(len, self.__shadowed.values()))
+            return count
+        name = self.__name(cls)
+        count = len(self.__by_class.get(name, {}))
+        if self.__index is not None:
+            count += self.__index.count(name) - len(
+                self.__shadowed.get(name, ()))
+        return count
 
-    def all(self):
+    def query(self, cls):
         """
+        Attr:
+            cls (class or str): class of the instances
         Return:
-            dictionary (dict): __objects attribute
+            (Query): query on the instances of cls
         """
-        return self.__objects
+        return Query(self.__select, self.__name(cls))
+
+    def related(self, obj, cls, attr):
+        """
+        Returns the instances of cls whose attribute attr is obj.id
+        Declared foreign keys are looked up in their secondary index
+        and the result is cached until that index changes
+        Attr:
+            obj (BaseModel): referenced instance
+            cls (class or str): class of the referencing instances
+            attr (str): foreign key attribute
+        Return:
+            (list): the instances
+        """
+        name = self.__name(cls)
+        if attr not in indexes.get(name, ()) or self.__index is not None:
+            return self.query(name).filter(**{attr: obj.id}).all()
+        cached = self.__related.setdefault((name, attr), {})
+        if obj.id not in cached:
+            cached[obj.id] = self.query(name).filter(**{attr: obj.id}).all()
+        return list(cached[obj.id])
+
+    def __select(self, name, equal):
+        """
+        Yields the candidate instances of a query on class name
+        An id filter is answered by get(), a string foreign key filter
+        by its secondary index, otherwise the class index is walked,
+        indexed records being built as they are reached
+        The candidates are taken from a copy of the index, so the
+        objects can be saved, or others created, while they're yielded
+        Attr:
+            name (str): class name
+            equal (dict): attribute -> value of the equality filters
+        """
+        if type(equal.get('id')) is str:
+            obj = self.get(name, equal['id'])
+            if obj is not None:
+                yield obj
+            return
+        if self.__index is None:
+            for attr in indexes.get(name, ()):
+                if type(equal.get(attr)) is str:
+                    refs = self.__refs.get((name, attr), {})
+                    yield from list(refs.get(equal[attr], {}).values())
+                    return
+            yield from list(self.__by_class.get(name, {}).values())
+            return
+        yield from list(self.__by_class.get(name, {}).values())
+        for key, raw in self.__index.records(name):
+            if key not in self.__shadowed.get(name, ()):
+                yield self.__load(key, raw)
+
+    @staticmethod
+    def __name(cls):
+        """Returns the class name of cls which is a class or a name"""
+        return cls if type(cls) is str else cls.__name__
 
     def new(self, obj):
         """
@@ -38,32 +363,447 @@ class FileStorage:
         Attr:
             obj (BaseModel): instance obj
         """
+        name = obj.__class__.__name__
+        key = "{:s}.{:s}".format(name, obj.id)
+        if key in self.__ref_values:
+            self.__unindex(key)
+        self.__objects[key] = obj
+        self.__by_class.setdefault(name, {})[key] = obj
+        if name in indexes:
+            self.__index_refs(key, obj)
+        if self.__shards:
+            self.__by_shard.setdefault(shards.shard_of(key, self.__shards),
+                                       {})[key] = obj
+        if mutable(obj.__dict__):
+            self.__mutable[key] = None
+        else:
+            self.__mutable.pop(key, None)
+        self.__pending.add(key)
+        self.__shadow(key)
+
+    def update(self, obj):
+        """
+        Marks obj to be written by the next save (called by
+        BaseModel.save) if it's the stored instance of its key, so a
+        deleted instance isn't brought back and a copy doesn't replace
+        the stored one
+        Attr:
+            obj (BaseModel): instance obj
+        """
+        key = "{:s}.{:s}".format(obj.__class__.__name__, obj.id)
+        if self.__objects.get(key) is obj:
+            self.__pending.add(key)
+
+    def touch(self, obj, attr):
+        """
+        Records that attr was set on or deleted from obj (called by
+        BaseModel.__setattr__ and __delattr__): if obj is the stored
+        instance of its key, the key is marked to be written by the next
+        save and the secondary index of attr is updated
+        Attr:
+            obj (BaseModel): instance obj
+            attr (str): name of the attribute that changed
+        """
+        name = obj.__class__.__name__
+        try:
+            key = name + '.' + obj.id
+        except (AttributeError, TypeError):
+            return
+        if self.__objects.get(key) is not obj:
+            return
+        self.__pending.add(key)
+        if attr in indexes.get(name, ()):
+            self.__unindex(key)
+            self.__index_refs(key, obj)
+        if isinstance(getattr(obj, attr, None), (list, dict)):
+            self.__mutable.setdefault(key, None)
+        elif key in self.__mutable and not mutable(obj.__dict__):
+            del self.__mutable[key]
+
+    def __index_refs(self, key, obj):
+        """Adds obj to the secondary indexes of its class (declared
+        in indexes)"""
+        name = key.split('.', 1)[0]
+        attrs = obj.__dict__
+        values = []
+        for attr in indexes[name]:
+            value = attrs.get(attr)
+            if type(value) is str:
+                self.__refs.setdefault((name, attr), {}).setdefault(
+                    value, {})[key] = obj
+                self.__related.pop((name, attr), None)
+                values.append((attr, value))
+        self.__ref_values[key] = values
+
+    def __unindex(self, key):
+        """Removes key from the secondary indexes of its class"""
+        name = key.split('.', 1)[0]
+        for attr, value in self.__ref_values.pop(key, ()):
+            refs = self.__refs[(name, attr)]
+            self.__related.pop((name, attr), None)
+            del refs[value][key]
+            if not refs[value]:
+                del refs[value]
+
+    def delete(self, obj=None):
+        """
+        Deletes obj from __objects if it's inside
+        Attr:
+            obj (BaseModel): instance obj
+        """
+        if obj is None:
+            return
         key = "{:s}.{:s}".format(obj.__class__.__name__, obj.id)
+        if self.__remove(key):
+            self.__pending.add(key)
+
+    def __remove(self, key):
+        """
+        Removes key from __objects and the class index
+        Return:
+            (bool): True if key was stored
+        """
+        if self.__objects.pop(key, None) is None:
+            return self.__shadow(key)
+        self.__by_class.get(key.split('.', 1)[0], {}).pop(key, None)
+        self.__unindex(key)
+        self.__mutable.pop(key, None)
+        if self.__shards:
+            shard = shards.shard_of(key, self.__shards)
+            self.__by_shard[shard].pop(key, None)
+            if not self.__by_shard[shard]:
+                del self.__by_shard[shard]
+        return True
+
+    def __shadow(self, key):
+        """
+        Hides the indexed record of key once its object was built,
+        replaced or deleted
+        Return:
+            (bool): True if an indexed record was hidden
+        """
+        if self.__index is None:
+            return False
+        shadowed = self.__shadowed.setdefault(key.split('.', 1)[0], set())
+        if key in shadowed or key not in self.__index:
+            return False
+        shadowed.add(key)
+        return True
+
+    def __load(self, key, raw):
+        """
+        Builds and stores the object of an indexed record
+        Attr:
+            key (str): key of the record
+            raw (bytes): JSON text of the record
+        Return:
+            (BaseModel): the object
+        """
+        obj = load(json.loads(raw))
         self.__objects[key] = obj
+        if mutable(obj.__dict__):
+            self.__mutable[key] = raw
+        else:
+            object.__setattr__(obj, '_cache', (None, raw))
+        self.__by_class.setdefault(key.split('.', 1)[0], {})[key] = obj
+        if key.split('.', 1)[0] in indexes:
+            self.__index_refs(key, obj)
+        self.__shadowed.setdefault(key.split('.', 1)[0], set()).add(key)
+        return obj
+
+    def __materialize(self, name=None):
+        """
+        Builds the objects of class name (or all of them) that are
+        still only indexed
+        Once every object is built the index is dropped
+        """
+        if self.__index is None:
+            return
+        for key, raw in self.__index.records(name):
+            if key not in self.__shadowed.get(key.split('.', 1)[0], ()):
+                self.__load(key, raw)
+        if name is None:
+            self.__index.close()
+            self.__index = None
+            self.__shadowed = {}
 
     def clean(self):
         """Resets the private __object to an empty dictionary"""
         self.__objects = {}
+        self.__by_class = {}
+        self.__refs = {}
+        self.__ref_values = {}
+        self.__related = {}
+        self.__pending = set()
+        self.__mutable = {}
+        if self.__index is not None:
+            self.__index.close()
+            self.__index = None
+        self.__shadowed = {}
+        self.__by_shard = {}
+        self.__stale = set()
 
     def save(self):
         """
         Serializes __objects to the JSON file (path: __file_path)
+        In journal mode only the records changed since the last save
+        are appended to the journal, in the sharded layout only the
+        shards holding them are rewritten
+        Inside a batch() the write is deferred until the batch ends
+        """
+        if self.__batching:
+            self.__deferred = True
+        elif self.__shards:
+            self.__write_shards()
+        elif self.__journal:
+            self.__append()
+            if self.__journal_size >= self.__compact_limit:
+                self.compact()
+        else:
+            self.compact()
+
+    @contextmanager
+    def batch(self):
+        """
+        Unit of work: every save() made inside the with block is
+        deferred, the changed objects are written once when the
+        outermost batch exits
+        """
+        self.__batching += 1
+        try:
+            yield self
+        finally:
+            self.__batching -= 1
+            if not self.__batching and self.__deferred:
+                self.__deferred = False
+                self.save()
+
+    def compact(self):
+        """
+        Rewrites the JSON file (or binary snapshot) from __objects and
+        drops the journal
+        Records are streamed to a temporary file which then replaces
+        the JSON file, so a crash never leaves it half written
+        In lazy mode records that were never built are copied as they
+        are and the index of the JSON file is written as well
+        In the sharded layout every shard file is rewritten
+        """
+        if self.__shards:
+            self.__write_shards(everything=True)
+            return
+        tmp_path = self.__file_path + ".tmp"
+        records = {}
+        try:
+            with open(tmp_path, mode='wb') as j_file:
+                if self.__binary:
+                    binary_snapshot.dump(
+                        ((type(v).__name__, v.__dict__)
+                         for v in self.__objects.values()), j_file)
+                else:
+                    self.__write(j_file, records)
+                j_file.flush()
+                os.fsync(j_file.fileno())
+            os.replace(tmp_path, self.__file_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        if self.__lazy:
+            SnapshotIndex.write(self.__index_path, self.__file_path, records)
+            if self.__index is not None:
+                self.__index.close()
+            self.__index = SnapshotIndex.open(self.__index_path,
+                                              self.__file_path)
+            self.__shadowed = {k: set(v) for k, v in self.__by_class.items()}
+        try:
+            os.remove(self.__journal_path)
+        except FileNotFoundError:
+            pass
+        self.__journal_size = 0
+        self.__dirty()
+        self.__pending.clear()
+
+    def __write(self, j_file, records):
+        """
+        Streams every record to the JSON file, one per line
+        Attr:
+            j_file (file): file opened in binary write mode
+            records (dict): filled with the offset and length of each record
+        """
+        offset = j_file.write(b'{')
+        for key, record in self.__records():
+            offset += j_file.write('{}\n{}: '.format(
+                ',' if records else '', json.dumps(key)).encode('utf-8'))
+            records[key] = (offset, len(record))
+            offset += j_file.write(record)
+        j_file.write(b'\n}' if records else b'}')
+
+    def __write_shards(self, everything=False):
+        """
+        Rewrites the shard files holding objects added, deleted or
+        changed since the last save (see __dirty), or every shard file
+        Emptied shards and the files of another layout are removed
         """
-        objs = {k: v.to_dict() for k, v in self.__objects.items()}
-        with open(self.__file_path, mode='w', encoding='utf-8') as j_file:
-            j_file.write(json.dumps(objs))
+        dirty = {shards.shard_of(key, self.__shards)
+                 for key in self.__dirty()}
+        if everything:
+            dirty.update(self.__by_shard)
+            dirty.update(os.path.basename(path) for path
+                         in shards.list_shards(self.__file_path))
+        os.makedirs(self.__file_path, exist_ok=True)
+        for shard in dirty:
+            path = os.path.join(self.__file_path, shard)
+            objs = self.__by_shard.get(shard)
+            if objs:
+                shards.write_shard(path, ((key, obj.to_json())
+                                          for key, obj in objs.items()))
+            elif os.path.exists(path):
+                os.remove(path)
+        for path in self.__stale:
+            if os.path.exists(path):
+                os.remove(path)
+        self.__stale = set()
+        self.__pending.clear()
+
+    def __records(self):
+        """
+        Yields the key and JSON text (bytes) of every stored object,
+        including the indexed records that were never built
+        The objects cache their JSON text, so only the ones changed
+        since the last save are serialized again
+        """
+        for key, obj in self.__objects.items():
+            yield key, obj.to_json()
+        if self.__index is not None:
+            for key, raw in self.__index.records():
+                if key not in self.__shadowed.get(key.split('.', 1)[0], ()):
+                    yield key, raw
+
+    def __dirty(self):
+        """
+        Returns the keys to write: the pending ones and those of the
+        objects holding a list or a dictionary whose JSON text differs
+        from the one last written, which is updated
+        Only the objects in __mutable are serialized, not every object
+        """
+        keys = set(self.__pending)
+        for key, raw in self.__mutable.items():
+            current = self.__objects[key].to_json()
+            if current != raw:
+                self.__mutable[key] = current
+                keys.add(key)
+        return keys
+
+    def __append(self):
+        """
+        Appends one journal entry per key added, deleted or changed since
+        the last save (see __dirty):
+        {"op": "put", "key": <key>, "value": <to_dict>} for new/updated
+        objects, {"op": "del", "key": <key>} for deleted ones
+        """
+        keys = self.__dirty()
+        if not keys:
+            return
+        lines = []
+        for key in keys:
+            obj = self.__objects.get(key, None)
+            if obj is None:
+                lines.append(json.dumps({"op": "del", "key": key}) + "\n")
+            else:
+                lines.append('{{"op": "put", "key": {}, "value": {}}}\n'
+                             .format(json.dumps(key),
+                                     obj.to_json().decode('utf-8')))
+        with open(self.__journal_path, mode='a', encoding='utf-8') as j_file:
+            j_file.write("".join(lines))
+        self.__journal_size += len(lines)
+        self.__pending.clear()
 
     def reload(self):
         """
         Deserializes the JSON file to __objects (only if the JSON file exits)
+        then replays the journal on top of it
+        In lazy mode only the index of the JSON file is opened when
+        it's up to date
+        In the sharded layout every shard file of the directory is read
         """
+        if self.__shards:
+            self.__reload_shards()
+            return
+        if self.__lazy:
+            if self.__index is not None:
+                self.__index.close()
+            self.__index = SnapshotIndex.open(self.__index_path,
+                                              self.__file_path)
+        if self.__index is not None:
+            self.__shadowed = {}
+            for key in [k for k in self.__objects if k in self.__index]:
+                self.__remove(key)
+            self.__replay()
+            self.__dirty()
+            self.__pending.clear()
+            return
         try:
-            with open(self.__file_path, mode='r', encoding='utf-8') as j_file:
-                data = j_file.read()
-            if data != "" and data is not None:
-                data = json.loads(data)
-                for value in data.values():
-                    Clazz = eval(value['__class__'])
-                    self.new(Clazz(**value))
+            if self.__binary:
+                with open(self.__file_path, mode='rb') as b_file:
+                    for name, attrs in binary_snapshot.load(b_file):
+                        self.new(build(name, attrs))
+            else:
+                with open(self.__file_path, mode='r',
+                          encoding='utf-8') as j_file:
+                    for key, value in iter_records(j_file):
+                        self.new(load(value))
         except FileNotFoundError:
             pass
+        self.__replay()
+        self.__dirty()
+        self.__pending.clear()
+
+    def __replay(self):
+        """
+        Applies the journal entries to __objects in order
+        A torn last entry (crash while appending) is cut off
+        """
+        try:
+            j_file = open(self.__journal_path, mode='rb+')
+        except FileNotFoundError:
+            return
+        with j_file:
+            size = 0
+            good = 0
+            for line in j_file:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                if entry['op'] == 'put':
+                    self.new(load(entry['value']))
+                else:
+                    self.__remove(entry['key'])
+                good += len(line)
+                size += 1
+            j_file.truncate(good)
+        self.__journal_size = size
+
+    def __reload_shards(self):
+        """
+        Loads the shard files
+        Records read from the files of another layout (another number
+        of shards) are moved to their shard by the next save
+        """
+        moved = []
+        for path in shards.list_shards(self.__file_path):
+            stale = not shards.in_layout(os.path.basename(path),
+                                         self.__shards)
+            for key, name, attrs in shards.read_shard(path):
+                self.new(build(name, attrs))
+                if stale:
+                    moved.append(key)
+            if stale:
+                self.__stale.add(path)
+        self.__dirty()
+        self.__pending.clear()
+        self.__pending.update(moved)
@@ -0,0 +1,476 @@
+#!/usr/bin/python3
+
+"""
+A module that defines a class MmapStorage, a storage engine that keeps
+the records on disk and only reads the ones it's asked for
+"""
+
+import json
+import mmap
+import os
+import struct
+from contextlib import contextmanager
+from hashlib import blake2b
+from models.engine.file_storage import load
+from models.engine.query import Query
+
+HEADER = 4096
+MAGIC = b"HBNBIDX1"
+SLOT = struct.Struct("<QQII")
+EMPTY = 0
+TOMBSTONE = 2 ** 64 - 1
+
+
+class MmapStorage:
+    """
+    Stores instances in an append-only log of records (file.db) with an
+    on-disk hash index (file.db.index) from '<class name>.id' to the
+    offset of the last record of the key, both memory-mapped
+    Only the objects changed since the last save are held in memory,
+    looking an instance up reads a single record of the log
+    Attr:
+        __file_path (str): path to the log
+        __capacity (int): initial number of slots of the index
+        __load_factor (float): share of used slots before the index grows
+    Log record: <key as JSON> <to_dict() as JSON, null if deleted>\\n
+    Index: header of HEADER bytes (MAGIC then JSON: slots, used, size of
+    the log, live bytes, class names and counts) followed by slots of
+    (offset + 1, hash of the key, length, class number)
+    """
+    __file_path = "file.db"
+    __capacity = 1024
+    __load_factor = 0.7
+
+    def __init__(self, file_path=None):
+        """
+        Initializes the storage engine
+        Attr:
+            file_path (str): path to the log, defaults to file.db
+        """
+        if file_path is not None:
+            self.__file_path = file_path
+        self.__index_path = self.__file_path + ".index"
+        self.__objects = {}
+        self.__deleted = set()
+        self.__batching = 0
+        self.__deferred = False
+        self.__data = None
+        self.__index = None
+        self.__header = None
+
+    def reload(self):
+        """
+        Opens the log and its index, the index is brought up to date
+        with records appended after its last save, or rebuilt
+        """
+        self.__close()
+        self.__objects = {}
+        self.__deleted = set()
+        with open(self.__file_path, mode='ab'):
+            pass
+        size = os.path.getsize(self.__file_path)
+        if not self.__open_index() or self.__header['size'] > size:
+            self.__new_index(self.__capacity)
+        if self.__header['size'] < size:
+            self.__scan(self.__header['size'])
+        self.__map()
+
+    def all(self, cls=None):
+        """
+        Builds every stored instance, or those of class cls
+        Attr:
+            cls (class or str): only return instances of this class
+        Return:
+            dictionary (dict): '<class name>.id' -> instance
+        """
+        name = None if cls is None else self.__name(cls)
+        code = None
+        if name is not None:
+            if name not in self.__header['classes']:
+                code = -1
+            else:
+                code = self.__header['classes'].index(name)
+        slots = []
+        for i in range(self.__header['slots']):
+            offset, h, length, klass = self.__slot(i)
+            if offset not in (EMPTY, TOMBSTONE) and code in (None, klass):
+                slots.append((offset - 1, length))
+        objs = {}
+        for offset, length in sorted(slots):
+            key, value = self.__record(offset, length)
+            if key not in self.__deleted and key not in self.__objects:
+                objs[key] = load(value)
+        for key, obj in self.__objects.items():
+            if name is None or key.split('.', 1)[0] == name:
+                objs[key] = obj
+        return objs
+
+    def get(self, cls, id):
+        """
+        Attr:
+            cls (class or str): class of the instance
+            id (str): id of the instance
+        Return:
+            (BaseModel): the instance, None if it's not stored
+        """
+        key = "{:s}.{:s}".format(self.__name(cls), id)
+        if key in self.__objects:
+            return self.__objects[key]
+        if key in self.__deleted:
+            return None
+        i = self.__find(key)
+        if i is None:
+            return None
+        offset, h, length, klass = self.__slot(i)
+        return load(self.__record(offset - 1, length)[1])
+
+    def count(self, cls=None):
+        """
+        Attr:
+            cls (class or str): only count instances of this class
+        Return:
+            (int): number of stored instances
+        """
+        counts = self.__header['counts']
+        if cls is None:
+            return sum(counts.values())
+        return counts.get(self.__name(cls), 0)
+
+    def query(self, cls):
+        """
+        Attr:
+            cls (class or str): class of the instances
+        Return:
+            (Query): query on the instances of cls
+        """
+        return Query(lambda name, equal: self.all(name).values(),
+                     self.__name(cls))
+
+    def related(self, obj, cls, attr):
+        """
+        Attr:
+            obj (BaseModel): referenced instance
+            cls (class or str): class of the referencing instances
+            attr (str): foreign key attribute
+        Return:
+            (list): the instances of cls whose attr is obj.id
+        """
+        return self.query(cls).filter(**{attr: obj.id}).all()
+
+    def new(self, obj):
+        """
+        Adds obj to the instances written by the next save
+        Attr:
+            obj (BaseModel): instance obj
+        """
+        name = obj.__class__.__name__
+        key = "{:s}.{:s}".format(name, obj.id)
+        if not self.__exists(key):
+            counts = self.__header['counts']
+            counts[name] = counts.get(name, 0) + 1
+        self.__objects[key] = obj
+        self.__deleted.discard(key)
+
+    def update(self, obj):
+        """
+        Writes obj on the next save (called by BaseModel.save) if it's
+        stored: the instances handed out are copies, a changed copy
+        replaces the stored record but a deleted one isn't brought back
+        Attr:
+            obj (BaseModel): instance obj
+        """
+        if self.__exists("{:s}.{:s}".format(obj.__class__.__name__, obj.id)):
+            self.new(obj)
+
+    def delete(self, obj=None):
+        """
+        Deletes obj from the storage on the next save
+        Attr:
+            obj (BaseModel): instance obj
+        """
+        if obj is None:
+            return
+        name = obj.__class__.__name__
+        key = "{:s}.{:s}".format(name, obj.id)
+        if self.__exists(key):
+            self.__header['counts'][name] -= 1
+            self.__objects.pop(key, None)
+            self.__deleted.add(key)
+
+    def save(self):
+        """
+        Appends the records of the instances added, updated or deleted
+        since the last save to the log and updates the index
+        """
+        if self.__batching:
+            self.__deferred = True
+            return
+        if not self.__objects and not self.__deleted:
+            return
+        records = [(k, v.to_dict()) for k, v in self.__objects.items()]
+        records.extend((k, None) for k in self.__deleted)
+        entries = []
+        with open(self.__file_path, mode='ab') as d_file:
+            offset = d_file.tell()
+            for key, value in records:
+                line = (json.dumps(key) + ' ' + json.dumps(value) +
+                        '\n').encode('utf-8')
+                d_file.write(line)
+                entries.append((key, offset, len(line), value is None))
+                offset += len(line)
+        self.__map()
+        for entry in entries:
+            self.__put(*entry)
+        self.__objects = {}
+        self.__deleted = set()
+        self.__header['size'] = offset
+        self.__write_header()
+        if offset > (1 << 20) and self.__header['live'] * 2 < offset:
+            self.compact()
+
+    @contextmanager
+    def batch(self):
+        """
+        Unit of work: every save() made inside the with block is
+        deferred, the changed objects are written once when the
+        outermost batch exits
+        """
+        self.__batching += 1
+        try:
+            yield self
+        finally:
+            self.__batching -= 1
+            if not self.__batching and self.__deferred:
+                self.__deferred = False
+                self.save()
+
+    def compact(self):
+        """
+        Rewrites the log with only the last record of each live key
+        """
+        self.save()
+        slots = []
+        for i in range(self.__header['slots']):
+            offset, h, length, klass = self.__slot(i)
+            if offset not in (EMPTY, TOMBSTONE):
+                slots.append((offset - 1, length))
+        tmp_path = self.__file_path + ".tmp"
+        with open(tmp_path, mode='wb') as d_file:
+            for offset, length in sorted(slots):
+                d_file.write(self.__data[offset:offset + length])
+            d_file.flush()
+            os.fsync(d_file.fileno())
+        self.__close()
+        os.replace(tmp_path, self.__file_path)
+        os.remove(self.__index_path)
+        self.reload()
+
+    @staticmethod
+    def __name(cls):
+        """Returns the class name of cls which is a class or a name"""
+        return cls if type(cls) is str else cls.__name__
+
+    @staticmethod
+    def __hash(key):
+        """Returns the 64 bits hash of a key"""
+        return int.from_bytes(blake2b(key.encode('utf-8'),
+                                      digest_size=8).digest(), 'little')
+
+    def __exists(self, key):
+        """Tells if key is stored, saved or not"""
+        if key in self.__objects:
+            return True
+        return key not in self.__deleted and self.__find(key) is not None
+
+    def __slot(self, i):
+        """Returns the (offset + 1, hash, length, class) of slot i"""
+        return SLOT.unpack_from(self.__index, HEADER + i * SLOT.size)
+
+    def __probe(self, key, h):
+        """
+        Walks the slots of key
+        Return:
+            (tuple): slot of key (None if absent), first reusable slot
+        """
+        slots = self.__header['slots']
+        free = None
+        i = h % slots
+        while True:
+            offset, slot_hash, length, klass = self.__slot(i)
+            if offset == EMPTY:
+                return None, i if free is None else free
+            if offset == TOMBSTONE:
+                if free is None:
+                    free = i
+            elif slot_hash == h and self.__record(offset - 1,
+                                                  length)[0] == key:
+                return i, i
+            i = (i + 1) % slots
+
+    def __find(self, key):
+        """Returns the slot of key, None if it isn't indexed"""
+        return self.__probe(key, self.__hash(key))[0]
+
+    def __record(self, offset, length):
+        """
+        Reads a record of the log
+        Return:
+            (tuple): key and value (dict, None for a deletion)
+        """
+        if self.__data is None or offset + length > len(self.__data):
+            self.__map()
+        line = self.__data[offset:offset + length]
+        end = line.index(b'" ') + 1
+        return json.loads(line[:end]), json.loads(line[end + 1:])
+
+    def __put(self, key, offset, length, deleted):
+        """
+        Updates the slot of key after a record was appended to the log
+        Attr:
+            key (str): key of the record
+            offset (int): offset of the record in the log
+            length (int): length of the record
+            deleted (bool): the record deletes key
+        """
+        h = self.__hash(key)
+        found, free = self.__probe(key, h)
+        header = self.__header
+        if found is not None:
+            old = self.__slot(found)
+            header['live'] -= old[2]
+            if deleted:
+                SLOT.pack_into(self.__index, HEADER + found * SLOT.size,
+                               TOMBSTONE, old[1], 0, 0)
+                return
+        elif deleted:
+            return
+        else:
+            if self.__slot(free)[0] == EMPTY:
+                header['used'] += 1
+            found = free
+        name = key.split('.', 1)[0]
+        if name not in header['classes']:
+            header['classes'].append(name)
+        SLOT.pack_into(self.__index, HEADER + found * SLOT.size, offset + 1,
+                       h, length, header['classes'].index(name))
+        header['live'] += length
+        if header['used'] > header['slots'] * self.__load_factor:
+            self.__grow()
+
+    def __grow(self):
+        """Moves the index to twice as many slots"""
+        live = [self.__slot(i) for i in range(self.__header['slots'])]
+        header = dict(self.__header, used=0)
+        self.__new_index(header['slots'] * 2, header)
+        slots = self.__header['slots']
+        for offset, h, length, klass in live:
+            if offset in (EMPTY, TOMBSTONE):
+                continue
+            i = h % slots
+            while self.__slot(i)[0] != EMPTY:
+                i = (i + 1) % slots
+            SLOT.pack_into(self.__index, HEADER + i * SLOT.size,
+                           offset, h, length, klass)
+            self.__header['used'] += 1
+        self.__write_header()
+
+    def __scan(self, start):
+        """
+        Indexes the records of the log found after offset start
+        A torn last record (crash while appending) is cut off
+        """
+        counts = self.__header['counts']
+        self.__map()
+        offset = start
+        with open(self.__file_path, mode='rb') as d_file:
+            d_file.seek(start)
+            for line in d_file:
+                if not line.endswith(b'\n'):
+                    break
+                key = json.loads(line[:line.index(b'" ') + 1])
+                name = key.split('.', 1)[0]
+                existed = self.__find(key) is not None
+                deleted = line.endswith(b' null\n')
+                if existed and deleted:
+                    counts[name] -= 1
+                elif not existed and not deleted:
+                    counts[name] = counts.get(name, 0) + 1
+                self.__put(key, offset, len(line), deleted)
+                offset += len(line)
+        if offset < os.path.getsize(self.__file_path):
+            self.__close_data()
+            os.truncate(self.__file_path, offset)
+        self.__header['size'] = offset
+        self.__write_header()
+
+    def __open_index(self):
+        """
+        Maps the index file
+        Return:
+            (bool): False if there's no valid index
+        """
+        try:
+            i_file = open(self.__index_path, mode='r+b')
+        except FileNotFoundError:
+            return False
+        with i_file:
+            head = i_file.read(HEADER)
+            if len(head) < HEADER or not head.startswith(MAGIC):
+                return False
+            try:
+                header = json.loads(head[len(MAGIC):])
+            except ValueError:
+                return False
+            self.__index = mmap.mmap(i_file.fileno(), 0)
+        self.__header = header
+        return True
+
+    def __new_index(self, slots, header=None):
+        """
+        Creates an empty index of slots slots
+        Attr:
+            slots (int): number of slots
+            header (dict): header to keep (when growing)
+        """
+        if self.__index is not None:
+            self.__index.close()
+        if header is None:
+            header = {'size': 0, 'live': 0, 'used': 0,
+                      'classes': [], 'counts': {}}
+        self.__header = dict(header, slots=slots)
+        tmp_path = self.__index_path + ".tmp"
+        with open(tmp_path, mode='wb') as i_file:
+            i_file.truncate(HEADER + slots * SLOT.size)
+        os.replace(tmp_path, self.__index_path)
+        with open(self.__index_path, mode='r+b') as i_file:
+            self.__index = mmap.mmap(i_file.fileno(), 0)
+        self.__write_header()
+
+    def __write_header(self):
+        """Writes the header at the start of the index"""
+        head = MAGIC + json.dumps(self.__header).encode('utf-8')
+        if len(head) > HEADER:
+            raise ValueError("Index header is too large")
+        self.__index[:HEADER] = head.ljust(HEADER)
+        self.__index.flush()
+
+    def __map(self):
+        """Maps the log again to see the records appended to it"""
+        self.__close_data()
+        with open(self.__file_path, mode='rb') as d_file:
+            if os.fstat(d_file.fileno()).st_size:
+                self.__data = mmap.mmap(d_file.fileno(), 0,
+                                        access=mmap.ACCESS_READ)
+
+    def __close_data(self):
+        """Unmaps the log"""
+        if self.__data is not None:
+            self.__data.close()
+            self.__data = None
+
+    def __close(self):
+        """Unmaps the log and the index"""
+        self.__close_data()
+        if self.__index is not None:
+            self.__index.close()
+            self.__index = None
@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+
+"""
+A module that defines a class Query, the chainable read API returned
+by storage.query(cls)
+"""
+
+import operator
+from itertools import islice
+
+OPERATORS = {
+    'eq': operator.eq,
+    'ne': operator.ne,
+    'lt': operator.lt,
+    'lte': operator.le,
+    'gt': operator.gt,
+    'gte': operator.ge,
+    'in': lambda value, values: value in values
+}
+MISSING = object()
+
+
+class Query:
+    """
+    Lazy query on the instances of a class:
+        storage.query(Place).filter(price_by_night__lt=100, city_id=id)
+               .only('id', 'name').offset(100).limit(50)
+    Each method returns a new Query, nothing is read until it's iterated
+    Results are streamed: instances, or dictionaries of the only()
+    attributes
+    Filters are <attribute>=<value> or <attribute>__<op>=<value> with
+    op one of eq, ne, lt, lte, gt, gte, in; an instance without the
+    attribute, or whose value can't be compared, doesn't match
+    """
+
+    def __init__(self, source, name, filters=(), fields=None, start=0,
+                 stop=None):
+        """
+        Attr:
+            source (callable): source(name, equal) returns the candidate
+            instances of class name, equal holds the equality filters
+            so the storage can answer from an index
+            name (str): class name
+            filters (tuple): (attribute, operator name, value) triples
+            fields (tuple): attributes kept by only()
+            start (int): number of matches skipped
+            stop (int): position after the last match returned
+        """
+        self.__source = source
+        self.__name = name
+        self.__filters = filters
+        self.__fields = fields
+        self.__start = start
+        self.__stop = stop
+
+    def __copy(self, **changes):
+        """Returns a new Query with some arguments changed"""
+        args = {'filters': self.__filters, 'fields': self.__fields,
+                'start': self.__start, 'stop': self.__stop}
+        args.update(changes)
+        return Query(self.__source, self.__name, **args)
+
+    def filter(self, **conditions):
+        """Keeps the instances matching every condition"""
+        filters = []
+        for key, value in conditions.items():
+            attr, sep, op = key.rpartition('__')
+            if not sep or op not in OPERATORS:
+                attr, op = key, 'eq'
+            if not attr:
+                raise ValueError("Invalid filter: {}".format(key))
+            filters.append((attr, op, value))
+        return self.__copy(filters=self.__filters + tuple(filters))
+
+    def only(self, *fields):
+        """Returns dictionaries of these attributes instead of instances"""
+        return self.__copy(fields=fields)
+
+    def offset(self, count):
+        """Skips the first count matches, a limit already set is kept
+        (like LIMIT/OFFSET in SQL, in either order)"""
+        stop = self.__stop
+        if stop is not None:
+            stop += count
+        return self.__copy(start=self.__start + count, stop=stop)
+
+    def limit(self, count):
+        """Returns at most count matches"""
+        stop = self.__start + count
+        if self.__stop is not None:
+            stop = min(stop, self.__stop)
+        return self.__copy(stop=stop)
+
+    def __iter__(self):
+        """Streams the matches"""
+        equal = {attr: value for attr, op, value in self.__filters
+                 if op == 'eq'}
+        matches = (obj for obj in self.__source(self.__name, equal)
+                   if self.__match(obj))
+        matches = islice(matches, self.__start, self.__stop)
+        if self.__fields is None:
+            return matches
+        return ({field: getattr(obj, field, None) for field in self.__fields}
+                for obj in matches)
+
+    def __match(self, obj):
+        """Tells if obj matches every filter"""
+        for attr, op, value in self.__filters:
+            current = getattr(obj, attr, MISSING)
+            if current is MISSING:
+                return False
+            try:
+                if not OPERATORS[op](current, value):
+                    return False
+            except TypeError:
+                return False
+        return True
+
+    def all(self):
+        """Returns the matches as a list"""
+        return list(self)
+
+    def first(self):
+        """Returns the first match, None if there's none"""
+        return next(iter(self.limit(1)), None)
+
+    def count(self):
+        """Returns the number of matches"""
+        return sum(1 for obj in self)
@@ -0,0 +1,150 @@
+#!/usr/bin/python3
+
+"""
+A module that reads and writes the sharded layout of FileStorage
+
+Instances are stored in a directory, one JSON file per class
+(<class name>.json), or split over <shards> files per class by a hash
+of their id (<class name>.<n>.json). Every file has the format of
+file.json, so saves only rewrite the files holding changed objects
+usage: python3 -m models.engine.shards <src> <dst> [shards]
+splits file.json into a directory of shards, or joins the shards of a
+directory back into file.json (by <src> being a directory)
+"""
+
+import json
+import os
+import re
+import sys
+import zlib
+from datetime import datetime
+
+SHARD = re.compile(r'(\w+)(?:\.(\d+))?\.json')
+
+
+def shard_of(key, shards):
+    """
+    Returns the file name of the shard holding key
+    Attr:
+        key (str): <class name>.<id>
+        shards (int): number of files per class
+    """
+    name, uid = key.split('.', 1)
+    if shards == 1:
+        return name + '.json'
+    return '{}.{:d}.json'.format(name,
+                                 zlib.crc32(uid.encode('utf-8')) % shards)
+
+
+def in_layout(file_name, shards):
+    """Tells if file_name is the name of a shard with shards files per
+    class"""
+    found = SHARD.fullmatch(file_name)
+    if found is None:
+        return False
+    if shards == 1:
+        return found.group(2) is None
+    return found.group(2) is not None and int(found.group(2)) < shards
+
+
+def list_shards(path):
+    """Returns the paths of the shard files in the directory path"""
+    try:
+        names = sorted(os.listdir(path))
+    except FileNotFoundError:
+        return []
+    return [os.path.join(path, name) for name in names
+            if SHARD.fullmatch(name)]
+
+
+def read_shard(path):
+    """
+    Reads a shard file
+    Return:
+        (list): (key, class name, attributes) of each record, timestamps
+        as datetime
+    """
+    with open(path, mode='r', encoding='utf-8') as j_file:
+        data = json.load(j_file)
+    records = []
+    for key, value in data.items():
+        for attr in ('created_at', 'updated_at'):
+            if attr in value:
+                value[attr] = datetime.fromisoformat(value[attr])
+        records.append((key, value.pop('__class__'), value))
+    return records
+
+
+def write_shard(path, records):
+    """
+    Writes a shard file through a temporary file, one record per line
+    Attr:
+        path (str): path of the shard
+        records (iterable): (key, JSON text as bytes) pairs
+    """
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, mode='wb') as j_file:
+            sep = b'{'
+            for key, raw in records:
+                j_file.write(sep + '\n{}: '.format(
+                    json.dumps(key)).encode('utf-8') + raw)
+                sep = b','
+            j_file.write(b'\n}' if sep == b',' else b'{}')
+            j_file.flush()
+            os.fsync(j_file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def split(src, dst, shards=1):
+    """
+    Converts a JSON file written by FileStorage to the sharded layout
+    Attr:
+        src (str): path of the JSON file
+        dst (str): directory of the shards
+        shards (int): number of files per class
+    """
+    from models.engine.file_storage import iter_records
+
+    files = {}
+    with open(src, mode='r', encoding='utf-8') as j_file:
+        for key, value in iter_records(j_file):
+            files.setdefault(shard_of(key, shards), []).append(
+                (key, json.dumps(value).encode('utf-8')))
+    os.makedirs(dst, exist_ok=True)
+    for path in list_shards(dst):
+        if os.path.basename(path) not in files:
+            os.remove(path)
+    for name, records in files.items():
+        write_shard(os.path.join(dst, name), records)
+
+
+def join(src, dst):
+    """
+    Converts a directory of shards to the JSON file format of FileStorage
+    Attr:
+        src (str): directory of the shards
+        dst (str): path of the JSON file
+    """
+    records = []
+    for path in list_shards(src):
+        with open(path, mode='r', encoding='utf-8') as j_file:
+            records.extend((key, json.dumps(value).encode('utf-8'))
+                           for key, value in json.load(j_file).items())
+    write_shard(dst, records)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4):
+        sys.exit("usage: python3 -m models.engine.shards "
+                 "<src> <dst> [shards]")
+    if os.path.isdir(sys.argv[1]):
+        join(sys.argv[1], sys.argv[2])
+    else:
+        split(sys.argv[1], sys.argv[2], *map(int, sys.argv[3:4]))
@@ -0,0 +1,161 @@
+#!/usr/bin/python3
+
+"""
+A module that defines a class SnapshotIndex, the sidecar index
+used by FileStorage to read single records of the JSON file
+"""
+
+import json
+import mmap
+import os
+
+
+class SnapshotIndex:
+    """
+    Sorted fixed-width index of the records of a JSON file
+    Maps '<class name>.id' to the offset and length of the record,
+    lookups are binary searches on the memory-mapped index so opening
+    it doesn't depend on the number of records
+    Layout:
+        {"size": .., "mtime": .., "width": .., "counts": {..}}\\n
+        <key padded to width> <offset:012d> <length:010d>\\n (sorted)
+    """
+
+    def __init__(self, index, snapshot, header):
+        """
+        Attr:
+            index (file): opened index file
+            snapshot (file): opened JSON file
+            header (dict): decoded first line of the index
+        """
+        self.__index = mmap.mmap(index.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__snapshot = mmap.mmap(snapshot.fileno(), 0,
+                                    access=mmap.ACCESS_READ)
+        self.__start = self.__index.find(b"\n") + 1
+        self.__width = header["width"]
+        self.__line = self.__width + 25
+        self.__size = (len(self.__index) - self.__start) // self.__line
+        self.__counts = header["counts"]
+
+    @staticmethod
+    def write(path, snapshot_path, records):
+        """
+        Writes the index of a JSON file that was just written
+        Attr:
+            path (str): path of the index
+            snapshot_path (str): path of the JSON file
+            records (dict): '<class name>.id' -> (offset, length)
+        """
+        stat = os.stat(snapshot_path)
+        keys = sorted(k.encode("utf-8") for k in records)
+        width = max(map(len, keys), default=0)
+        counts = {}
+        for key in records:
+            name = key.split(".", 1)[0]
+            counts[name] = counts.get(name, 0) + 1
+        header = {"size": stat.st_size, "mtime": stat.st_mtime_ns,
+                  "width": width, "counts": counts}
+        with open(path, mode="wb") as i_file:
+            i_file.write(json.dumps(header).encode("utf-8") + b"\n")
+            for key in keys:
+                i_file.write(key.ljust(width) + b" %012d %010d\n" %
+                             records[key.decode("utf-8")])
+
+    @classmethod
+    def open(cls, path, snapshot_path):
+        """
+        Opens the index of a JSON file
+        Return:
+            (SnapshotIndex): the index
+            None: if there's no index or the JSON file changed since
+        """
+        try:
+            snapshot = open(snapshot_path, mode="rb")
+        except FileNotFoundError:
+            return None
+        with snapshot:
+            try:
+                index = open(path, mode="rb")
+            except FileNotFoundError:
+                return None
+            with index:
+                try:
+                    header = json.loads(index.readline())
+                except ValueError:
+                    return None
+                stat = os.fstat(snapshot.fileno())
+                if (header.get("size") != stat.st_size or
+                        header.get("mtime") != stat.st_mtime_ns or
+                        stat.st_size == 0):
+                    return None
+                return cls(index, snapshot, header)
+
+    def close(self):
+        """Unmaps both files"""
+        self.__index.close()
+        self.__snapshot.close()
+
+    def count(self, name=None):
+        """
+        Return:
+            (int): number of indexed records of class name, or of all
+        """
+        if name is None:
+            return self.__size
+        return self.__counts.get(name, 0)
+
+    def __key(self, i):
+        """Returns the key of the i-th entry as bytes"""
+        pos = self.__start + i * self.__line
+        return self.__index[pos:pos + self.__width].rstrip(b" ")
+
+    def __entry(self, i):
+        """Returns the offset and length of the i-th entry"""
+        pos = self.__start + i * self.__line + self.__width
+        return int(self.__index[pos + 1:pos + 13]), \
+            int(self.__index[pos + 14:pos + 24])
+
+    def __bisect(self, key):
+        """Returns the position of the first entry >= key (bytes)"""
+        lo, hi = 0, self.__size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.__key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def __contains__(self, key):
+        """Tells if '<class name>.id' is indexed"""
+        k = key.encode("utf-8")
+        i = self.__bisect(k)
+        return i < self.__size and self.__key(i) == k
+
+    def record(self, key):
+        """
+        Return:
+            (bytes): JSON text of the record of key
+            None: if key isn't indexed
+        """
+        k = key.encode("utf-8")
+        i = self.__bisect(k)
+        if i < self.__size and self.__key(i) == k:
+            offset, length = self.__entry(i)
+            return self.__snapshot[offset:offset + length]
+        return None
+
+    def records(self, name=None):
+        """
+        Yields the key and JSON text of the records of class name,
+        or of all records, in the order they have in the JSON file
+        """
+        if name is None:
+            lo, hi = 0, self.__size
+        else:
+            lo = self.__bisect(name.encode("utf-8") + b".")
+            hi = self.__bisect(name.encode("utf-8") + b"/")
+        entries = sorted((self.__entry(i), i) for i in range(lo, hi))
+        for (offset, length), i in entries:
+            yield (self.__key(i).decode("utf-8"),
+                   self.__snapshot[offset:offset + length])
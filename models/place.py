@@ -2,6 +2,7 @@
 """module contains information of a place"""
 
 
+import models
 from models.base_model import BaseModel
 
 
@@ -18,3 +19,14 @@ class Place(BaseModel):
     latitude = 0.0
     longitude = 0.0
     amenity_ids = []
+
+    @property
+    def reviews(self):
+        """The Review instances of this place"""
+        return models.storage.related(self, 'Review', 'place_id')
+
+    @property
+    def amenities(self):
+        """The Amenity instances listed in amenity_ids"""
+        found = (models.storage.get('Amenity', id) for id in self.amenity_ids)
+        return [amenity for amenity in found if amenity is not None]
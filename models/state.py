@@ -4,6 +4,7 @@
 A subclass module of Basemodel
 located in the base_model.py
 """
+import models
 from models.base_model import BaseModel
 
 
@@ -13,3 +14,8 @@ class State(BaseModel):
     with some added attributes
     """
     name = ""
+
+    @property
+    def cities(self):
+        """The City instances of this state"""
+        return models.storage.related(self, 'City', 'state_id')
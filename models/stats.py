@@ -0,0 +1,156 @@
+#!/usr/bin/python3
+
+"""
+A module that defines the opt-in instrumentation of the storage engine,
+the models and the console
+Once enabled (HBNB_STATS=1, or console.py --stats), the calls of the
+storage save/reload/new/compact, of to_dict, of the json.dumps made by
+the models and FileStorage, and of each console command are counted
+and timed, with a histogram of their durations. Nothing is wrapped
+until then
+"""
+
+import atexit
+import functools
+import json
+import os
+import time
+
+BOUNDS = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1, 10)
+LABELS = ('<1us', '<10us', '<100us', '<1ms', '<10ms', '<100ms', '<1s',
+          '<10s', '>=10s')
+timers = {}
+enabled = False
+
+
+class Timer:
+    """
+    Number of calls, total and longest duration, and histogram of the
+    durations (one bucket per power of ten) of a function
+    """
+
+    def __init__(self):
+        """Initializes an empty timer"""
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(LABELS)
+
+    def record(self, seconds):
+        """Adds a call that lasted seconds"""
+        self.calls += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        for i, bound in enumerate(BOUNDS):
+            if seconds < bound:
+                break
+        else:
+            i = len(BOUNDS)
+        self.buckets[i] += 1
+
+    def to_dict(self):
+        """Returns the timer as a dictionary"""
+        return {'calls': self.calls, 'total': self.total, 'max': self.max,
+                'histogram': {label: count for label, count
+                              in zip(LABELS, self.buckets) if count}}
+
+
+class TimedModule:
+    """
+    Stands in for a module whose functions names are timed, as seen by
+    the module it's set in
+    """
+
+    def __init__(self, module, names):
+        """
+        Attr:
+            module (module): module to stand in for
+            names (list): names of the timed functions
+        """
+        self.__module = module
+        for name in names:
+            setattr(self, name, timed('{}.{}'.format(module.__name__, name),
+                                      getattr(module, name)))
+
+    def __getattr__(self, name):
+        """Returns the attributes of the module which aren't timed"""
+        return getattr(self.__module, name)
+
+
+def timed(name, func):
+    """Returns func wrapped to record its calls in timers[name]"""
+    timer = timers.setdefault(name, Timer())
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        """Times the call"""
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timer.record(time.perf_counter() - start)
+    return wrapper
+
+
+def instrument(cls, names):
+    """Times the methods names of cls, the ones it defines itself"""
+    for name in names:
+        func = cls.__dict__.get(name)
+        if callable(func) and not hasattr(func, '__wrapped__'):
+            setattr(cls, name, timed('{}.{}'.format(cls.__name__, name),
+                                     func))
+
+
+def enable(storage):
+    """
+    Times the methods of the storage engine and the models, and the
+    JSON encoding of the models and FileStorage
+    If HBNB_STATS_FILE is set, the stats are written to it at exit
+    """
+    global enabled
+    from models import base_model
+    from models.engine import file_storage
+
+    if enabled:
+        return
+    enabled = True
+    instrument(type(storage), ['save', 'reload', 'new', 'compact'])
+    for cls in set(file_storage.classes.values()):
+        for base in cls.__mro__:
+            instrument(base, ['to_dict'])
+    base_model.json = TimedModule(json, ['dumps'])
+    file_storage.json = TimedModule(json, ['dumps'])
+    if os.getenv('HBNB_STATS_FILE'):
+        atexit.register(dump, os.getenv('HBNB_STATS_FILE'))
+
+
+def reset():
+    """Clears the recorded calls"""
+    for timer in timers.values():
+        timer.__init__()
+
+
+def dump(path):
+    """Writes the timers to path as JSON, durations in seconds"""
+    with open(path, 'w') as s_file:
+        json.dump({name: timer.to_dict() for name, timer in timers.items()
+                   if timer.calls}, s_file, indent=2)
+
+
+def report():
+    """Returns the timers as text, one line per called function followed
+    by its histogram
+    """
+    lines = []
+    for name, timer in sorted(timers.items()):
+        if not timer.calls:
+            continue
+        lines.append('{}: {:d} calls, {:.6f}s total, {:.1f}us mean, '
+                     '{:.1f}us max'.format(name, timer.calls, timer.total,
+                                           timer.total / timer.calls * 1e6,
+                                           timer.max * 1e6))
+        lines.append('  ' + '  '.join(
+            '{} {:d}'.format(label, count)
+            for label, count in zip(LABELS, timer.buckets) if count))
+    return '\n'.join(lines)
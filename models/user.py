@@ -3,6 +3,7 @@
 This module contains a class User
 """
 
+import models
 from models.base_model import BaseModel
 
 
@@ -15,3 +16,8 @@ class User(BaseModel):
     password = ""
     first_name = ""
     last_name = ""
+
+    @property
+    def places(self):
+        """The Place instances owned by this user"""
+        return models.storage.related(self, 'Place', 'user_id')
@@ -0,0 +1,39 @@
+#!/usr/bin/python3
+"""
+Base test case of the tests working in a temporary directory
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import models
+from models.engine.file_storage import FileStorage
+
+
+class TempDirTestCase(unittest.TestCase):
+    """
+    Creates a temporary directory (self.tmp) before each test and removes
+    it after, self.path is the file named file_name in it
+    When options is set, self.storage is an empty FileStorage on
+    self.path opened with these arguments, and with current set it's
+    also models.storage during the test, so it's told of the attribute
+    changes of its objects
+    """
+    file_name = "file.json"
+    options = None
+    current = False
+
+    def setUp(self):
+        """Creates the temporary directory and the storage"""
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.path = os.path.join(self.tmp, self.file_name)
+        if self.options is not None:
+            self.storage = FileStorage(self.path, **self.options)
+            self.storage.clean()
+            if self.current:
+                patcher = patch.object(models, "storage", self.storage)
+                patcher.start()
+                self.addCleanup(patcher.stop)
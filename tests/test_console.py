@@ -6,11 +6,13 @@ Test module for the console 'create' command
 import os
 import sys
 import json
+import shlex
 import unittest
 from io import StringIO
 from unittest.mock import patch
 
 import models
+from models import stats
 from models.user import User
 from models.city import City
 from models.place import Place
@@ -18,7 +20,7 @@ from models.state import State
 from models.review import Review
 from models.amenity import Amenity
 from models.base_model import BaseModel
-from console import HBNBCommand as CMD
+from console import HBNBCommand as CMD, Command, main, split
 
 current_dir = os.path.dirname(os.path.realpath(__file__))
 parent_dir = os.path.dirname(current_dir)
@@ -32,7 +34,8 @@ class TestConsole(unittest.TestCase):
     def test_help(self):
         ideal = ("Documented commands (type help <topic>):\n"
                  "========================================\n"
-                 "EOF  all  count  create  destroy  help  quit  show  update")
+                 "EOF  count   destroy  help    quit  stats   where\n"
+                 "all  create  export   import  show  update")
         with patch("sys.stdout", new=StringIO()) as f:
             CMD().onecmd("help")
             self.assertEqual(f.getvalue().strip(), ideal)
@@ -1131,6 +1134,12 @@ class TestModelDotCountCommand(unittest.TestCase):
         output = self.output("User.count()")
         self.assertEqual(output.strip(), '0')
 
+    def test_count_does_not_stringify(self):
+        """test that count never turns objects into strings"""
+        with patch.object(BaseModel, "__str__", side_effect=AssertionError):
+            output = self.output("Review.count()")
+        self.assertEqual(output.strip(), '1')
+
 
 class TestAllCommand(unittest.TestCase):
     """
@@ -1223,6 +1232,226 @@ class TestAllCommand(unittest.TestCase):
         output = self.output("all")
         self.assertEqual(output.strip(), '[]')
 
+    def test_only_matching_objects_are_printed(self):
+        """test that other classes are never turned into strings"""
+        with patch.object(Place, "__str__", side_effect=AssertionError):
+            output = self.output("all User")
+        self.assertEqual(output.strip(), '["{}"]'.format(str(self.user)))
+
+
+class TestWhereCommand(unittest.TestCase):
+    """
+    Test where command
+    """
+    def setUp(self):
+        """Reset storage object"""
+        models.storage.clean()
+        self.places = []
+        for i in range(4):
+            place = Place()
+            place.price_by_night = i * 50
+            place.name = "Place {}".format(i)
+            self.places.append(place)
+        self.user = User()
+
+    def tearDown(self):
+        """Remove storage after every test"""
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+
+    def output(self, cmd):
+        """Returns console output"""
+        with patch('sys.stdout', new=StringIO()) as f:
+            CMD().onecmd(cmd)
+            return f.getvalue()
+
+    def test_errors(self):
+        """test missing or invalid arguments"""
+        self.assertEqual(self.output("where"), "** class name missing **\n")
+        self.assertEqual(self.output("where MyModel"),
+                         "** class doesn't exist **\n")
+        self.assertEqual(self.output("where Place price"),
+                         "** invalid filter **\n")
+        self.assertEqual(self.output("where Place limit=x"),
+                         "** invalid filter **\n")
+
+    def test_filters(self):
+        """test comparison and equality filters"""
+        output = self.output("where Place price_by_night__lt=100")
+        expected = '["{}", "{}"]'.format(str(self.places[0]),
+                                         str(self.places[1]))
+        self.assertEqual(output.strip(), expected)
+        output = self.output('where Place name="Place 3"')
+        self.assertEqual(output.strip(), '["{}"]'.format(str(self.places[3])))
+        self.assertEqual(self.output("where User").strip(),
+                         '["{}"]'.format(str(self.user)))
+
+    def test_dotted(self):
+        """test <Model>.where(...)"""
+        output = self.output('Place.where(price_by_night__gte=100, '
+                             'only="id name", limit=1)')
+        expected = [{"id": self.places[2].id, "name": "Place 2"}]
+        self.assertEqual(output.strip(), repr(expected))
+
+    def test_offset(self):
+        """test pagination"""
+        output = self.output("where Place only=id offset=3")
+        self.assertEqual(output.strip(), repr([{"id": self.places[3].id}]))
+        expected = repr([{"id": p.id} for p in self.places[1:3]])
+        for line in ("where Place only=id limit=2 offset=1",
+                     "where Place only=id offset=1 limit=2"):
+            self.assertEqual(self.output(line).strip(), expected)
+
+    def test_foreign_key_of_another_type(self):
+        """test a foreign key updated to a number"""
+        self.output("update Place {} city_id 123".format(self.places[1].id))
+        self.assertEqual(self.output("where Place city_id=123 only=id")
+                         .strip(), repr([{"id": self.places[1].id}]))
+
+
+class TestImportExportCommands(unittest.TestCase):
+    """
+    Test import and export commands
+    """
+    def setUp(self):
+        """Reset storage object"""
+        models.storage.clean()
+        self.places = []
+        for i in range(3):
+            place = Place()
+            place.name = "Place {}".format(i)
+            place.price_by_night = i * 50
+            place.amenity_ids = ["a", "b"]
+            self.places.append(place)
+        User()
+
+    def tearDown(self):
+        """Remove storage after every test"""
+        for path in ("file.json", "places.jsonl", "places.csv"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+
+    def output(self, cmd):
+        """Returns console output"""
+        with patch('sys.stdout', new=StringIO()) as f:
+            CMD().onecmd(cmd)
+            return f.getvalue()
+
+    def round_trip(self, path):
+        """Exports the places to path and imports them back"""
+        expected = {p.id: p.to_dict() for p in self.places}
+        self.assertRegex(self.output("export Place " + path),
+                         r"^3 records exported in \d+\.\d{3}s")
+        models.storage.clean()
+        with patch.object(models.storage, "compact",
+                          wraps=models.storage.compact) as compact:
+            self.assertTrue(self.output("import Place " + path).startswith(
+                "3 records imported in "))
+        self.assertEqual(compact.call_count, 1)
+        places = models.storage.all(Place).values()
+        self.assertEqual({p.id: p.to_dict() for p in places}, expected)
+        self.assertEqual(models.storage.count(), 3)
+        with open("file.json") as j_file:
+            self.assertEqual(len(json.load(j_file)), 3)
+
+    def test_json_lines(self):
+        """test an export and import in JSON Lines"""
+        self.round_trip("places.jsonl")
+        with open("places.jsonl") as file:
+            self.assertEqual(len(file.readlines()), 3)
+
+    def test_csv(self):
+        """test an export and import in CSV"""
+        self.round_trip("places.csv")
+
+    def test_csv_strings(self):
+        """test that strings which look like JSON are imported as strings"""
+        values = ["12345", "true", "null", '"Bob"', "", "[1]", " 2 "]
+        for place in self.places:
+            for i, value in enumerate(values):
+                setattr(place, "text_{}".format(i), value)
+        self.round_trip("places.csv")
+        place = models.storage.get(Place, self.places[0].id)
+        self.assertEqual(place.text_0, "12345")
+        """test missing or invalid arguments and records"""
+        self.assertEqual(self.output("import"), "** class name missing **\n")
+        self.assertEqual(self.output("export MyModel places.csv"),
+                         "** class doesn't exist **\n")
+        self.assertEqual(self.output("import Place"),
+                         "** file name missing **\n")
+        self.assertEqual(self.output("import Place places.jsonl"),
+                         "** can't read file **\n")
+        self.output("export Place places.jsonl")
+        with open("places.jsonl", "a") as file:
+            file.write("{not json\n")
+        models.storage.clean()
+        self.assertEqual(self.output("import Place places.jsonl"),
+                         "** invalid record 4 **\n")
+        self.assertEqual(self.output("import User places.jsonl"),
+                         "** invalid record 1 **\n")
+        self.assertEqual(models.storage.count(), 0)
+
+    def test_invalid_fields(self):
+        """test records with a non-string id or a bad timestamp"""
+        models.storage.clean()
+        for record in ({"id": 5}, {"created_at": 5},
+                       {"updated_at": "yesterday"}):
+            with open("places.jsonl", "w") as file:
+                file.write(json.dumps({"name": "ok"}) + "\n")
+                file.write(json.dumps(record) + "\n")
+            self.assertEqual(self.output("import Place places.jsonl"),
+                             "** invalid record 2 **\n")
+        self.assertEqual(models.storage.count(), 0)
+
+
+class TestParsing(unittest.TestCase):
+    """
+    Test the single pass parsing of command lines
+    """
+    def test_split_like_shlex(self):
+        """test that split gives the arguments shlex.split gives"""
+        for arg in ['', 'User', '  User  1234 ', 'User "a b" \'c d\' ""',
+                    'a"b c"', 'a\\ b', '"a\\"b"', "'{\"a\": 1}'",
+                    "x\ty\r\nz", '"unbalanced']:
+            with self.subTest(arg=arg):
+                try:
+                    expected = shlex.split(arg)
+                except ValueError:
+                    with self.assertRaises(ValueError):
+                        split(arg)
+                else:
+                    self.assertEqual(split(arg), expected)
+
+    def test_parse(self):
+        """test both syntaxes give the same command"""
+        self.assertEqual(CMD().parse('update User 12 name "John Doe"'),
+                         Command('update', 'User 12 name "John Doe"',
+                                 ['User', '12', 'name', 'John Doe'],
+                                 'update User 12 name "John Doe"'))
+        self.assertEqual(CMD().parse('User.update("12", "name", "John Doe")'),
+                         Command('update', 'User "12"  "name"  "John Doe"',
+                                 ['User', '12', 'name', 'John Doe'],
+                                 'update User "12"  "name"  "John Doe"'))
+        self.assertEqual(CMD().parse('User.update("12", {\'age\': 2})').args,
+                         ['User', '12', '{"age": 2}'])
+        self.assertEqual(CMD().parse('(1)'), Command('', '(1)', ['(1)'],
+                                                     '(1)'))
+        self.assertIsNone(CMD().parse('show "User').args)
+
+    def test_arguments_are_split_once(self):
+        """test that a command doesn't split its arguments again"""
+        console = CMD()
+        with patch("console.split", wraps=split) as split_mock, \
+                patch("sys.stdout", new=StringIO()) as f:
+            console.onecmd('count User')
+        split_mock.assert_called_once_with('User')
+        self.assertEqual(f.getvalue(), "{}\n".format(
+            models.storage.count(User)))
+
 
 class TestUpdateCommand(unittest.TestCase):
     """
@@ -1394,6 +1623,18 @@ class TestUpdateCommand(unittest.TestCase):
         expected = "** attribute name missing **\n"
         self.assertEqual(output, expected)
 
+    def test_with_relationship_attribute(self):
+        """test that the read-only relationships can't be updated"""
+        expected = "** attribute can't be set **\n"
+        for cmd in ("update Place {} amenities wifi".format(self.place.id),
+                    'Place.update("{}", {{"reviews": 1}})'.format(
+                        self.place.id),
+                    'State.update("{}", "cities", "x")'.format(self.state.id),
+                    "update User {} places 2".format(self.user.id)):
+            self.assertEqual(self.output(cmd), expected)
+        self.assertEqual(self.place.amenities, [])
+        self.assertEqual(self.user.places, [])
+
     def test_with_base_model_without_attribute_value(self):
         cmd = "update BaseModel {} name".format(self.base.id)
         output = self.output(cmd)
@@ -1743,3 +1984,136 @@ class TestModelDotUpdateCommand(unittest.TestCase):
 
     def test_with_amenity_model_with_double_attribute_value(self):
         self.with_valid_id_and_dictionary('Amenity', self.amenity)
+
+    def test_dictionary_update_writes_once(self):
+        """test that a dictionary update flushes storage a single time"""
+        cmd = 'User.update("{}", {})'.format(
+            self.user.id, {"grade": "1st class", "age": 27, "job": "dev"}
+        )
+        with patch.object(models.storage, "compact",
+                          wraps=models.storage.compact) as compact:
+            output = self.output(cmd)
+        self.assertEqual(output, "")
+        self.assertEqual(compact.call_count, 1)
+        self.assertEqual(self.storage()["User." + self.user.id]["job"], "dev")
+
+
+class TestBatchMode(unittest.TestCase):
+    """
+    Test batch execution of scripts
+    """
+    def setUp(self):
+        """Reset storage object"""
+        models.storage.clean()
+
+    def tearDown(self):
+        """Remove storage after every test"""
+        for path in ("file.json", "script.hbnb"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+
+    def test_flushes_every_chunk(self):
+        """test that saves are flushed once per chunk of commands"""
+        lines = ["create User\n"] * 5 + ["count User\n"]
+        with patch.object(models.storage, "compact",
+                          wraps=models.storage.compact) as compact:
+            with patch("sys.stdout", new=StringIO()) as f:
+                self.assertEqual(CMD().run_batch(lines, every=2), 6)
+        self.assertEqual(compact.call_count, 3)
+        self.assertEqual(f.getvalue().splitlines()[-1], "5")
+        with open("file.json") as j_file:
+            self.assertEqual(len(json.load(j_file)), 5)
+
+    def test_quit_stops_script(self):
+        """test that quit ends the script and still flushes"""
+        lines = ["create State", "quit", "create State"]
+        with patch("sys.stdout", new=StringIO()):
+            self.assertEqual(CMD().run_batch(lines), 2)
+        self.assertEqual(models.storage.count(State), 1)
+        with open("file.json") as j_file:
+            self.assertEqual(len(json.load(j_file)), 1)
+
+    def test_main_with_script(self):
+        """test --batch and the throughput report"""
+        with open("script.hbnb", "w") as script:
+            script.write("create City\ncreate City\nall City\n")
+        with patch("sys.stdout", new=StringIO()) as out, \
+                patch("sys.stderr", new=StringIO()) as err:
+            main(["--batch", "script.hbnb"])
+        self.assertEqual(len(out.getvalue().splitlines()), 3)
+        self.assertNotIn("(hbnb)", out.getvalue())
+        self.assertRegex(err.getvalue(),
+                         r"^3 commands in \d+\.\d{3}s \(\d+ commands/s\)\n$")
+        self.assertEqual(models.storage.count(City), 2)
+
+    def test_main_with_piped_stdin(self):
+        """test that a non-tty stdin runs in batch mode"""
+        with patch("sys.stdin", new=StringIO("create Place\ncount Place\n")), \
+                patch("sys.stdout", new=StringIO()) as out, \
+                patch("sys.stderr", new=StringIO()) as err:
+            main([])
+        self.assertEqual(out.getvalue().splitlines()[-1], "1")
+        self.assertTrue(err.getvalue().startswith("2 commands in "))
+
+
+class TestStatsCommand(unittest.TestCase):
+    """
+    Test stats command
+    """
+    def setUp(self):
+        """Starts from a single recorded timer"""
+        self.timers = patch.dict(stats.timers, {"do_show": stats.Timer()},
+                                 clear=True)
+        self.timers.start()
+        stats.timers["do_show"].record(0.002)
+
+    def tearDown(self):
+        """Restores the timers"""
+        self.timers.stop()
+        try:
+            os.remove("stats.json")
+        except IOError:
+            pass
+
+    def output(self, cmd):
+        """Returns console output"""
+        with patch('sys.stdout', new=StringIO()) as f:
+            CMD().onecmd(cmd)
+            return f.getvalue()
+
+    def test_disabled(self):
+        """test that stats need the instrumentation"""
+        with patch.object(stats, "enabled", False):
+            self.assertEqual(self.output("stats"),
+                             "** stats are disabled **\n")
+
+    def test_stats(self):
+        """test report, dump and reset"""
+        with patch.object(stats, "enabled", True):
+            self.assertEqual(self.output("stats"), stats.report() + "\n")
+            self.assertIn("<10ms 1", self.output("stats"))
+            self.assertEqual(self.output("stats dump"),
+                             "** file name missing **\n")
+            self.assertEqual(self.output("stats dump stats.json"), "")
+            with open("stats.json") as s_file:
+                self.assertEqual(json.load(s_file)["do_show"]["calls"], 1)
+            self.assertEqual(self.output("stats clear"),
+                             "** invalid argument **\n")
+            self.assertEqual(self.output("stats reset"), "")
+            self.assertEqual(self.output("stats"), "\n")
+
+    def test_main_flag(self):
+        """test that --stats times the commands"""
+        with patch.object(stats, "enable") as enable, \
+                patch.object(stats, "instrument") as instrument, \
+                patch("sys.stdin", new=StringIO("")), \
+                patch("sys.stderr", new=StringIO()):
+            main(["--stats"])
+        enable.assert_called_once_with(models.storage)
+        self.assertIn("do_create", instrument.call_args[0][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
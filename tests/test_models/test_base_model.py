@@ -5,8 +5,10 @@ Unittest classes:
     TestBaseModel_instantiation
     TestBaseModel_save
     TestBaseModel_to_dict
+    TestBaseModel_changes
 """
 import os
+import json
 import models
 import unittest
 from datetime import datetime
@@ -137,6 +139,21 @@ class TestBaseModel_save(unittest.TestCase):
         with open("file.json", "r") as f:
             self.assertIn(bmid, f.read())
 
+    def test_save_after_delete(self):
+        bm = BaseModel()
+        models.storage.delete(bm)
+        bm.save()
+        self.assertIsNone(models.storage.get(BaseModel, bm.id))
+        with open("file.json", "r") as f:
+            self.assertNotIn("BaseModel." + bm.id, f.read())
+
+    def test_save_of_copy(self):
+        bm = BaseModel()
+        copy = BaseModel(**bm.to_dict())
+        copy.name = "copy"
+        copy.save()
+        self.assertIs(models.storage.get(BaseModel, bm.id), bm)
+
 
 class TestBaseModel_to_dict(unittest.TestCase):
     """Unittests for testing to_dict method of the BaseModel class."""
@@ -188,5 +205,53 @@ class TestBaseModel_to_dict(unittest.TestCase):
             bm.to_dict(None)
 
 
+class TestBaseModel_changes(unittest.TestCase):
+    """Unittests for the change stamps of the BaseModel class."""
+
+    def test_stamp_moves_on_change(self):
+        bm = BaseModel()
+        first = bm._changed
+        bm.name = "Holberton"
+        self.assertGreater(bm._changed, first)
+        second = bm._changed
+        del bm.name
+        self.assertGreater(bm._changed, second)
+
+    def test_stamp_not_an_attribute(self):
+        bm = BaseModel()
+        self.assertNotIn("_changed", bm.__dict__)
+        self.assertNotIn("_changed", bm.to_dict())
+        self.assertNotIn("_changed", str(bm))
+
+    def test_to_dict_is_cached(self):
+        bm = BaseModel()
+        first = bm.to_dict()
+        first["name"] = "changed"
+        self.assertNotIn("name", bm.to_dict())
+        bm.name = "Holberton"
+        self.assertEqual(bm.to_dict()["name"], "Holberton")
+        del bm.name
+        self.assertNotIn("name", bm.to_dict())
+
+    def test_to_json(self):
+        bm = BaseModel()
+        bm.my_number = 89
+        self.assertIsInstance(bm.to_json(), bytes)
+        self.assertIs(bm.to_json(), bm.to_json())
+        self.assertEqual(json.loads(bm.to_json()), bm.to_dict())
+        bm.my_number = 90
+        self.assertEqual(json.loads(bm.to_json())["my_number"], 90)
+
+    def test_mutable_values_are_not_cached(self):
+        bm = BaseModel()
+        bm.amenity_ids = ["a"]
+        self.assertEqual(bm.to_dict()["amenity_ids"], ["a"])
+        bm.to_json()
+        bm.amenity_ids.append("b")
+        self.assertEqual(bm.to_dict()["amenity_ids"], ["a", "b"])
+        self.assertEqual(json.loads(bm.to_json())["amenity_ids"],
+                         ["a", "b"])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+"""
+Unittests for the compact variants of the model classes
+"""
+
+import json
+import models
+import unittest
+from datetime import datetime
+from unittest.mock import call, patch
+from models.compact_model import Attributes, CompactModel, compact
+from models.engine.file_storage import build
+from models.place import Place
+from models.state import State
+
+
+class TestCompactModel(unittest.TestCase):
+    """
+    Tests compact() and CompactModel functionality
+    """
+    @classmethod
+    def setUpClass(cls):
+        """Builds the compact variants"""
+        cls.Place = compact(Place)
+        cls.State = compact(State)
+
+    def test_no_instance_dict(self):
+        """Test that instances have slots and no __dict__ of their own"""
+        place = self.Place(**Place().to_dict())
+        self.assertTrue(issubclass(self.Place, CompactModel))
+        self.assertEqual(self.Place.__name__, "Place")
+        self.assertIn("price_by_night", self.Place.__slots__)
+        self.assertEqual(self.Place.__dictoffset__, 0)
+        self.assertNotEqual(Place.__dictoffset__, 0)
+        self.assertIsInstance(place.__dict__, Attributes)
+
+    def test_defaults(self):
+        """Test that unset attributes read as the class defaults"""
+        place = self.Place(**Place().to_dict())
+        self.assertEqual(place.price_by_night, 0)
+        self.assertEqual(place.amenity_ids, [])
+        self.assertNotIn("price_by_night", place.__dict__)
+        with self.assertRaises(AttributeError):
+            place.pets
+
+    def test_overflow_attributes(self):
+        """Test that ad-hoc attributes are kept in the overflow dict"""
+        state = self.State(**State().to_dict())
+        self.assertIsNone(state._extra)
+        state.name = "California"
+        state.capital = "Sacramento"
+        self.assertEqual(state.capital, "Sacramento")
+        self.assertEqual(state._extra, {"capital": "Sacramento"})
+        del state.capital
+        self.assertFalse(hasattr(state, "capital"))
+
+    def test_same_dict_and_str(self):
+        """Test that to_dict and __str__ match the regular class"""
+        value = Place().to_dict()
+        value.update(price_by_night=10, pets="yes")
+        regular = Place(**value)
+        slotted = self.Place(**value)
+        self.assertEqual(slotted.to_dict(), regular.to_dict())
+        self.assertEqual(slotted.__dict__, regular.__dict__)
+        self.assertTrue(str(slotted).startswith("[Place] ("))
+        self.assertEqual(json.loads(json.dumps(slotted.to_dict())),
+                         regular.to_dict())
+
+    def test_dict_view_update(self):
+        """Test that __dict__.update sets slots and overflow attributes"""
+        place = object.__new__(self.Place)
+        now = datetime.now()
+        place.__dict__.update({"id": "1", "created_at": now,
+                               "updated_at": now, "max_guest": 4, "x": 1})
+        self.assertEqual(place.max_guest, 4)
+        self.assertEqual(place.x, 1)
+        self.assertEqual(place.__dict__["id"], "1")
+        self.assertIn("x", place.__dict__)
+        self.assertEqual(len(place.__dict__), 5)
+
+    def test_build_through_registry(self):
+        """Test that the loader builds compact instances"""
+        from models.engine import file_storage
+
+        file_storage.classes["Place"] = self.Place
+        try:
+            place = build("Place", {"id": "1", "max_guest": 2})
+        finally:
+            file_storage.classes["Place"] = Place
+        self.assertIs(type(place), self.Place)
+        self.assertEqual(place.max_guest, 2)
+
+    def test_serialized_cache(self):
+        """Test that the cached serialized forms follow the changes"""
+        place = self.Place(**Place().to_dict())
+        self.assertEqual(json.loads(place.to_json()), place.to_dict())
+        place.max_guest = 4
+        place.pets = True
+        self.assertEqual(json.loads(place.to_json())["max_guest"], 4)
+        del place.pets
+        self.assertNotIn("pets", place.to_dict())
+        self.assertNotIn("_cache", place.__dict__)
+
+    def test_storage_is_told(self):
+        """Test that setting and deleting attributes calls touch"""
+        place = self.Place(**Place().to_dict())
+        with patch.object(models.storage, "touch") as touch:
+            place.max_guest = 4
+            place.pets = True
+            del place.pets
+        self.assertEqual(touch.call_args_list, [call(place, "max_guest"),
+                                                call(place, "pets"),
+                                                call(place, "pets")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+"""
+Unittests for the binary snapshot format
+"""
+
+import io
+import json
+import os
+import unittest
+import uuid
+from datetime import datetime, timezone
+from models.engine import binary_snapshot
+from tests.storage_case import TempDirTestCase
+
+
+class TestBinarySnapshot(unittest.TestCase):
+    """
+    Tests binary_snapshot dump and load
+    """
+    def roundtrip(self, rows):
+        """Dumps rows and loads them back"""
+        b_file = io.BytesIO()
+        binary_snapshot.dump(rows, b_file)
+        b_file.seek(0)
+        return list(binary_snapshot.load(b_file))
+
+    def test_column_encodings(self):
+        """Test that every kind of value is read back unchanged"""
+        now = datetime.now()
+        rows = [("Place", {"id": str(uuid.uuid4()), "created_at": now,
+                           "updated_at": datetime.now(timezone.utc),
+                           "city_id": "Lagos", "name": "café",
+                           "max_guest": 3, "latitude": 6.5,
+                           "amenity_ids": ["a", "b"], "big": 2 ** 70,
+                           "flag": True}),
+                ("Place", {"id": "not-a-uuid", "created_at": now,
+                           "updated_at": datetime.now(timezone.utc),
+                           "city_id": "Lagos", "name": "B",
+                           "max_guest": -1, "latitude": 0.25,
+                           "amenity_ids": [], "big": 1, "flag": None}),
+                ("User", {"id": str(uuid.uuid4()), "email": "a@b.c"})]
+        self.assertEqual(self.roundtrip(rows), [rows[0], rows[1], rows[2]])
+
+    def test_missing_attributes(self):
+        """Test that attributes only some rows have stay on those rows"""
+        rows = [("City", {"id": "1", "state_id": "s"}),
+                ("City", {"id": "2"}),
+                ("City", {"id": "3", "extra": 4})]
+        self.assertEqual(self.roundtrip(rows), rows)
+
+    def test_empty(self):
+        """Test a snapshot without instances"""
+        self.assertEqual(self.roundtrip([]), [])
+
+    def test_not_a_snapshot(self):
+        """Test that other files are refused"""
+        with self.assertRaises(ValueError):
+            list(binary_snapshot.load(io.BytesIO(b"{}")))
+
+
+class TestBinarySnapshotConverters(TempDirTestCase):
+    """
+    Tests the conversions between file.json and the binary format
+    """
+    def test_json_roundtrip(self):
+        """Test that converting there and back keeps the records"""
+        now = datetime.now().isoformat()
+        data = {}
+        for i in range(5):
+            uid = str(uuid.uuid4())
+            data["Review." + uid] = {"id": uid, "created_at": now,
+                                     "updated_at": now, "text": str(i),
+                                     "__class__": "Review"}
+        src = os.path.join(self.tmp, "file.json")
+        bin_path = os.path.join(self.tmp, "file.hbnb")
+        dst = os.path.join(self.tmp, "back.json")
+        with open(src, "w") as f:
+            json.dump(data, f)
+        binary_snapshot.json_to_binary(src, bin_path)
+        binary_snapshot.binary_to_json(bin_path, dst)
+        with open(dst, "r") as f:
+            self.assertEqual(json.load(f), data)
+        self.assertLess(os.path.getsize(bin_path), os.path.getsize(src))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/python3
+"""
+Unittests for class ColumnStorage
+"""
+
+import json
+import os
+import unittest
+from models.city import City
+from models.engine.column_storage import ColumnStorage
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.user import User
+from tests.storage_case import TempDirTestCase
+
+
+class TestColumnStorage(TempDirTestCase):
+    """
+    Tests ColumnStorage functionality
+    """
+    def setUp(self):
+        """Fills a storage with cities and places"""
+        super().setUp()
+        self.storage = ColumnStorage(self.path)
+        self.cities = [City(**City().to_dict()) for i in range(2)]
+        for city in self.cities:
+            self.storage.new(city)
+        self.places = []
+        for i in range(6):
+            place = Place(**Place().to_dict())
+            place.city_id = self.cities[i % 2].id
+            place.price_by_night = i * 10
+            self.storage.new(place)
+            self.places.append(place)
+
+    def test_get_builds_instance(self):
+        """Test that get builds an instance equal to the stored one"""
+        place = self.places[3]
+        obj = self.storage.get(Place, place.id)
+        self.assertIsNot(obj, place)
+        self.assertIs(type(obj), Place)
+        self.assertEqual(obj.to_dict(), place.to_dict())
+        self.assertIsNone(self.storage.get("Place", self.cities[0].id))
+        self.assertIsNone(self.storage.get("User", "missing"))
+
+    def test_all_and_count(self):
+        """Test all and count per class"""
+        self.assertEqual(self.storage.count(), 8)
+        self.assertEqual(self.storage.count(City), 2)
+        self.assertEqual(self.storage.count("User"), 0)
+        self.assertEqual(set(self.storage.all(Place)),
+                         {"Place." + p.id for p in self.places})
+        self.assertEqual(len(self.storage.all()), 8)
+
+    def test_update_and_delete(self):
+        """Test that new replaces the row and delete removes it"""
+        place = self.places[0]
+        place.name = "Loft"
+        place.pets = True
+        self.storage.new(place)
+        self.assertEqual(self.storage.count(Place), 6)
+        obj = self.storage.get(Place, place.id)
+        self.assertEqual((obj.name, obj.pets), ("Loft", True))
+        self.assertNotIn("pets", self.storage.get(Place,
+                                                  self.places[1].id).__dict__)
+        for place in self.places[:5]:
+            self.storage.delete(place)
+        self.assertEqual(self.storage.count(Place), 1)
+        self.assertEqual(self.storage.get(Place, self.places[5].id).to_dict(),
+                         self.places[5].to_dict())
+
+    def test_update(self):
+        """Test that update stores a copy again, not a deleted one"""
+        copy = self.storage.get(Place, self.places[0].id)
+        copy.name = "Loft"
+        self.storage.update(copy)
+        self.assertEqual(self.storage.get(Place, copy.id).name, "Loft")
+        self.storage.delete(self.places[1])
+        self.storage.update(self.places[1])
+        self.assertIsNone(self.storage.get(Place, self.places[1].id))
+
+    def test_aggregate(self):
+        """Test aggregates over a column, grouped or not"""
+        self.assertEqual(self.storage.aggregate(Place, "price_by_night"), 25)
+        self.assertEqual(self.storage.aggregate(Place, "price_by_night",
+                                                "max"), 50)
+        self.assertEqual(self.storage.aggregate("Place", "price_by_night",
+                                                "avg", by="city_id"),
+                         {self.cities[0].id: 20, self.cities[1].id: 30})
+        self.assertEqual(self.storage.aggregate(Place, "max_guest", "sum"), 0)
+        self.assertIsNone(self.storage.aggregate(User, "email", "count"))
+        with self.assertRaises(ValueError):
+            self.storage.aggregate(Place, "price_by_night", "median")
+
+    def test_aggregate_mixed_types(self):
+        """Test that a value of another type keeps its type"""
+        place = self.places[0]
+        place.price_by_night = "cheap"
+        self.storage.new(place)
+        self.assertEqual(self.storage.get(Place, place.id).price_by_night,
+                         "cheap")
+        self.assertEqual(self.storage.aggregate(Place, "price_by_night",
+                                                "min"), 10)
+        self.assertEqual(self.storage.aggregate(Place, "price_by_night",
+                                                "count"), 6)
+
+    def test_save_reload(self):
+        """Test that the JSON file is the one of FileStorage"""
+        self.storage.save()
+        with open(self.path) as f:
+            self.assertEqual(len(json.load(f)), 8)
+        files = FileStorage(self.path)
+        files.clean()
+        files.reload()
+        self.assertEqual(files.all()["Place." + self.places[2].id].to_dict(),
+                         self.places[2].to_dict())
+        storage = ColumnStorage(self.path)
+        storage.reload()
+        self.assertEqual(storage.count(), 8)
+        self.assertEqual(storage.aggregate(Place, "price_by_night", "sum"),
+                         150)
+
+    def test_batch(self):
+        """Test that saves inside a batch are written once"""
+        with self.storage.batch():
+            self.storage.save()
+            self.assertFalse(os.path.exists(self.path))
+        self.assertTrue(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+#!/usr/bin/python3
+"""
+Unittests for class DBStorage, against a SQLite file
+"""
+
+import sqlite3
+import unittest
+from models.engine.db_storage import ConnectionPool, DBStorage, columns
+from models.place import Place
+from models.state import State
+from models.user import User
+from tests.storage_case import TempDirTestCase
+
+
+class TestDBStorage(TempDirTestCase):
+    """
+    Tests DBStorage functionality
+    """
+    file_name = "hbnb.db"
+
+    def setUp(self):
+        """Opens a storage on a temporary SQLite file"""
+        super().setUp()
+        self.storage = self.open()
+
+    def tearDown(self):
+        """Closes the storage"""
+        self.storage.close()
+
+    def open(self):
+        """Returns a reloaded storage on self.path"""
+        storage = DBStorage(self.path)
+        storage.reload()
+        return storage
+
+    def test_tables(self):
+        """Test that reload creates a table per class"""
+        conn = sqlite3.connect(self.path)
+        names = {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        conn.close()
+        self.assertTrue({"states", "cities", "users", "places", "reviews",
+                         "amenities", "base_models"} <= names)
+
+    def test_columns(self):
+        """Test that declared class attributes get a column"""
+        self.assertEqual(columns(Place)["price_by_night"], int)
+        self.assertEqual(columns(Place)["amenity_ids"], list)
+        self.assertEqual(columns(State), {"name": str})
+
+    def test_save_and_reload(self):
+        """Test that saved objects are read back"""
+        place = Place(**Place().to_dict())
+        place.price_by_night = 120
+        place.latitude = 37.77
+        place.amenity_ids = ["a", "b"]
+        place.pets = "yes"
+        self.storage.new(place)
+        self.storage.save()
+        storage = self.open()
+        obj = storage.get(Place, place.id)
+        self.assertIsNot(obj, place)
+        self.assertEqual(obj.to_dict(), place.to_dict())
+        self.assertEqual(obj.created_at, place.created_at)
+        self.assertIsNone(storage.get("Place", "missing"))
+        storage.close()
+
+    def test_mismatched_type_goes_to_extra(self):
+        """Test that an attribute of another type keeps its type"""
+        place = Place(**Place().to_dict())
+        place.price_by_night = "12"
+        self.storage.new(place)
+        self.storage.save()
+        self.assertEqual(self.storage.get(Place, place.id).price_by_night,
+                         "12")
+
+    def test_all_and_count(self):
+        """Test all and count, saved or not"""
+        users = [User(**User().to_dict()) for i in range(3)]
+        for user in users:
+            self.storage.new(user)
+        state = State(**State().to_dict())
+        self.storage.new(state)
+        self.assertEqual(self.storage.count(), 4)
+        self.storage.save()
+        self.storage.new(User(**User().to_dict()))
+        self.storage.new(users[0])
+        self.storage.delete(users[1])
+        self.assertEqual(self.storage.count(), 4)
+        self.assertEqual(self.storage.count(User), 3)
+        self.assertEqual(self.storage.count("Amenity"), 0)
+        self.assertEqual(len(self.storage.all("User")), 3)
+        self.assertNotIn("User." + users[1].id, self.storage.all())
+        self.assertEqual(list(self.storage.all(State)), ["State." + state.id])
+
+    def test_delete(self):
+        """Test that deletions are written by save"""
+        user = User(**User().to_dict())
+        self.storage.new(user)
+        self.storage.save()
+        self.storage.delete(user)
+        self.assertIsNone(self.storage.get(User, user.id))
+        self.storage.save()
+        self.assertEqual(self.open().count(), 0)
+
+    def test_update(self):
+        """Test that update writes a stored copy, not a deleted one"""
+        users = [User(**User().to_dict()) for i in range(2)]
+        for user in users:
+            self.storage.new(user)
+        self.storage.save()
+        copy = self.storage.get(User, users[0].id)
+        copy.first_name = "Betty"
+        self.storage.update(copy)
+        self.storage.delete(users[1])
+        self.storage.update(users[1])
+        self.storage.save()
+        storage = self.open()
+        self.assertEqual(storage.get(User, users[0].id).first_name, "Betty")
+        self.assertIsNone(storage.get(User, users[1].id))
+
+    def test_batch(self):
+        """Test that saves inside a batch are written once"""
+        user = User(**User().to_dict())
+        with self.storage.batch():
+            self.storage.new(user)
+            self.storage.save()
+            self.assertEqual(DBStorage(self.path).count(), 0)
+        self.assertEqual(DBStorage(self.path).count(), 1)
+
+
+class TestConnectionPool(unittest.TestCase):
+    """
+    Tests ConnectionPool functionality
+    """
+    def test_reuses_connections(self):
+        """Test that connections are opened once and reused"""
+        opened = []
+
+        def connect():
+            """Opens an in-memory database"""
+            opened.append(sqlite3.connect(":memory:"))
+            return opened[-1]
+        pool = ConnectionPool(connect, 2)
+        with pool.connection() as first:
+            with pool.connection() as second:
+                self.assertIsNot(first, second)
+        with pool.connection() as conn:
+            self.assertIn(conn, (first, second))
+        self.assertEqual(len(opened), 2)
+        pool.close()
+
+    def test_rollback(self):
+        """Test that an exception rolls the transaction back"""
+        pool = ConnectionPool(lambda: sqlite3.connect(":memory:"), 1)
+        with pool.connection() as conn:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+        with self.assertRaises(ValueError):
+            with pool.connection() as conn:
+                conn.execute("INSERT INTO t VALUES (1)")
+                raise ValueError
+        with pool.connection() as conn:
+            self.assertEqual(conn.execute(
+                "SELECT COUNT(*) FROM t").fetchone()[0], 0)
+        pool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,8 +4,9 @@ Unittests for class FileStorage
 """
 
 import inspect
+import models
 from models.engine import file_storage
-from models.engine.file_storage import classes
+from models.engine.file_storage import classes, iter_records
 from models.base_model import BaseModel
 from models.user import User
 from models.amenity import Amenity
@@ -13,10 +14,14 @@ from models.city import City
 from models.place import Place
 from models.review import Review
 from models.state import State
+import io
 import json
 import os
 import pycodestyle
 import unittest
+import unittest.mock
+from tests.storage_case import TempDirTestCase
+from datetime import datetime
 FileStorage = file_storage.FileStorage
 
 
@@ -119,5 +124,671 @@ class TestFileStorage(unittest.TestCase):
         self.assertEqual(json.loads(string), json.loads(js))
 
 
+class TestLoad(unittest.TestCase):
+    """
+    Tests the class registry and the building of instances from records
+    """
+    def test_classes(self):
+        """Test that every model is registered under its name"""
+        self.assertEqual(set(classes), {"BaseModel", "User", "City", "State",
+                                        "Place", "Review", "Amenity"})
+        for name, cls in classes.items():
+            self.assertEqual(cls.__name__, name)
+
+    def test_load(self):
+        """Test that a record gives back its instance without __init__"""
+        place = Place()
+        place.name = "Loft"
+        with unittest.mock.patch.object(Place, "__init__") as init:
+            obj = file_storage.load(place.to_dict())
+        init.assert_not_called()
+        self.assertIs(type(obj), Place)
+        self.assertEqual(obj.to_dict(), place.to_dict())
+        self.assertEqual(obj.created_at, place.created_at)
+        self.assertEqual(obj._changed, 0)
+        with self.assertRaises(KeyError):
+            file_storage.load({"__class__": "MyModel", "id": "1"})
+
+    def test_missing_attributes(self):
+        """Test that a missing id or timestamp gets a default value"""
+        obj = file_storage.build("User", {"email": "a@b.c"})
+        self.assertIsInstance(obj.id, str)
+        self.assertIsInstance(obj.created_at, datetime)
+        self.assertIsInstance(obj.updated_at, datetime)
+        self.assertEqual(obj.email, "a@b.c")
+        self.assertIn(obj.id, str(obj))
+        self.assertEqual(obj.to_dict()["id"], obj.id)
+        obj = file_storage.load({"__class__": "City", "id": "1",
+                                 "created_at": "2017-09-28T21:03:54.052298"})
+        self.assertEqual(obj.id, "1")
+        self.assertEqual(obj.created_at.year, 2017)
+        self.assertIsInstance(obj.updated_at, datetime)
+
+
+class TestFileStorageWriter(TempDirTestCase):
+    """
+    Tests the streaming writer behind FileStorage.save()
+    """
+    options = {}
+
+    def setUp(self):
+        """Saves two objects in a temporary directory"""
+        super().setUp()
+        self.storage.new(User())
+        self.storage.new(City())
+        self.storage.save()
+        with open(self.path, "r") as f:
+            self.saved = f.read()
+
+    def test_one_record_per_line(self):
+        """Test that each record is written on its own line"""
+        lines = self.saved.splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(len(json.loads(self.saved)), 2)
+
+    def test_failed_save_keeps_file(self):
+        """Test that an error while saving leaves the JSON file intact"""
+        broken = Place(**Place().to_dict())
+        broken.to_dict = None
+        self.storage.new(broken)
+        with self.assertRaises(TypeError):
+            self.storage.save()
+        with open(self.path, "r") as f:
+            self.assertEqual(f.read(), self.saved)
+        self.assertEqual(os.listdir(self.tmp), ["file.json"])
+
+    def test_missing_directory(self):
+        """Test that a failed open is reported as it is"""
+        storage = FileStorage(os.path.join(self.tmp, "missing", "file.json"))
+        storage.clean()
+        with self.assertRaises(FileNotFoundError) as error:
+            storage.save()
+        self.assertIn("missing", str(error.exception))
+        self.assertIsNone(error.exception.__context__)
+
+    def test_reload_single_line_file(self):
+        """Test that files written by json.dumps still load"""
+        with open(self.path, "w") as f:
+            f.write(json.dumps(json.loads(self.saved)))
+        storage = FileStorage(self.path)
+        storage.clean()
+        storage.reload()
+        self.assertEqual(list(storage.all()), list(json.loads(self.saved)))
+
+
+class TestIterRecords(unittest.TestCase):
+    """
+    Tests the incremental parser used by FileStorage.reload()
+    """
+    def parse(self, text, size):
+        """Returns the records parsed from text read size chars at once"""
+        return list(iter_records(io.StringIO(text), size))
+
+    def test_records_across_chunks(self):
+        """Test that records split between chunks are parsed"""
+        texts = ['{}', ' {\n} ', '{"a": {"x": 1}, "b\\"c": {"y": [1, 2]}}',
+                 '{"a":1,"b" : "s", "c": 12.5}', '{\n"a": {}\n}\n']
+        for text in texts:
+            for size in (1, 2, 7, 65536):
+                with self.subTest(text=text, size=size):
+                    self.assertEqual(self.parse(text, size),
+                                     list(json.loads(text).items()))
+
+    def test_empty_file(self):
+        """Test that an empty file has no records"""
+        self.assertEqual(self.parse('', 4), [])
+        self.assertEqual(self.parse(' \n', 4), [])
+
+    def test_invalid_json(self):
+        """Test that malformed files raise ValueError"""
+        for text in ['[1]', '{"a" 1}', '{"a": 1 "b": 2}', '{"a": {']:
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    self.parse(text, 2)
+
+
+class TestFileStorageClassIndex(unittest.TestCase):
+    """
+    Tests the per-class index behind all(cls) and count(cls)
+    """
+    def setUp(self):
+        """Fills an isolated storage with a few objects"""
+        self.storage = FileStorage()
+        self.storage.clean()
+        self.users = [User(), User()]
+        self.place = Place()
+        for obj in self.users + [self.place]:
+            self.storage.new(obj)
+
+    def test_all_with_class(self):
+        """Test that all(cls) only returns instances of cls"""
+        keys = ["User." + u.id for u in self.users]
+        self.assertEqual(list(self.storage.all(User)), keys)
+        self.assertEqual(list(self.storage.all("User")), keys)
+        self.assertEqual(self.storage.all(Review), {})
+
+    def test_count(self):
+        """Test that count matches all with or without a class"""
+        self.assertEqual(self.storage.count(), 3)
+        self.assertEqual(self.storage.count(User), 2)
+        self.assertEqual(self.storage.count("Place"), 1)
+        self.assertEqual(self.storage.count(State), 0)
+
+    def test_delete_updates_index(self):
+        """Test that deleted objects leave the class index"""
+        self.storage.delete(self.users[0])
+        self.assertEqual(self.storage.count(User), 1)
+        self.assertNotIn("User." + self.users[0].id, self.storage.all())
+
+    def test_clean_resets_index(self):
+        """Test that clean empties the class index"""
+        self.storage.clean()
+        self.assertEqual(self.storage.count(User), 0)
+        self.assertEqual(self.storage.all(Place), {})
+
+
+class TestFileStorageForeignKeys(TempDirTestCase):
+    """
+    Tests the secondary indexes of the foreign keys
+    """
+    def setUp(self):
+        """Fills the storage with a state, cities and reviews"""
+        super().setUp()
+        self.storage = models.storage
+        self.storage.clean()
+        self.state = State()
+        self.cities = [City(), City(), City()]
+        for city in self.cities[:2]:
+            city.state_id = self.state.id
+
+    def tearDown(self):
+        """Empties the storage"""
+        self.storage.clean()
+
+    def cities_of(self, state_id):
+        """Returns the cities found through the index"""
+        return self.storage.query(City).filter(state_id=state_id).all()
+
+    def test_lookup(self):
+        """Test that equality filters are answered by the index"""
+        self.assertEqual(self.cities_of(self.state.id), self.cities[:2])
+        self.assertEqual(self.cities_of("other"), [])
+        with unittest.mock.patch.object(City, "__getattribute__",
+                                        side_effect=AssertionError):
+            self.assertEqual(self.storage.query(City).filter(
+                state_id="none").count(), 0)
+
+    def test_attribute_update(self):
+        """Test that setting a foreign key moves the object"""
+        self.cities[0].state_id = "other"
+        self.cities[2].state_id = self.state.id
+        self.assertEqual(self.cities_of(self.state.id),
+                         [self.cities[1], self.cities[2]])
+        self.assertEqual(self.cities_of("other"), [self.cities[0]])
+
+    def test_delete_and_replace(self):
+        """Test that delete and new keep the index in sync"""
+        self.storage.delete(self.cities[0])
+        self.assertEqual(self.cities_of(self.state.id), [self.cities[1]])
+        copy = City(**self.cities[1].to_dict())
+        copy.state_id = "other"
+        self.storage.new(copy)
+        self.assertEqual(self.cities_of(self.state.id), [])
+        self.assertEqual(self.cities_of("other"), [copy])
+
+    def test_change_while_iterating(self):
+        """Test that the results can be stored again or added to while
+        they're iterated"""
+        for city in self.storage.query(City).filter(state_id=self.state.id):
+            self.storage.new(city)
+        for city in self.storage.query(City):
+            self.storage.new(City())
+        self.assertEqual(self.storage.count(City), 6)
+
+    def test_value_of_another_type(self):
+        """Test that a foreign key set to a non-string is still found"""
+        self.cities[2].state_id = 123
+        self.assertEqual(self.cities_of(123), [self.cities[2]])
+        self.assertEqual(self.cities_of(self.state.id), self.cities[:2])
+        self.assertEqual(self.storage.query(City).filter(
+            state_id=[]).count(), 0)
+
+    def test_related_is_cached(self):
+        """Test that related reuses its result until the index changes"""
+        with unittest.mock.patch.object(self.storage, "query",
+                                        wraps=self.storage.query) as query:
+            self.assertEqual(self.state.cities, self.cities[:2])
+            self.assertEqual(self.state.cities, self.cities[:2])
+            self.assertEqual(query.call_count, 1)
+            self.cities[2].state_id = self.state.id
+            self.assertEqual(self.state.cities, self.cities)
+            self.assertEqual(query.call_count, 2)
+
+    def test_related_cache_is_dropped(self):
+        """Test that the cached results of an index that changed are
+        dropped, so they don't keep deleted objects"""
+        related = self.storage._FileStorage__related
+        self.assertEqual(self.state.cities, self.cities[:2])
+        self.assertEqual(State().cities, [])
+        self.assertEqual(len(related[(City.__name__, "state_id")]), 2)
+        self.storage.delete(self.cities[0])
+        self.assertNotIn((City.__name__, "state_id"), related)
+        self.assertEqual(self.state.cities, [self.cities[1]])
+        self.assertEqual(len(related[(City.__name__, "state_id")]), 1)
+
+    def test_reload(self):
+        """Test that reload indexes the loaded objects"""
+        storage = FileStorage(self.path)
+        storage.clean()
+        review = Review(**Review().to_dict())
+        review.place_id = "p"
+        storage.new(review)
+        storage.save()
+        storage.clean()
+        storage.reload()
+        found = storage.query(Review).filter(place_id="p").all()
+        self.assertEqual([r.id for r in found], [review.id])
+
+
+class TestFileStorageBatch(TempDirTestCase):
+    """
+    Tests the deferred writes of FileStorage.batch()
+    """
+    options = {}
+
+    def test_save_is_deferred(self):
+        """Test that nothing is written until the batch exits"""
+        with self.storage.batch():
+            for i in range(3):
+                self.storage.new(Amenity())
+                self.storage.save()
+            self.assertFalse(os.path.exists(self.path))
+        with open(self.path, "r") as f:
+            self.assertEqual(len(json.load(f)), 3)
+
+    def test_nested_batches(self):
+        """Test that only the outermost batch flushes"""
+        with self.storage.batch():
+            with self.storage.batch():
+                self.storage.new(Amenity())
+                self.storage.save()
+            self.assertFalse(os.path.exists(self.path))
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_no_save_no_write(self):
+        """Test that a batch without save() doesn't write"""
+        with self.storage.batch():
+            self.storage.new(Amenity())
+        self.assertFalse(os.path.exists(self.path))
+
+
+class TestFileStorageChanges(TempDirTestCase):
+    """
+    Tests that save only serializes the objects changed since the last one
+    """
+    options = {}
+
+    def setUp(self):
+        """Saves a few objects in a temporary directory"""
+        super().setUp()
+        self.objs = [Amenity() for i in range(3)]
+        for obj in self.objs:
+            self.storage.new(obj)
+        self.storage.save()
+
+    def saved(self):
+        """Saves and returns the to_dict() calls it made and the file"""
+        with unittest.mock.patch.object(
+                Amenity, "to_dict", autospec=True,
+                side_effect=BaseModel.to_dict) as to_dict:
+            self.storage.save()
+        with open(self.path) as f:
+            return [call[0][0] for call in to_dict.call_args_list], \
+                json.load(f)
+
+    def test_unchanged_objects_are_reused(self):
+        """Test that only changed, replaced or new objects are encoded"""
+        self.assertEqual(self.saved()[0], [])
+        self.objs[0].name = "Wifi"
+        del self.objs[1].updated_at
+        replaced = Amenity(**self.objs[2].to_dict())
+        self.storage.new(replaced)
+        added = Amenity()
+        self.storage.new(added)
+        self.objs[1].updated_at = self.objs[1].created_at
+        encoded, data = self.saved()
+        self.assertEqual(encoded, [self.objs[0], self.objs[1], replaced,
+                                   added])
+        self.assertEqual(data["Amenity." + self.objs[0].id]["name"], "Wifi")
+        self.assertEqual(len(data), 4)
+
+    def test_deleted_objects_are_dropped(self):
+        """Test that a deleted object is no longer written"""
+        self.storage.delete(self.objs[1])
+        encoded, data = self.saved()
+        self.assertEqual(encoded, [])
+        self.assertEqual(set(data), {"Amenity." + self.objs[0].id,
+                                     "Amenity." + self.objs[2].id})
+
+    def test_reloaded_objects(self):
+        """Test that reloaded objects are encoded once"""
+        self.storage.clean()
+        self.storage.reload()
+        self.assertEqual(len(self.saved()[0]), 3)
+        self.assertEqual(self.saved()[0], [])
+
+    def test_changed_in_place(self):
+        """Test that a list changed in place is saved"""
+        self.objs[0].tags = ["a"]
+        self.assertEqual(self.saved()[1]["Amenity." + self.objs[0].id]
+                         ["tags"], ["a"])
+        self.objs[0].tags.append("b")
+        self.assertEqual(self.saved()[1]["Amenity." + self.objs[0].id]
+                         ["tags"], ["a", "b"])
+
+
+class TestFileStorageJournal(TempDirTestCase):
+    """
+    Tests the append-only journal mode of FileStorage
+    """
+    options = {"journal": True, "compact_limit": 5}
+    current = True
+
+    def reloaded(self):
+        """Returns the objects seen by a fresh storage on the same path"""
+        storage = FileStorage(self.path, journal=True)
+        storage.clean()
+        storage.reload()
+        return storage.all()
+
+    def test_save_appends_changed_records_only(self):
+        """Test that save writes the journal and leaves the JSON file"""
+        user = User()
+        self.storage.new(user)
+        self.storage.save()
+        self.assertFalse(os.path.exists(self.path))
+        with open(self.path + ".journal", "r") as f:
+            lines = f.readlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])["key"], "User." + user.id)
+
+    def test_reload_replays_journal(self):
+        """Test that updates and deletions survive a reload"""
+        user = User()
+        place = Place()
+        self.storage.new(user)
+        self.storage.new(place)
+        self.storage.save()
+        user.email = "hbnb@mail.com"
+        self.storage.new(user)
+        self.storage.delete(place)
+        self.storage.save()
+        objs = self.reloaded()
+        self.assertEqual(list(objs), ["User." + user.id])
+        self.assertEqual(objs["User." + user.id].email, "hbnb@mail.com")
+
+    def test_setattr_is_journaled(self):
+        """Test that an attribute set without new() survives a reload"""
+        user = User()
+        self.storage.new(user)
+        self.storage.save()
+        user.email = "hbnb@mail.com"
+        self.storage.save()
+        self.storage.save()
+        with open(self.path + ".journal", "r") as f:
+            self.assertEqual(len(f.readlines()), 2)
+        objs = self.reloaded()
+        self.assertEqual(objs["User." + user.id].email, "hbnb@mail.com")
+        self.storage.clean()
+        self.storage.reload()
+        self.storage.all()["User." + user.id].first_name = "Betty"
+        self.storage.save()
+        self.assertEqual(self.reloaded()["User." + user.id].first_name,
+                         "Betty")
+
+    def test_only_changed_objects_are_checked(self):
+        """Test that a save serializes the changed objects and those
+        holding a list, and journals the ones that changed"""
+        users = [User() for i in range(10)]
+        place = Place()
+        place.amenity_ids = ["a"]
+        users[4].first_name = "Betty"
+        self.storage.compact()
+        users[3].email = "hbnb@mail.com"
+        del users[4].first_name
+        with unittest.mock.patch.object(
+                User, "to_json", autospec=True,
+                side_effect=BaseModel.to_json) as user_json, \
+                unittest.mock.patch.object(
+                    Place, "to_json", autospec=True,
+                    side_effect=BaseModel.to_json) as place_json:
+            self.storage.save()
+        self.assertEqual([c[0][0] for c in user_json.call_args_list],
+                         [users[3], users[4]])
+        self.assertEqual(place_json.call_count, 1)
+        place.amenity_ids.append("b")
+        self.storage.save()
+        with open(self.path + ".journal", "r") as f:
+            keys = [json.loads(line)["key"] for line in f]
+        self.assertEqual(sorted(keys[:2]), sorted(
+            ["User." + users[3].id, "User." + users[4].id]))
+        self.assertEqual(keys[2:], ["Place." + place.id])
+        self.assertEqual(self.reloaded()["Place." + place.id].amenity_ids,
+                         ["a", "b"])
+
+    def test_compaction(self):
+        """Test that the journal is folded into the JSON file"""
+        for i in range(5):
+            self.storage.new(State())
+            self.storage.save()
+        self.assertFalse(os.path.exists(self.path + ".journal"))
+        with open(self.path, "r") as f:
+            self.assertEqual(len(json.load(f)), 5)
+        self.storage.new(State())
+        self.storage.save()
+        self.assertEqual(len(self.reloaded()), 6)
+
+    def test_torn_entry_is_dropped(self):
+        """Test that a partially written entry is ignored on reload"""
+        city = City()
+        self.storage.new(city)
+        self.storage.save()
+        with open(self.path + ".journal", "a") as f:
+            f.write('{"op": "put", "key": "City.1", "val')
+        self.assertEqual(list(self.reloaded()), ["City." + city.id])
+        with open(self.path + ".journal", "r") as f:
+            self.assertEqual(len(f.readlines()), 1)
+
+
+class TestFileStorageLazy(TempDirTestCase):
+    """
+    Tests the lazy mode of FileStorage
+    """
+    def setUp(self):
+        """Saves a few objects in a temporary directory"""
+        super().setUp()
+        storage = FileStorage(self.path, lazy=True)
+        storage.clean()
+        self.objs = [User(), Place(), Place(), Review()]
+        for obj in self.objs:
+            storage.new(obj)
+        storage.save()
+        self.storage = FileStorage(self.path, lazy=True)
+        self.storage.clean()
+        self.storage.reload()
+
+    def tearDown(self):
+        """Closes the index of the storage"""
+        self.storage.clean()
+
+    def test_reload_builds_nothing(self):
+        """Test that reload only opens the index"""
+        self.assertEqual(self.storage._FileStorage__objects, {})
+        self.assertEqual(self.storage.count(), 4)
+        self.assertEqual(self.storage.count(Place), 2)
+
+    def test_get_builds_one_object(self):
+        """Test that get only builds the requested object"""
+        place = self.storage.get(Place, self.objs[1].id)
+        self.assertEqual(place.to_dict(), self.objs[1].to_dict())
+        self.assertIs(self.storage.get("Place", place.id), place)
+        self.assertEqual(len(self.storage._FileStorage__objects), 1)
+        self.assertEqual(self.storage.count(Place), 2)
+        self.assertIsNone(self.storage.get(Place, self.objs[0].id))
+
+    def test_all_with_class(self):
+        """Test that all(cls) only builds the instances of cls"""
+        self.assertEqual(len(self.storage.all(Place)), 2)
+        self.assertEqual(len(self.storage._FileStorage__objects), 2)
+        self.assertEqual(len(self.storage.all()), 4)
+
+    def test_new_and_delete(self):
+        """Test that counts follow changes made before a save"""
+        self.storage.delete(self.storage.get(Review, self.objs[3].id))
+        self.storage.new(State())
+        self.storage.new(self.objs[1])
+        self.assertEqual(self.storage.count(Review), 0)
+        self.assertEqual(self.storage.count(Place), 2)
+        self.assertEqual(self.storage.count(), 4)
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual(self.storage.count(State), 1)
+        self.assertEqual(len(self.storage.all()), 4)
+
+    def test_stale_index_is_ignored(self):
+        """Test that a JSON file written without index is fully read"""
+        storage = FileStorage(self.path)
+        storage.clean()
+        storage.new(Amenity())
+        storage.save()
+        self.storage.clean()
+        self.storage.reload()
+        self.assertEqual(len(self.storage._FileStorage__objects), 1)
+
+
+class TestFileStorageBinary(TempDirTestCase):
+    """
+    Tests FileStorage with the binary snapshot format
+    """
+    file_name = "file.hbnb"
+
+    def test_save_and_reload(self):
+        """Test that objects come back from a binary snapshot"""
+        storage = FileStorage(self.path, binary=True)
+        storage.clean()
+        objs = [User(), Place(), Place()]
+        objs[1].price_by_night = 80
+        for obj in objs:
+            storage.new(obj)
+        storage.save()
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(4), b"HBNB")
+        reloaded = FileStorage(self.path, binary=True)
+        reloaded.clean()
+        reloaded.reload()
+        self.assertEqual(list(reloaded.all(Place)),
+                         ["Place." + o.id for o in objs[1:]])
+        for obj in objs:
+            key = "{}.{}".format(type(obj).__name__, obj.id)
+            self.assertEqual(reloaded.all()[key].to_dict(), obj.to_dict())
+
+
+class TestFileStorageSharded(TempDirTestCase):
+    """
+    Tests FileStorage with the sharded layout
+    """
+    file_name = "file.json.d"
+
+    def fill(self, storage):
+        """Stores a user and two places, then saves"""
+        storage.clean()
+        objs = [User(), Place(), Place()]
+        for obj in objs:
+            storage.new(obj)
+        storage.save()
+        return objs
+
+    def mtimes(self):
+        """Returns the modification time of each shard file"""
+        return {name: os.stat(os.path.join(self.path, name)).st_mtime_ns
+                for name in os.listdir(self.path)}
+
+    def test_one_file_per_class(self):
+        """Test that each class is saved to its own file"""
+        storage = FileStorage(self.path, shards=1)
+        objs = self.fill(storage)
+        self.assertEqual(sorted(os.listdir(self.path)),
+                         ["Place.json", "User.json"])
+        with open(os.path.join(self.path, "Place.json")) as f:
+            self.assertEqual(sorted(json.load(f)),
+                             sorted("Place." + o.id for o in objs[1:]))
+        reloaded = FileStorage(self.path, shards=1)
+        reloaded.clean()
+        reloaded.reload()
+        for obj in objs:
+            key = "{}.{}".format(type(obj).__name__, obj.id)
+            self.assertEqual(reloaded.all()[key].to_dict(), obj.to_dict())
+
+    def test_only_dirty_shards_are_written(self):
+        """Test that a save only rewrites the files of changed objects"""
+        storage = FileStorage(self.path, shards=1)
+        objs = self.fill(storage)
+        before = self.mtimes()
+        with unittest.mock.patch.object(file_storage.shards, "write_shard",
+                                        wraps=file_storage.shards.write_shard
+                                        ) as write, \
+                unittest.mock.patch.object(models, "storage", storage):
+            objs[0].first_name = "Betty"
+            storage.save()
+            storage.save()
+            self.assertEqual([os.path.basename(c[0][0])
+                              for c in write.call_args_list], ["User.json"])
+            self.assertEqual(self.mtimes()["Place.json"],
+                             before["Place.json"])
+            objs[1].amenity_ids = ["a"]
+            storage.save()
+            storage.save()
+            objs[1].amenity_ids.append("b")
+            storage.save()
+            self.assertEqual([os.path.basename(c[0][0])
+                              for c in write.call_args_list],
+                             ["User.json", "Place.json", "Place.json"])
+        storage.delete(objs[0])
+        storage.save()
+        self.assertEqual(os.listdir(self.path), ["Place.json"])
+
+    def test_hash_partitions(self):
+        """Test that a class is split over shards files"""
+        storage = FileStorage(self.path, shards=4)
+        storage.clean()
+        for i in range(40):
+            storage.new(Place())
+        storage.save()
+        names = os.listdir(self.path)
+        self.assertGreater(len(names), 1)
+        self.assertTrue(all(name in ["Place.{:d}.json".format(i)
+                                     for i in range(4)] for name in names))
+        reloaded = FileStorage(self.path, shards=4)
+        reloaded.clean()
+        reloaded.reload()
+        self.assertEqual(sorted(reloaded.all()), sorted(storage.all()))
+
+    def test_change_of_layout(self):
+        """Test that the files of another layout are replaced on save"""
+        objs = self.fill(FileStorage(self.path, shards=1))
+        storage = FileStorage(self.path, shards=2)
+        storage.clean()
+        storage.reload()
+        storage.save()
+        names = sorted(os.listdir(self.path))
+        self.assertNotIn("Place.json", names)
+        self.assertNotIn("User.json", names)
+        storage.clean()
+        storage.reload()
+        self.assertEqual(len(storage.all()), len(objs))
+        storage.compact()
+        self.assertEqual(sorted(os.listdir(self.path)), names)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,175 @@
+#!/usr/bin/python3
+"""
+Unittests for class MmapStorage
+"""
+
+import os
+import unittest
+from models.engine.mmap_storage import MmapStorage
+from models.place import Place
+from models.user import User
+from tests.storage_case import TempDirTestCase
+
+
+class TestMmapStorage(TempDirTestCase):
+    """
+    Tests MmapStorage functionality
+    """
+    file_name = "file.db"
+
+    def setUp(self):
+        """Opens a storage in a temporary directory"""
+        super().setUp()
+        self.storage = self.open()
+
+    def open(self):
+        """Returns a reloaded storage on self.path"""
+        storage = MmapStorage(self.path)
+        storage.reload()
+        return storage
+
+    def fill(self, count):
+        """Saves count users and returns them"""
+        users = []
+        for i in range(count):
+            user = User(**User().to_dict())
+            user.email = "user{}@mail.com".format(i)
+            self.storage.new(user)
+            users.append(user)
+        self.storage.save()
+        return users
+
+    def test_get_after_reload(self):
+        """Test that saved objects are read back one by one"""
+        users = self.fill(2000)
+        storage = self.open()
+        self.assertEqual(storage.count(), 2000)
+        self.assertEqual(storage.count(User), 2000)
+        self.assertEqual(storage.count("Place"), 0)
+        for user in users[::97]:
+            self.assertEqual(storage.get(User, user.id).to_dict(),
+                             user.to_dict())
+        self.assertIsNone(storage.get("User", "missing"))
+        self.assertIsNone(storage.get("Place", users[0].id))
+
+    def test_all(self):
+        """Test that all builds the instances of a class"""
+        users = self.fill(10)
+        place = Place(**Place().to_dict())
+        self.storage.new(place)
+        self.assertEqual(len(self.storage.all()), 11)
+        self.storage.save()
+        storage = self.open()
+        self.assertEqual(set(storage.all(User)),
+                         {"User." + u.id for u in users})
+        self.assertEqual(list(storage.all("Place")), ["Place." + place.id])
+        self.assertEqual(storage.all("Amenity"), {})
+
+    def test_update_and_delete(self):
+        """Test that updates and deletions survive a reload"""
+        users = self.fill(5)
+        user = self.storage.get(User, users[0].id)
+        user.first_name = "Betty"
+        self.storage.new(user)
+        self.storage.delete(self.storage.get(User, users[1].id))
+        self.assertEqual(self.storage.count(), 4)
+        self.storage.save()
+        storage = self.open()
+        self.assertEqual(storage.count(), 4)
+        self.assertEqual(storage.get(User, users[0].id).first_name, "Betty")
+        self.assertIsNone(storage.get(User, users[1].id))
+
+    def test_update(self):
+        """Test that update writes a stored copy, not a deleted one"""
+        users = self.fill(2)
+        copy = self.storage.get(User, users[0].id)
+        copy.first_name = "Betty"
+        self.storage.update(copy)
+        self.storage.delete(users[1])
+        self.storage.save()
+        self.storage.update(users[1])
+        self.storage.save()
+        storage = self.open()
+        self.assertEqual(storage.get(User, users[0].id).first_name, "Betty")
+        self.assertIsNone(storage.get(User, users[1].id))
+
+    def test_save_appends_changed_records(self):
+        """Test that a save only appends the changed records"""
+        users = self.fill(100)
+        size = os.path.getsize(self.path)
+        users[3].last_name = "Holberton"
+        self.storage.new(users[3])
+        self.storage.save()
+        record = os.path.getsize(self.path) - size
+        self.assertLess(record, size / 50)
+
+    def test_batch(self):
+        """Test that saves inside a batch are written once"""
+        with self.storage.batch():
+            users = self.fill(3)
+            self.assertEqual(os.path.getsize(self.path), 0)
+        self.assertEqual(self.open().count(), 3)
+        self.assertEqual(len(users), 3)
+
+    def test_index_grows(self):
+        """Test that the index grows past its initial slots"""
+        users = self.fill(3000)
+        storage = self.open()
+        self.assertEqual(storage.get(User, users[-1].id).email,
+                         users[-1].email)
+
+    def test_rebuilds_missing_index(self):
+        """Test that the index is rebuilt from the log"""
+        users = self.fill(20)
+        self.storage.delete(users[0])
+        self.storage.save()
+        os.remove(self.path + ".index")
+        storage = self.open()
+        self.assertEqual(storage.count(User), 19)
+        self.assertIsNone(storage.get(User, users[0].id))
+        self.assertEqual(storage.get(User, users[5].id).email,
+                         users[5].email)
+
+    def test_recovers_appended_records(self):
+        """Test that records appended after the index was saved are
+        indexed and a torn last record is cut off"""
+        users = self.fill(3)
+        with open(self.path, "rb") as f:
+            log = f.read()
+        self.storage.delete(users[2])
+        self.storage.save()
+        with open(self.path + ".index", "rb") as f:
+            index = f.read()
+        users[0].email = "new@mail.com"
+        self.storage.new(users[0])
+        self.storage.save()
+        with open(self.path + ".index", "wb") as f:
+            f.write(index)
+        with open(self.path, "ab") as f:
+            f.write(b'"User.torn" {"id": "to')
+        storage = self.open()
+        self.assertEqual(storage.count(), 2)
+        self.assertEqual(storage.get(User, users[0].id).email,
+                         "new@mail.com")
+        with open(self.path, "rb") as f:
+            self.assertTrue(f.read().endswith(b"\n"))
+        self.assertGreater(os.path.getsize(self.path), len(log))
+
+    def test_compact(self):
+        """Test that compact keeps only the last record of each key"""
+        users = self.fill(10)
+        for user in users:
+            user.first_name = "Betty"
+            self.storage.new(user)
+        self.storage.delete(users[0])
+        self.storage.save()
+        size = os.path.getsize(self.path)
+        self.storage.compact()
+        self.assertLess(os.path.getsize(self.path), size / 2)
+        self.assertEqual(self.storage.count(), 9)
+        self.assertEqual(self.open().get(User, users[1].id).first_name,
+                         "Betty")
+
+
+if __name__ == "__main__":
+    unittest.main()
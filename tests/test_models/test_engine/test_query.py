@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+"""
+Unittests for class Query, through FileStorage.query
+"""
+
+import os
+import unittest
+from unittest.mock import patch
+from models.engine.file_storage import FileStorage
+from models.engine.query import Query
+from models.place import Place
+from models.user import User
+from tests.storage_case import TempDirTestCase
+
+
+class TestQuery(TempDirTestCase):
+    """
+    Tests Query functionality
+    """
+    options = {}
+
+    def setUp(self):
+        """Fills a storage with places"""
+        super().setUp()
+        self.places = []
+        for i in range(10):
+            place = Place(**Place().to_dict())
+            place.price_by_night = i * 10
+            place.city_id = "paris" if i % 2 else "rome"
+            self.storage.new(place)
+            self.places.append(place)
+        self.storage.new(User(**User().to_dict()))
+
+    def test_filter(self):
+        """Test equality and comparison filters"""
+        query = self.storage.query(Place)
+        self.assertIsInstance(query, Query)
+        self.assertEqual(query.count(), 10)
+        self.assertEqual(query.filter(city_id="rome").count(), 5)
+        found = query.filter(price_by_night__lt=30, city_id="paris").all()
+        self.assertEqual(found, [self.places[1]])
+        self.assertEqual(query.filter(price_by_night__gte=80).count(), 2)
+        self.assertEqual(query.filter(price_by_night__ne=0).count(), 9)
+        self.assertEqual(query.filter(price_by_night__in=[10, 20]).count(), 2)
+        self.assertEqual(self.storage.query("User").count(), 1)
+
+    def test_filter_mismatches(self):
+        """Test that missing or uncomparable attributes don't match"""
+        query = self.storage.query(Place)
+        self.assertEqual(query.filter(pets=True).count(), 0)
+        self.assertEqual(query.filter(price_by_night__lt="9").count(), 0)
+        self.assertEqual(query.filter(name__in=1).count(), 0)
+        self.assertEqual(query.filter(max_guest=0).count(), 10)
+
+    def test_only_and_pagination(self):
+        """Test projections, offset and limit"""
+        query = self.storage.query(Place).filter(price_by_night__gt=0)
+        rows = query.only("id", "price_by_night").offset(2).limit(3).all()
+        self.assertEqual(rows, [{"id": p.id,
+                                 "price_by_night": p.price_by_night}
+                                for p in self.places[3:6]])
+        self.assertEqual(query.limit(5).offset(3).count(), 5)
+        self.assertEqual(query.limit(3).offset(2).all(), self.places[3:6])
+        self.assertEqual(query.limit(5).offset(7).count(), 2)
+        self.assertEqual(query.limit(3).limit(10).count(), 3)
+        self.assertEqual(query.first(), self.places[1])
+        self.assertIsNone(query.filter(city_id="oslo").first())
+
+    def test_chaining_is_immutable(self):
+        """Test that each method returns a new query"""
+        query = self.storage.query(Place)
+        query.filter(city_id="rome").limit(1)
+        self.assertEqual(query.count(), 10)
+
+    def test_streams(self):
+        """Test that matches are pulled from the source one at a time"""
+        pulled = []
+
+        def source(name, equal):
+            """Yields the places and records how many were pulled"""
+            for place in self.places:
+                pulled.append(place)
+                yield place
+        query = Query(source, "Place").filter(city_id="paris")
+        self.assertEqual(query.first(), self.places[1])
+        self.assertEqual(len(pulled), 2)
+
+    def test_id_filter_uses_get(self):
+        """Test that an id filter doesn't walk the class"""
+        place = self.places[4]
+        with patch.object(self.storage, "get",
+                          wraps=self.storage.get) as get:
+            self.assertEqual(self.storage.query(Place).filter(
+                id=place.id).all(), [place])
+        get.assert_called_once_with("Place", place.id)
+
+    def test_lazy_storage(self):
+        """Test that a lazy storage builds records as they are reached"""
+        path = os.path.join(self.tmp, "lazy.json")
+        storage = FileStorage(path, lazy=True)
+        storage.clean()
+        for place in self.places:
+            storage.new(place)
+        storage.save()
+        storage = FileStorage(path, lazy=True)
+        storage.clean()
+        storage.reload()
+        place = storage.query(Place).filter(city_id="paris").first()
+        self.assertEqual(place.to_dict(), self.places[1].to_dict())
+        self.assertLess(len(storage._FileStorage__objects), 10)
+        self.assertEqual(storage.query(Place).filter(
+            city_id="paris").count(), 5)
+        self.assertEqual(storage.count(Place), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+#!/usr/bin/python3
+"""
+Unittests for the sharded layout of FileStorage
+"""
+
+import json
+import os
+import unittest
+from models.engine import shards
+from tests.storage_case import TempDirTestCase
+
+
+class TestShards(TempDirTestCase):
+    """
+    Tests the shard names, reading and the migration tool
+    """
+    def test_shard_of(self):
+        """Test that keys go to a stable shard of their class"""
+        self.assertEqual(shards.shard_of("User.1234", 1), "User.json")
+        name = shards.shard_of("User.1234", 8)
+        self.assertRegex(name, r"^User\.[0-7]\.json$")
+        self.assertEqual(shards.shard_of("User.1234", 8), name)
+        self.assertTrue(shards.in_layout(name, 8))
+        self.assertFalse(shards.in_layout(name, 1))
+        self.assertFalse(shards.in_layout("User.json", 8))
+        self.assertFalse(shards.in_layout("User.9.json", 8))
+        self.assertFalse(shards.in_layout("file.json.tmp", 1))
+
+    def test_write_and_read(self):
+        """Test that a shard is read back with datetime timestamps"""
+        path = os.path.join(self.tmp, "City.json")
+        value = {"id": "1", "name": "Lagos", "__class__": "City",
+                 "created_at": "2017-09-28T21:03:54.052298"}
+        shards.write_shard(path, [("City.1", json.dumps(value).encode())])
+        [(key, name, attrs)] = shards.read_shard(path)
+        self.assertEqual((key, name), ("City.1", "City"))
+        self.assertEqual(attrs["created_at"].microsecond, 52298)
+        shards.write_shard(path, [])
+        self.assertEqual(shards.read_shard(path), [])
+        self.assertEqual(os.listdir(self.tmp), ["City.json"])
+
+    def test_split_and_join(self):
+        """Test the conversion from file.json and back"""
+        data = {"{}.{:d}".format(name, i): {"id": str(i), "__class__": name}
+                for name in ("User", "Place") for i in range(10)}
+        src = os.path.join(self.tmp, "file.json")
+        with open(src, "w") as f:
+            json.dump(data, f)
+        dst = os.path.join(self.tmp, "file.json.d")
+        shards.split(src, dst, 2)
+        self.assertTrue(all(shards.in_layout(name, 2)
+                            for name in os.listdir(dst)))
+        shards.split(src, dst)
+        self.assertEqual(sorted(os.listdir(dst)), ["Place.json", "User.json"])
+        back = os.path.join(self.tmp, "back.json")
+        shards.join(dst, back)
+        with open(back) as f:
+            self.assertEqual(json.load(f), data)
+
+
+if __name__ == "__main__":
+    unittest.main()
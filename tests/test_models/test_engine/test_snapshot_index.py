@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+"""
+Unittests for class SnapshotIndex
+"""
+
+import json
+import unittest
+from models.engine.snapshot_index import SnapshotIndex
+from tests.storage_case import TempDirTestCase
+
+
+class TestSnapshotIndex(TempDirTestCase):
+    """
+    Tests SnapshotIndex functionality
+    """
+    def setUp(self):
+        """Writes a small JSON file and its index"""
+        super().setUp()
+        self.data = {"User.b": {"id": "b"}, "City.c": {"id": "c"},
+                     "User.a": {"id": "a"}}
+        text = json.dumps(self.data)
+        records = {}
+        for key, value in self.data.items():
+            record = json.dumps(value)
+            records[key] = (text.index(record), len(record))
+        with open(self.path, "w") as f:
+            f.write(text)
+        SnapshotIndex.write(self.path + ".index", self.path, records)
+        self.index = SnapshotIndex.open(self.path + ".index", self.path)
+
+    def tearDown(self):
+        """Closes the index"""
+        self.index.close()
+
+    def test_record(self):
+        """Test that record returns the JSON text of a key"""
+        for key, value in self.data.items():
+            self.assertEqual(json.loads(self.index.record(key)), value)
+        self.assertIsNone(self.index.record("User.z"))
+        self.assertIn("City.c", self.index)
+        self.assertNotIn("City", self.index)
+
+    def test_records_in_file_order(self):
+        """Test that records of a class come in file order"""
+        keys = [k for k, v in self.index.records("User")]
+        self.assertEqual(keys, ["User.b", "User.a"])
+        self.assertEqual(len(list(self.index.records())), 3)
+        self.assertEqual(list(self.index.records("Place")), [])
+
+    def test_count(self):
+        """Test the record counts"""
+        self.assertEqual(self.index.count(), 3)
+        self.assertEqual(self.index.count("User"), 2)
+        self.assertEqual(self.index.count("Place"), 0)
+
+    def test_stale_index(self):
+        """Test that an index older than its JSON file isn't opened"""
+        with open(self.path, "a") as f:
+            f.write(" ")
+        self.assertIsNone(SnapshotIndex.open(self.path + ".index", self.path))
+        self.assertIsNone(SnapshotIndex.open(self.path + ".x", self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
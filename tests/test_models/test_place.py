@@ -5,13 +5,16 @@ Unittest classes:
     TestPlace_instantiation
     TestPlace_save
     TestPlace_to_dict
+    TestPlace_relationships
 """
 import os
 import models
 import unittest
 from datetime import datetime
 from time import sleep
+from models.amenity import Amenity
 from models.place import Place
+from models.review import Review
 
 
 class TestPlace_instantiation(unittest.TestCase):
@@ -245,5 +248,33 @@ class TestPlace_to_dict(unittest.TestCase):
             pl.to_dict(None)
 
 
+class TestPlace_relationships(unittest.TestCase):
+    """Unittests for testing the reviews and amenities of the Place class."""
+
+    def setUp(self):
+        models.storage.clean()
+        self.place = Place()
+
+    def tearDown(self):
+        models.storage.clean()
+
+    def test_reviews(self):
+        reviews = [Review(), Review()]
+        for review in reviews:
+            review.place_id = self.place.id
+        Review()
+        self.assertEqual(self.place.reviews, reviews)
+        reviews[1].place_id = ""
+        self.assertEqual(self.place.reviews, reviews[:1])
+
+    def test_amenities(self):
+        amenities = [Amenity(), Amenity()]
+        self.assertEqual(self.place.amenities, [])
+        self.place.amenity_ids = [a.id for a in amenities] + ["missing"]
+        self.assertEqual(self.place.amenities, amenities)
+        models.storage.delete(amenities[0])
+        self.assertEqual(self.place.amenities, amenities[1:])
+
+
 if __name__ == "__main__":
     unittest.main()
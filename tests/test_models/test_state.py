@@ -5,12 +5,14 @@ Unittest classes:
     TestState_instantiation
     TestState_save
     TestState_to_dict
+    TestState_cities
 """
 import os
 import models
 import unittest
 from datetime import datetime
 from time import sleep
+from models.city import City
 from models.state import State
 
 
@@ -185,5 +187,39 @@ class TestState_to_dict(unittest.TestCase):
             st.to_dict(None)
 
 
+class TestState_cities(unittest.TestCase):
+    """Unittests for testing the cities property of the State class."""
+
+    def setUp(self):
+        models.storage.clean()
+        self.state = State()
+        self.cities = [City(), City()]
+        for city in self.cities:
+            city.state_id = self.state.id
+        City().state_id = "another"
+
+    def tearDown(self):
+        models.storage.clean()
+
+    def test_cities(self):
+        self.assertEqual(self.state.cities, self.cities)
+        self.assertEqual(State().cities, [])
+
+    def test_cities_follow_changes(self):
+        self.assertEqual(len(self.state.cities), 2)
+        self.cities[0].state_id = "another"
+        self.assertEqual(self.state.cities, self.cities[1:])
+        city = City()
+        city.state_id = self.state.id
+        self.assertEqual(self.state.cities, [self.cities[1], city])
+        models.storage.delete(city)
+        self.assertEqual(self.state.cities, self.cities[1:])
+
+    def test_cities_is_not_an_attribute(self):
+        self.state.cities
+        self.assertNotIn("cities", self.state.to_dict())
+        self.assertNotIn("cities", self.state.__dict__)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+"""
+Unittests for the instrumentation of the storage, models and console
+"""
+
+import json
+import os
+import unittest
+from unittest.mock import patch
+from models import stats
+from models import base_model
+from models.base_model import BaseModel
+from models.engine import file_storage
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from tests.storage_case import TempDirTestCase
+
+
+class TestTimer(TempDirTestCase):
+    """
+    Tests Timer, timed and the reports
+    """
+    def setUp(self):
+        """Starts from no timers"""
+        super().setUp()
+        self.timers = patch.dict(stats.timers, clear=True)
+        self.timers.start()
+
+    def tearDown(self):
+        """Restores the timers"""
+        self.timers.stop()
+
+    def test_histogram(self):
+        """Test that durations go in one bucket per power of ten"""
+        timer = stats.Timer()
+        for seconds in (5e-7, 2e-6, 3e-6, 0.5, 20):
+            timer.record(seconds)
+        self.assertEqual(timer.calls, 5)
+        self.assertEqual(timer.max, 20)
+        self.assertAlmostEqual(timer.total, 20.5000055)
+        self.assertEqual(timer.to_dict()["histogram"],
+                         {"<1us": 1, "<10us": 2, "<1s": 1, ">=10s": 1})
+
+    def test_timed(self):
+        """Test that a timed function is counted, even when it raises"""
+        def double(x):
+            """Doubles x"""
+            return x * 2
+        wrapped = stats.timed("double", double)
+        self.assertEqual(wrapped(2), 4)
+        self.assertEqual(wrapped.__doc__, "Doubles x")
+        with self.assertRaises(TypeError):
+            wrapped()
+        self.assertEqual(stats.timers["double"].calls, 2)
+        text = stats.report()
+        self.assertRegex(text, r"^double: 2 calls, \d+\.\d{6}s total")
+        path = os.path.join(self.tmp, "stats.json")
+        stats.dump(path)
+        with open(path) as s_file:
+            self.assertEqual(json.load(s_file)["double"]["calls"], 2)
+        stats.reset()
+        self.assertEqual(stats.report(), "")
+
+
+class TestEnable(TempDirTestCase):
+    """
+    Tests the instrumentation of FileStorage and the models
+    """
+    def setUp(self):
+        """Keeps the methods enable() replaces"""
+        super().setUp()
+        self.saved = [(cls, name, cls.__dict__[name])
+                      for cls, name in ((FileStorage, "save"),
+                                        (FileStorage, "reload"),
+                                        (FileStorage, "new"),
+                                        (FileStorage, "compact"),
+                                        (BaseModel, "to_dict"))]
+        self.timers = patch.dict(stats.timers, clear=True)
+        self.timers.start()
+
+    def tearDown(self):
+        """Puts the methods back"""
+        for cls, name, func in self.saved:
+            setattr(cls, name, func)
+        base_model.json = json
+        file_storage.json = json
+        stats.enabled = False
+        self.timers.stop()
+
+    def test_enable(self):
+        """Test that save is timed along with its parts"""
+        storage = FileStorage(self.path)
+        storage.clean()
+        records = [Place().to_dict() for i in range(3)]
+        stats.enable(storage)
+        stats.enable(storage)
+        self.assertTrue(stats.enabled)
+        for record in records:
+            storage.new(Place(**record))
+        storage.save()
+        calls = {name: timer.calls for name, timer in stats.timers.items()}
+        self.assertEqual(calls["FileStorage.new"], 3)
+        self.assertEqual(calls["FileStorage.save"], 1)
+        self.assertEqual(calls["FileStorage.compact"], 1)
+        self.assertEqual(calls["BaseModel.to_dict"], 3)
+        self.assertEqual(calls["json.dumps"], 6)
+        storage.clean()
+        storage.reload()
+        self.assertEqual(storage.count(Place), 3)
+        self.assertEqual(stats.timers["FileStorage.reload"].calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,12 +5,14 @@ Unittest classes:
     TestUser_instantiation
     TestUser_save
     TestUser_to_dict
+    TestUser_places
 """
 import os
 import models
 import unittest
 from datetime import datetime
 from time import sleep
+from models.place import Place
 from models.user import User
 
 
@@ -191,5 +193,23 @@ class TestUser_to_dict(unittest.TestCase):
             us.to_dict(None)
 
 
+class TestUser_places(unittest.TestCase):
+    """Unittests for testing the places property of the User class."""
+
+    def setUp(self):
+        models.storage.clean()
+
+    def tearDown(self):
+        models.storage.clean()
+
+    def test_places(self):
+        user = User()
+        self.assertEqual(user.places, [])
+        place = Place()
+        place.user_id = user.id
+        self.assertEqual(user.places, [place])
+        self.assertEqual(User().places, [])
+
+
 if __name__ == "__main__":
     unittest.main()